@@ -1,41 +1,199 @@
 # Échecs game logic
 
-from datetime import datetime
-import random
-from typing import List, Optional, Dict, Any
-from tinydb import TinyDB
+from array import array
+from contextlib import contextmanager, nullcontext
+from datetime import date, datetime
+from typing import Callable, Iterable, Iterator, List, Optional, Dict, Any, Set, Tuple, TypeVar, Union
+from weakref import WeakSet
+import atexit
 import os
 
-# Création du dossier data s'il n'existe pas
-if not os.path.exists('data'):
-    os.makedirs('data')
+from appariements import EtatJoueur, apparier, table_berger
+from confrontations import Confrontations, HistoriqueTournoi
+from departages import Partie, ScoresTournoi
+from elo import variations as variations_elo
+from export_rapports import FORMATS, exporter_fichier, rapport_joueurs, rapport_tournois, rapport_tours
+from index_tournois import IndexTournois, lire_recherche
+from metriques import chronometre, mesure, profiler
+from recherche import IndexJoueurs, par_classement
+from simulation import afficher as afficher_pronostics, etat_depuis_tournoi, simuler
+from stockage import BaseJournal, BaseVerrouillee, ConflitVersion, JournalStorage
+from stockage_sqlite import BaseSQLite
+from vues_triees import ORDRES, VueInscrits, VueTriee
+
+# Moteur de stockage : 'journal' (TinyDB, par défaut) ou 'sqlite', choisi par la variable d'environnement
+# ECHEC_STOCKAGE. Une base existante se copie dans SQLite avec ``python stockage_sqlite.py``.
+STOCKAGE = os.environ.get('ECHEC_STOCKAGE', 'journal')
+DOSSIER_DONNEES = 'data'
+
+
+class _BaseDifferee:
+    """Tient la place de la base (ou d'une de ses tables) tant qu'elle n'est pas ouverte.
+
+    Le premier accès ouvre la base avec la configuration par défaut ; ensuite les variables
+    du module désignent directement les objets ouverts.
+    """
+
+    def __init__(self, table: Optional[str] = None):
+        object.__setattr__(self, '_table', table)
+
+    def _cible(self):
+        base = ouvrir_base() if isinstance(db, _BaseDifferee) else db
+        return base if self._table is None else base.table(self._table)
+
+    def __getattr__(self, nom: str):
+        return getattr(self._cible(), nom)
+
+    def __setattr__(self, nom: str, valeur: Any):
+        setattr(self._cible(), nom, valeur)
+
+    def __len__(self) -> int:
+        return len(self._cible())
+
+
+db: Any = _BaseDifferee()
+joueurs_table: Any = _BaseDifferee('joueurs')
+tournois_table: Any = _BaseDifferee('tournois')
+
+
+def ouvrir_base(stockage: Optional[str] = None, dossier: Optional[str] = None, instantane: bool = True):
+    """Ouvre la base de données ; appelée au premier accès si l'application ne l'a pas fait.
+
+    ``stockage`` vaut 'journal' (journal TinyDB en ajout seul, repris de l'ancien fichier JSON)
+    ou 'sqlite' ; ``instantane`` active l'instantané binaire qui accélère l'ouverture du journal.
+    Rouvrir une base déjà ouverte la ferme d'abord.
+    """
+    global db, joueurs_table, tournois_table
+    fermer_base()
+    stockage = stockage or STOCKAGE
+    dossier = dossier or DOSSIER_DONNEES
+    if not os.path.exists(dossier):
+        os.makedirs(dossier)
+
+    if stockage == 'sqlite':
+        base = BaseSQLite(os.path.join(dossier, 'chess_tournament.sqlite'))
+    elif stockage == 'journal':
+        base = BaseJournal(os.path.join(dossier, 'chess_tournament.journal'), storage=JournalStorage,
+                           importer_depuis=os.path.join(dossier, 'chess_tournament.json'), instantane=instantane)
+    else:
+        raise ValueError(f"Moteur de stockage inconnu : {stockage}")
+    db, joueurs_table, tournois_table = base, base.table('joueurs'), base.table('tournois')
+    depot_joueurs.invalider()
+    return base
+
+
+def fermer_base():
+    """Ferme la base si elle est ouverte (écrit l'instantané du journal, le cas échéant)"""
+    global db, joueurs_table, tournois_table
+    if isinstance(db, _BaseDifferee):
+        return
+    db.close()
+    db, joueurs_table, tournois_table = _BaseDifferee(), _BaseDifferee('joueurs'), _BaseDifferee('tournois')
+
+
+atexit.register(fermer_base)
+
+ESSAIS_CONFLIT = 5  # Tentatives d'une modification de tournoi en conflit avec un autre arbitre
+
+T = TypeVar('T')
+
+
+class UniteDeTravail:
+    """Collecte les joueurs et tournois modifiés pour les écrire ensemble à la fin du bloc"""
+
+    def __init__(self):
+        self._objets: Dict[int, Union['Joueur', 'Tournoi']] = {}
+
+    def marquer(self, objet: Union['Joueur', 'Tournoi']):
+        """Note qu'un objet déjà enregistré doit être réécrit"""
+        self._objets[id(objet)] = objet
+
+    def valider(self):
+        """Écrit chaque objet modifié une seule fois"""
+        objets = list(self._objets.values())
+        self._objets.clear()
+        for objet in objets:
+            objet.ecrire()
 
-# Initialisation de la base de données
-db = TinyDB('data/chess_tournament.json')
-joueurs_table = db.table('joueurs')
-tournois_table = db.table('tournois')
+
+_unite_courante: Optional[UniteDeTravail] = None
+
+
+@contextmanager
+def unite_de_travail() -> Iterator[UniteDeTravail]:
+    """Regroupe toutes les sauvegardes du bloc en une seule écriture dans la base.
+
+    Les appels à ``save()`` sur des objets déjà enregistrés sont différés jusqu'à la fin
+    du bloc ; les insertions obtiennent leur identifiant immédiatement. Si le bloc lève
+    une exception, rien n'est écrit. Les autres processus n'écrivent pas dans la base
+    pendant le bloc, et ce qu'ils ont écrit avant est relu à son ouverture.
+    """
+    global _unite_courante
+    if _unite_courante is not None:
+        yield _unite_courante
+        return
+
+    unite = UniteDeTravail()
+    lot = getattr(db.storage, 'lot', None)
+    _unite_courante = unite
+    try:
+        with lot() if lot is not None else nullcontext() as modifies:
+            _oublier_modifications(modifies)
+            try:
+                yield unite
+            finally:
+                _unite_courante = None
+            unite.valider()
+    except BaseException:
+        # Les insertions annulées ne doivent pas rester dans le dépôt ni dans les caches
+        depot_joueurs.invalider()
+        depot_confrontations.invalider()
+        joueurs_table.clear_cache()
+        tournois_table.clear_cache()
+        raise
+
+
+def _oublier_modifications(modifies: Optional[Set[Tuple[str, Optional[str]]]]):
+    """Oublie les caches des documents écrits par d'autres processus depuis la dernière lecture"""
+    if not modifies:
+        return
+    for table in (joueurs_table, tournois_table):
+        table.clear_cache()
+        table._next_id = None  # D'autres processus ont pu insérer des documents
+    depot_joueurs.oublier(int(doc_id) if doc_id is not None else None for nom, doc_id in modifies if nom == 'joueurs')
+    tournois = [doc_id for nom, doc_id in modifies if nom == 'tournois']
+    if None in tournois:
+        depot_confrontations.invalider()
+    else:
+        for tournoi_id in tournois:
+            depot_confrontations.invalider(int(tournoi_id))
 
 
 class Joueur:
+    __slots__ = ('nom_famille', 'prenom', 'date_naissance', 'sexe', 'classement', 'id', 'id_externe')
+
     def __init__(self, nom_famille: str, prenom: str, date_naissance: str, sexe: str, classement: int,
-                 id: Optional[int] = None):
+                 id: Optional[int] = None, id_externe: Optional[str] = None):
         self.nom_famille = nom_famille
         self.prenom = prenom
         self.date_naissance = date_naissance
         self.sexe = sexe
         self.classement = max(1, classement)  # Assure que le classement est positif
-        self.points = 0
         self.id = id
+        self.id_externe = id_externe  # Identifiant dans une liste officielle, ex. "FIDE:1503014"
 
     def to_dict(self) -> Dict[str, Any]:
         """Convertit le joueur en dictionnaire pour stockage"""
-        return {
+        donnees = {
             'nom_famille': self.nom_famille,
             'prenom': self.prenom,
             'date_naissance': self.date_naissance,
             'sexe': self.sexe,
             'classement': self.classement
         }
+        if self.id_externe is not None:
+            donnees['id_externe'] = self.id_externe
+        return donnees
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any], id: Optional[int] = None) -> 'Joueur':
@@ -46,34 +204,232 @@ class Joueur:
             date_naissance=data['date_naissance'],
             sexe=data['sexe'],
             classement=data['classement'],
-            id=id
+            id=id,
+            id_externe=data.get('id_externe')
         )
         return joueur
 
     def save(self) -> int:
         """Sauvegarde le joueur dans la base de données"""
+        with unite_de_travail() as unite:
+            if self.id is None:
+                return self.ecrire()
+            unite.marquer(self)
+            depot_joueurs.enregistrer(self)
+            return self.id
+
+    def ecrire(self) -> int:
+        """Écrit immédiatement le joueur dans la base de données"""
         if self.id is None:
             self.id = joueurs_table.insert(self.to_dict())
         else:
             joueurs_table.update(self.to_dict(), doc_ids=[self.id])
+        depot_joueurs.enregistrer(self)
         return self.id
 
     @classmethod
     def get_all(cls) -> List['Joueur']:
         """Récupère tous les joueurs de la base de données"""
-        return [cls.from_dict(item, id=item.doc_id) for item in joueurs_table.all()]
+        return depot_joueurs.get_all()
 
     def __str__(self):
         return f"{self.prenom} {self.nom_famille} (Classement: {self.classement})"
 
 
+SEUIL_RECONSTRUCTION = 1000  # Au-delà, un lot de joueurs fait reconstruire les vues triées et l'index
+SEUIL_INVALIDATION = 10  # Au-delà, des joueurs modifiés ailleurs font oublier tout le dépôt plutôt que chacun
+
+
+class DepotJoueurs:
+    """Dépôt en mémoire des joueurs : une seule instance de Joueur par identifiant.
+
+    Sur une base indexée (SQLite), les joueurs sont lus un par un à la demande ; sinon la
+    table est parcourue une seule fois, au premier accès. Les vues triées des rapports sont
+    tenues à jour à chaque sauvegarde d'un joueur, sans nouveau tri.
+    """
+
+    def __init__(self):
+        self._joueurs: Optional[Dict[int, Joueur]] = None  # Tous les joueurs, une fois la table parcourue
+        self._lus: Dict[int, Joueur] = {}  # Joueurs lus un par un avant le parcours complet
+        self._vues: Optional[Dict[str, VueTriee]] = None  # Tous les joueurs, par ordre de rapport
+        self._vues_inscrits: 'WeakSet[VueInscrits]' = WeakSet()  # Vues des tournois encore en mémoire
+        self._index: Optional[IndexJoueurs] = None  # Recherche par nom et prénom
+        self.generation = 0  # Incrémentée quand toutes les instances de joueurs sont remplacées
+
+    def _charger(self) -> Dict[int, Joueur]:
+        """Parcourt la table des joueurs une seule fois, au premier accès"""
+        if self._joueurs is None:
+            with chronometre('deserialisation.joueurs'):
+                self._joueurs = {item.doc_id: self._lus.get(item.doc_id) or Joueur.from_dict(item, id=item.doc_id)
+                                 for item in joueurs_table.all()}
+            self._lus = {}
+        return self._joueurs
+
+    def get(self, joueur_id: int) -> Optional[Joueur]:
+        """Retourne l'instance partagée du joueur, ou None s'il n'existe pas"""
+        if self._joueurs is None and getattr(joueurs_table, 'indexee', False):
+            joueur = self._lus.get(joueur_id)
+            if joueur is None:
+                joueur_data = joueurs_table.get(doc_id=joueur_id)
+                if joueur_data is None:
+                    return None
+                joueur = self._lus[joueur_id] = Joueur.from_dict(joueur_data, id=joueur_id)
+            return joueur
+        return self._charger().get(joueur_id)
+
+    def get_all(self) -> List[Joueur]:
+        """Retourne tous les joueurs connus"""
+        return list(self._charger().values())
+
+    def vue(self, ordre: str) -> VueTriee:
+        """Tous les joueurs dans l'ordre d'un rapport ('alphabetique' ou 'classement')"""
+        if self._vues is None:
+            joueurs = list(self._charger().values())
+            self._vues = {nom: VueTriee(cle, joueurs) for nom, cle in ORDRES.items()}
+        return self._vues[ordre]
+
+    def index(self) -> IndexJoueurs:
+        """Index de recherche des joueurs, construit à la première recherche puis tenu à jour"""
+        if self._index is None:
+            self._index = IndexJoueurs(self._charger().values())
+        return self._index
+
+    def rechercher(self, texte: str, limite: int = 20) -> List[Joueur]:
+        """Joueurs dont le nom ou le prénom commence par le texte, ou en est proche (fautes de frappe)"""
+        if texte.strip().isdigit():
+            joueur = self.get(int(texte))
+            return [joueur] if joueur is not None else []
+        return self.index().rechercher(texte, limite)
+
+    def par_classement(self, minimum: Optional[int] = None, maximum: Optional[int] = None,
+                       limite: Optional[int] = None) -> List[Joueur]:
+        """Joueurs classés entre ``minimum`` et ``maximum`` inclus, du meilleur au moins bon"""
+        return par_classement(self.vue('classement'), minimum, maximum, limite)
+
+    def vue_inscrits(self, ordre: str, ids: List[int]) -> VueInscrits:
+        """Vue triée d'une liste d'ids, suivie par le dépôt tant qu'elle est utilisée"""
+        vue = VueInscrits(ORDRES[ordre], ids, self.get, self.generation)
+        self._vues_inscrits.add(vue)
+        return vue
+
+    def _propager(self, joueur_id: int, joueur: Optional[Joueur]):
+        """Replace (ou retire) un joueur dans les vues triées et l'index qui le contiennent"""
+        if self._index is not None:
+            if joueur is None:
+                self._index.retirer(joueur_id)
+            else:
+                self._index.ajouter(joueur)
+        for vue in (self._vues or {}).values():
+            if joueur is None:
+                vue.retirer(joueur_id)
+            else:
+                vue.ajouter(joueur)
+        for vue in list(self._vues_inscrits):
+            if joueur_id in vue:
+                if joueur is None:
+                    vue.retirer(joueur_id)
+                else:
+                    vue.mettre_a_jour(joueur)
+
+    def enregistrer(self, joueur: Joueur):
+        """Remplace l'entrée du joueur par l'instance qui vient d'être sauvegardée"""
+        if self._joueurs is not None:
+            self._joueurs[joueur.id] = joueur
+        else:
+            self._lus[joueur.id] = joueur
+        self._propager(joueur.id, joueur)
+
+    def enregistrer_multiple(self, joueurs: Iterable[Joueur]):
+        """Comme ``enregistrer``, pour un lot de joueurs sauvegardés ensemble"""
+        joueurs = list(joueurs)
+        if len(joueurs) > SEUIL_RECONSTRUCTION:
+            # Retrier au prochain rapport coûte moins que déplacer les joueurs un par un
+            self._vues = None
+            self._index = None
+        if self._vues is None and self._index is None and not self._vues_inscrits:
+            connus = self._joueurs if self._joueurs is not None else self._lus
+            connus.update((joueur.id, joueur) for joueur in joueurs)
+            return
+        for joueur in joueurs:
+            self.enregistrer(joueur)
+
+    def invalider(self, joueur_id: Optional[int] = None):
+        """Oublie un joueur (ou tout le dépôt) pour forcer une relecture de la table"""
+        if joueur_id is None:
+            self._joueurs = None
+            self._lus = {}
+            self._vues = None
+            self._index = None
+            self.generation += 1
+            return
+        self._lus.pop(joueur_id, None)
+        if self._joueurs is not None:
+            self._joueurs.pop(joueur_id, None)
+            joueur_data = joueurs_table.get(doc_id=joueur_id)
+            if joueur_data is not None:
+                self._joueurs[joueur_id] = Joueur.from_dict(joueur_data, id=joueur_id)
+        if self._vues is not None or self._index is not None or any(joueur_id in vue for vue in self._vues_inscrits):
+            self._propager(joueur_id, self.get(joueur_id))
+
+    def oublier(self, joueur_ids: Iterable[Optional[int]], relire: bool = False):
+        """Oublie des joueurs modifiés par un autre processus (None : toute la table).
+
+        Chaque joueur relu coûte une lecture de la table : au-delà de SEUIL_INVALIDATION joueurs,
+        tout le dépôt est oublié d'un coup. Avec ``relire``, un dépôt déjà chargé est aussitôt relu
+        puis remplacé d'un bloc : un autre thread continue de lire l'ancien pendant ce temps.
+        """
+        joueur_ids = list(joueur_ids)
+        if None not in joueur_ids and len(joueur_ids) <= SEUIL_INVALIDATION:
+            for joueur_id in joueur_ids:
+                self.invalider(joueur_id)
+        elif relire and self._joueurs is not None:
+            with chronometre('deserialisation.joueurs'):
+                joueurs = {item.doc_id: Joueur.from_dict(item, id=item.doc_id) for item in joueurs_table.all()}
+            self._joueurs, self._lus, self._vues, self._index = joueurs, {}, None, None
+            self.generation += 1
+        else:
+            self.invalider()
+
+
+depot_joueurs = DepotJoueurs()
+
+
+# Codes de résultat, stockés sur un octet par partie
+RESULTATS_CODES = {None: ord('0'), (1, 0): ord('1'), (0, 1): ord('2'), (0.5, 0.5): ord('3')}
+CODES_RESULTATS = {code: resultat for resultat, code in RESULTATS_CODES.items()}
+EXEMPT = 0  # Id des noirs pour un bye (les ids de la base commencent à 1)
+
+
 class Match:
-    def __init__(self, joueur1: 'Joueur', joueur2: 'Joueur'):
+    __slots__ = ('joueur1', 'joueur2', '_resultat', 'tour', 'echiquier')
+
+    def __init__(self, joueur1: 'Joueur', joueur2: Optional['Joueur']):
         self.joueur1 = joueur1
         self.joueur2 = joueur2
-        self.resultat = None  # (1, 0) victoire j1, (0, 1) victoire j2, (0.5, 0.5) nul
+        self._resultat = None  # (1, 0) victoire j1, (0, 1) victoire j2, (0.5, 0.5) nul
+        self.tour: Optional[Tour] = None  # Tour dont les colonnes portent le match, une fois ajouté
+        self.echiquier: Optional[int] = None
+
+    @property
+    def resultat(self) -> Optional[Tuple[float, float]]:
+        if self.tour is not None:
+            return CODES_RESULTATS[self.tour.codes[self.echiquier]]
+        return self._resultat
+
+    @resultat.setter
+    def resultat(self, resultat: Optional[Tuple[float, float]]):
+        if resultat is not None:
+            resultat = tuple(resultat)
+        if resultat not in RESULTATS_CODES:
+            raise ValueError(f"Résultat invalide : {resultat}")
+        if self.tour is not None:
+            self.tour.codes[self.echiquier] = RESULTATS_CODES[resultat]
+            self.tour.modifie()
+        self._resultat = resultat
 
     def __str__(self):
+        if self.joueur2 is None:
+            return f"{self.joueur1.prenom} {self.joueur1.nom_famille} exempt"
         score = "vs"
         if self.resultat:
             score = f"{self.resultat[0]}-{self.resultat[1]}"
@@ -82,42 +438,142 @@ class Match:
 
 
 class Tour:
+    """Un tour, stocké en colonnes : id des blancs, id des noirs et code de résultat par échiquier.
+
+    La forme sérialisée du tour est gardée jusqu'à sa prochaine modification : un tournoi
+    ne resérialise que ses tours modifiés. Qui modifie directement les colonnes ou les dates
+    doit appeler ``modifie()``.
+    """
+
+    __slots__ = ('nom', 'debut', 'fin', 'blancs', 'noirs', 'codes', '_document')
+
     def __init__(self, nom: str):
         self.nom = nom
         self.debut = datetime.now()
         self.fin: Optional[datetime] = None
-        self.matches: List[Match] = []
+        self.blancs = array('l')
+        self.noirs = array('l')
+        self.codes = bytearray()
+        self._document: Optional[Dict[str, Any]] = None
+
+    def modifie(self):
+        """Oublie la forme sérialisée du tour après une modification"""
+        self._document = None
+
+    @mesure('serialisation.tour')
+    def to_dict(self) -> Dict[str, Any]:
+        """Convertit le tour en dictionnaire pour stockage, colonnes comprises (à ne pas modifier)"""
+        if self._document is None:
+            self._document = {
+                'nom': self.nom,
+                'debut': self.debut.isoformat() if self.debut else None,
+                'fin': self.fin.isoformat() if self.fin else None,
+                'blancs': self.blancs.tolist(),
+                'noirs': self.noirs.tolist(),
+                'resultats': self.codes.decode('ascii')
+            }
+        return self._document
+
+    @classmethod
+    @mesure('deserialisation.tour')
+    def from_dict(cls, data: Dict[str, Any]) -> 'Tour':
+        """Crée un tour à partir d'un dictionnaire (colonnes, ou ancienne liste de matches)"""
+        tour = cls(data['nom'])
+        if data['debut']:
+            tour.debut = datetime.fromisoformat(data['debut'])
+        if data['fin']:
+            tour.fin = datetime.fromisoformat(data['fin'])
+
+        if 'resultats' in data:
+            tour.blancs = array('l', data['blancs'])
+            tour.noirs = array('l', data['noirs'])
+            tour.codes = bytearray(data['resultats'], 'ascii')
+            tour._document = data  # Le tour relu est identique au document stocké
+        else:
+            for match_data in data['matches']:
+                resultat = match_data['resultat']
+                tour.blancs.append(match_data['joueur1_id'])
+                tour.noirs.append(match_data['joueur2_id'] or EXEMPT)
+                tour.codes.append(RESULTATS_CODES[tuple(resultat) if resultat else None])
+        return tour
+
+    @property
+    def matches(self) -> List[Match]:
+        """Matches du tour, reconstruits à partir des colonnes"""
+        return [self.match(echiquier) for echiquier in range(len(self.codes))]
+
+    def match(self, echiquier: int) -> Match:
+        """Match joué sur un échiquier ; modifier son résultat met à jour les colonnes"""
+        noir = self.noirs[echiquier]
+        match = Match(depot_joueurs.get(self.blancs[echiquier]), depot_joueurs.get(noir) if noir != EXEMPT else None)
+        match.tour = self
+        match.echiquier = echiquier
+        return match
 
     def ajouter_match(self, match: Match):
-        self.matches.append(match)
+        self.blancs.append(match.joueur1.id)
+        self.noirs.append(match.joueur2.id if match.joueur2 is not None else EXEMPT)
+        self.codes.append(RESULTATS_CODES[match.resultat])
+        self._document = None
+        match.tour = self
+        match.echiquier = len(self.codes) - 1
 
     def terminer_tour(self):
         self.fin = datetime.now()
+        self._document = None
+
+    def mettre_a_jour_classements(self):
+        """Applique aux classements des joueurs les variations Elo des parties de ce tour"""
+        parties = [(match.joueur1.id, match.joueur2.id, match.resultat[0]) for match in self.matches
+                   if match.joueur2 is not None and match.resultat is not None]
+        joueurs = {match.joueur1.id: match.joueur1 for match in self.matches}
+        joueurs.update({match.joueur2.id: match.joueur2 for match in self.matches if match.joueur2 is not None})
+        classements = {joueur_id: joueur.classement for joueur_id, joueur in joueurs.items()}
+        for joueur_id, variation in variations_elo(parties, classements).items():
+            joueur = joueurs[joueur_id]
+            joueur.classement = max(1, round(joueur.classement + variation))
+            joueur.save()
 
     def __str__(self):
-        return f"{self.nom} - {len(self.matches)} matches"
+        return f"{self.nom} - {len(self.codes)} matches"
 
 
 class Tournoi:
     CONTROLES_TEMPS = ["bullet", "blitz", "rapide"]
+    SYSTEMES = ["suisse", "toutes_rondes", "aller_retour"]  # Toutes rondes : calendrier fixé au premier tour
 
     def __init__(self, nom: str, lieu: str, date_debut: str, date_fin: str, nb_tours: int = 4,
-                 controle_temps: str = "bullet", description: str = "", id: Optional[int] = None):
+                 controle_temps: str = "bullet", description: str = "", id: Optional[int] = None,
+                 systeme: str = "suisse"):
         self.nom = nom
         self.lieu = lieu
         self.date_debut = date_debut
         self.date_fin = date_fin
         self.nb_tours = nb_tours
-        self.tours: List[Tour] = []
+        self._tours: Optional[List[Tour]] = []  # None tant qu'un tournoi chargé en en-tête n'est pas ouvert
+        self._nb_tours_joues = 0
         self.joueurs: List[int] = []  # Liste des IDs des joueurs
+        self._scores: Optional[ScoresTournoi] = ScoresTournoi()
         self.id = id
+        self.version = 0  # Version du document lu, vérifiée à l'écriture
+        self._vues: Dict[str, VueInscrits] = {}  # Inscrits triés pour les rapports
+        self._historique: Optional[HistoriqueTournoi] = None  # Qui a joué qui, complété à chaque tour
+        self._document: Optional[Dict[str, Any]] = None  # Dernière version lue ou écrite dans la base
+        self._calendrier_serialise: Optional[Tuple[List[Tuple[array, array]], List[Dict[str, Any]]]] = None
 
         if controle_temps.lower() not in self.CONTROLES_TEMPS:
             raise ValueError(f"Le contrôle du temps doit être parmi : {', '.join(self.CONTROLES_TEMPS)}")
         self.controle_temps = controle_temps.lower()
 
+        if systeme.lower() not in self.SYSTEMES:
+            raise ValueError(f"Le système doit être parmi : {', '.join(self.SYSTEMES)}")
+        self.systeme = systeme.lower()
+        # Toutes rondes : (blancs, noirs) de chaque ronde, établis une fois pour tout le tournoi
+        self.calendrier: Optional[List[Tuple[array, array]]] = None
+
         self.description = description
 
+    @mesure('serialisation.tournoi')
     def to_dict(self) -> Dict[str, Any]:
         """Convertit le tournoi en dictionnaire pour stockage"""
         return {
@@ -128,26 +584,34 @@ class Tournoi:
             'nb_tours': self.nb_tours,
             'controle_temps': self.controle_temps,
             'description': self.description,
-            'joueurs': self.joueurs,
-            'tours': [
-                {
-                    'nom': tour.nom,
-                    'debut': tour.debut.isoformat() if tour.debut else None,
-                    'fin': tour.fin.isoformat() if tour.fin else None,
-                    'matches': [
-                        {
-                            'joueur1_id': match.joueur1.id,
-                            'joueur2_id': match.joueur2.id,
-                            'resultat': match.resultat
-                        } for match in tour.matches
-                    ]
-                } for tour in self.tours
-            ]
+            'joueurs': list(self.joueurs),
+            'tours': [tour.to_dict() for tour in self.tours],
+            'scores': self.scores.to_dict(),
+            'systeme': self.systeme,
+            'calendrier': self._serialiser_calendrier()
         }
 
+    def _serialiser_calendrier(self) -> Optional[List[Dict[str, Any]]]:
+        """Calendrier en listes, converti une seule fois (il ne change plus une fois établi)"""
+        if self.calendrier is None:
+            return None
+        if self._calendrier_serialise is None or self._calendrier_serialise[0] is not self.calendrier:
+            self._calendrier_serialise = (self.calendrier, [{'blancs': blancs.tolist(), 'noirs': noirs.tolist()}
+                                                            for blancs, noirs in self.calendrier])
+        return self._calendrier_serialise[1]
+
     @classmethod
+    @mesure('deserialisation.tournoi')
     def from_dict(cls, data: Dict[str, Any], id: Optional[int] = None) -> 'Tournoi':
         """Crée une instance de Tournoi à partir d'un dictionnaire"""
+        tournoi = cls.from_entete(data, id=id)
+        tournoi._charger_tours(data)
+        return tournoi
+
+    @classmethod
+    @mesure('deserialisation.entete')
+    def from_entete(cls, data: Dict[str, Any], id: Optional[int] = None) -> 'Tournoi':
+        """Crée un tournoi léger : les tours ne seront relus de la base qu'au premier accès"""
         tournoi = cls(
             nom=data['nom'],
             lieu=data['lieu'],
@@ -156,66 +620,167 @@ class Tournoi:
             nb_tours=data['nb_tours'],
             controle_temps=data['controle_temps'],
             description=data['description'],
-            id=id
+            id=id,
+            systeme=data.get('systeme', 'suisse')
         )
-        tournoi.joueurs = data['joueurs']
-
-        # Récupération des joueurs
-        joueurs_dict = {j.doc_id: j for j in joueurs_table.all()}
-
-        # Reconstruction des tours et matches
-        for tour_data in data.get('tours', []):
-            tour = Tour(tour_data['nom'])
-            if tour_data['debut']:
-                tour.debut = datetime.fromisoformat(tour_data['debut'])
-            if tour_data['fin']:
-                tour.fin = datetime.fromisoformat(tour_data['fin'])
-
-            for match_data in tour_data['matches']:
-                joueur1_data = joueurs_dict[match_data['joueur1_id']]
-                joueur2_data = joueurs_dict[match_data['joueur2_id']]
-                joueur1 = Joueur.from_dict(joueur1_data, match_data['joueur1_id'])
-                joueur2 = Joueur.from_dict(joueur2_data, match_data['joueur2_id'])
-                match = Match(joueur1, joueur2)
-                match.resultat = match_data['resultat']
-                tour.matches.append(match)
-
-            tournoi.tours.append(tour)
-
+        if data.get('calendrier') is not None:
+            tournoi.calendrier = [(array('l', ronde['blancs']), array('l', ronde['noirs']))
+                                  for ronde in data['calendrier']]
+        tournoi.joueurs = list(data['joueurs'])
+        tournoi._tours = None
+        tournoi._nb_tours_joues = data['nb_tours_joues'] if 'nb_tours_joues' in data else len(data.get('tours', []))
+        tournoi.version = data.get('version', 0)
+        tournoi._scores = ScoresTournoi.from_dict(data['scores']) if 'scores' in data else None
+        tournoi._document = data
         return tournoi
 
+    def _charger_tours(self, data: Dict[str, Any]):
+        """Reconstruit les tours à partir du document stocké"""
+        self._tours = [Tour.from_dict(tour_data) for tour_data in data.get('tours', [])]
+        self._historique = None
+
+    @property
+    def tours(self) -> List[Tour]:
+        """Tours du tournoi, relus de la base au premier accès pour un tournoi chargé en en-tête"""
+        if self._tours is None:
+            self._charger_tours(tournois_table.get(doc_id=self.id))
+        return self._tours
+
+    @tours.setter
+    def tours(self, tours: List[Tour]):
+        self._tours = tours
+        self._historique = None
+
+    @property
+    def historique(self) -> HistoriqueTournoi:
+        """Adversaires, couleurs et byes des joueurs, construits une fois puis complétés par ``ajouter_tour``"""
+        if self._historique is None:
+            historique = HistoriqueTournoi()
+            for tour in self.tours:
+                historique.ajouter_tour(tour.blancs, tour.noirs)
+            self._historique = historique
+        return self._historique
+
+    def ajouter_tour(self, tour: Tour):
+        """Ajoute un tour apparié au tournoi"""
+        self.tours.append(tour)
+        if self._historique is not None:
+            self._historique.ajouter_tour(tour.blancs, tour.noirs)
+
+    @property
+    def nb_tours_joues(self) -> int:
+        """Nombre de tours joués, connu sans charger les tours"""
+        return len(self._tours) if self._tours is not None else self._nb_tours_joues
+
+    @property
+    def scores(self) -> ScoresTournoi:
+        """Scores du tournoi, recalculés depuis les tours s'ils n'ont pas été stockés"""
+        if self._scores is None:
+            tours_termines = sum(1 for tour in self.tours if tour.fin is not None)
+            self._scores = ScoresTournoi.calculer(self.parties(), self.joueurs, tours_termines)
+        return self._scores
+
+    @scores.setter
+    def scores(self, scores: ScoresTournoi):
+        self._scores = scores
+
     def save(self) -> int:
         """Sauvegarde le tournoi dans la base de données"""
+        with unite_de_travail() as unite:
+            if self.id is None:
+                return self.ecrire()
+            unite.marquer(self)
+            return self.id
+
+    @mesure('tournoi.ecriture')
+    def ecrire(self) -> int:
+        """Écrit immédiatement le tournoi dans la base de données.
+
+        Seuls les champs qui diffèrent de la dernière version lue ou écrite sont envoyés ; les
+        tours inchangés gardent leur forme sérialisée et ne sont ni reconvertis ni réécrits.
+        Lève ConflitVersion si un autre processus l'a enregistré depuis sa lecture.
+        """
+        data = self.to_dict()
+        data['version'] = self.version + 1
         if self.id is None:
-            self.id = tournois_table.insert(self.to_dict())
+            self.id = tournois_table.insert(data)
         else:
-            tournois_table.update(self.to_dict(), doc_ids=[self.id])
+            connu = self._document or {}
+            champs = {cle: valeur for cle, valeur in data.items()
+                      if cle not in connu or (connu[cle] is not valeur and connu[cle] != valeur)}
+            tournois_table.update(champs, doc_ids=[self.id])
+        self.version += 1
+        self._document = data
+        depot_confrontations.enregistrer(self)
+        for index in list(index_ouverts):
+            index.mettre_a_jour(self)
         return self.id
 
+    def recharger(self):
+        """Relit le tournoi depuis la base, avec les modifications des autres arbitres"""
+        with unite_de_travail():
+            data = tournois_table.get(doc_id=self.id)
+        self.__dict__.update(Tournoi.from_dict(data, id=self.id).__dict__)
+
+    def modifier(self, operation: Callable[[], T]) -> T:
+        """Applique une modification du tournoi et l'enregistre en une seule écriture.
+
+        Si un autre arbitre a enregistré le tournoi entre-temps, le tournoi est relu et
+        l'opération rejouée sur sa dernière version : aucune des deux saisies n'est perdue.
+        """
+        for essai in range(ESSAIS_CONFLIT):
+            try:
+                with unite_de_travail():
+                    resultat = operation()
+                    self.save()
+                return resultat
+            except ConflitVersion:
+                if essai == ESSAIS_CONFLIT - 1:
+                    raise
+                self.recharger()
+
+    @classmethod
+    def get(cls, tournoi_id: int) -> Optional['Tournoi']:
+        """Récupère un tournoi par son identifiant"""
+        data = tournois_table.get(doc_id=tournoi_id)
+        return cls.from_dict(data, id=tournoi_id) if data is not None else None
+
     @classmethod
     def get_all(cls) -> List['Tournoi']:
         """Récupère tous les tournois de la base de données"""
         return [cls.from_dict(item, id=item.doc_id) for item in tournois_table.all()]
 
+    @classmethod
+    def get_entetes(cls) -> List['Tournoi']:
+        """Récupère tous les tournois sans leurs tours, chargés à la demande"""
+        entetes = getattr(tournois_table, 'entetes', tournois_table.all)  # Sans lire les tours si la base le permet
+        return [cls.from_entete(item, id=item.doc_id) for item in entetes()]
+
     def get_joueurs_objets(self) -> List[Joueur]:
         """Récupère les objets Joueur à partir des IDs stockés"""
         joueurs_objets = []
-        all_joueurs = {j.doc_id: j for j in joueurs_table.all()}
         for joueur_id in self.joueurs:
-            if joueur_id in all_joueurs:
-                joueur_data = all_joueurs[joueur_id]
-                joueurs_objets.append(Joueur.from_dict(joueur_data, id=joueur_id))
+            joueur = depot_joueurs.get(joueur_id)
+            if joueur is not None:
+                joueurs_objets.append(joueur)
         return joueurs_objets
 
+    def vue_joueurs(self, ordre: str) -> VueInscrits:
+        """Joueurs du tournoi dans l'ordre d'un rapport, triés une fois puis tenus à jour"""
+        vue = self._vues.get(ordre)
+        if vue is None or vue.ids is not self.joueurs or vue.generation != depot_joueurs.generation:
+            vue = self._vues[ordre] = depot_joueurs.vue_inscrits(ordre, self.joueurs)
+        else:
+            vue.rattraper(depot_joueurs.get)
+        return vue
+
     def liste_joueurs_alphabetique(self) -> List[Joueur]:
         """Retourne la liste des joueurs du tournoi par ordre alphabétique"""
-        joueurs = self.get_joueurs_objets()
-        return sorted(joueurs, key=lambda j: (j.nom_famille.lower(), j.prenom.lower()))
+        return self.vue_joueurs('alphabetique').liste()
 
     def liste_joueurs_classement(self) -> List[Joueur]:
         """Retourne la liste des joueurs du tournoi par classement"""
-        joueurs = self.get_joueurs_objets()
-        return sorted(joueurs, key=lambda j: j.classement, reverse=True)
+        return self.vue_joueurs('classement').liste()
 
     def liste_tours(self) -> List[Tour]:
         """Retourne la liste de tous les tours du tournoi"""
@@ -228,91 +793,255 @@ class Tournoi:
             matches.extend(tour.matches)
         return matches
 
+    def parties(self) -> List[Partie]:
+        """Retourne les parties dont le résultat est connu, sous forme de tuples"""
+        parties = []
+        for numero, tour in enumerate(self.tours, 1):
+            for blanc, noir, code in zip(tour.blancs, tour.noirs, tour.codes):
+                resultat = CODES_RESULTATS[code]
+                if resultat is None:
+                    continue
+                parties.append((numero, blanc, noir if noir != EXEMPT else None, resultat[0], resultat[1]))
+        return parties
+
+    def enregistrer_resultat(self, match: Match, resultat: Tuple[float, float]):
+        """Enregistre le résultat d'une partie et met à jour les scores du tournoi"""
+        if not self.scores.adversaires_connus:
+            self.scores.reconstruire_adversaires(self.parties())
+        noir = match.joueur2.id if match.joueur2 is not None else None
+        tours_termines = 0
+        if match.resultat is not None:
+            # Correction : le progressif des tours terminés depuis cette partie change aussi
+            for numero, tour in enumerate(self.tours):
+                if tour is match.tour:
+                    tours_termines = sum(1 for t in self.tours[numero:] if t.fin is not None)
+                    break
+            self.scores.retirer(match.joueur1.id, noir, *match.resultat, tours_termines=tours_termines)
+        match.resultat = resultat
+        self.scores.enregistrer(match.joueur1.id, noir, *resultat, tours_termines=tours_termines)
+
     def __str__(self):
         return f"Tournoi {self.nom} à {self.lieu} ({self.date_debut} - {self.date_fin})"
 
     def ajouter_joueur(self, joueur: Joueur):
         """Ajoute un joueur au tournoi"""
-        if len(self.joueurs) < 8:
-            if joueur.id not in self.joueurs:
-                self.joueurs.append(joueur.id)
-                self.save()
-                print(f"✅ Joueur ajouté au tournoi : {joueur}")
-        else:
-            print("⚠️ Maximum de 8 joueurs atteint.")
+        def operation() -> bool:
+            if joueur.id in self.joueurs:
+                return False
+            if self.calendrier is not None:
+                raise ValueError("Le calendrier du tournoi est établi : plus aucun joueur ne peut s'inscrire.")
+            self.joueurs.append(joueur.id)
+            return True
+
+        if self.modifier(operation):
+            print(f"✅ Joueur ajouté au tournoi : {joueur}")
+
+    def etablir_calendrier(self) -> List[Tuple[array, array]]:
+        """Calendrier complet d'un tournoi toutes rondes, établi au premier tour d'après la table de Berger.
+
+        Les places suivent l'ordre d'inscription ; le nombre de tours devient celui des rondes.
+        """
+        if self.calendrier is None:
+            places = [EXEMPT] + self.joueurs + [EXEMPT]  # Place fictive n + 1 : bye
+            self.calendrier = [(array('l', (places[blanc] for blanc, _ in ronde)),
+                                array('l', (places[noir] for _, noir in ronde)))
+                               for ronde in table_berger(len(self.joueurs), self.systeme == 'aller_retour')]
+            self.nb_tours = len(self.calendrier)
+        return self.calendrier
+
+    def _paires_calendrier(self) -> List[Tuple[Joueur, Optional[Joueur]]]:
+        """Paires de la ronde suivante, lues dans le calendrier ; le bye éventuel en dernier"""
+        numero = len(self.tours)
+        if numero >= len(self.etablir_calendrier()):
+            return []
+        paires: List[Tuple[Joueur, Optional[Joueur]]] = []
+        exempt = None
+        for blanc, noir in zip(*self.calendrier[numero]):
+            if EXEMPT in (blanc, noir):
+                exempt = depot_joueurs.get(blanc or noir)
+            else:
+                paires.append((depot_joueurs.get(blanc), depot_joueurs.get(noir)))
+        if exempt is not None:
+            paires.append((exempt, None))
+        return paires
+
+    @mesure('appariement')
+    def generer_paires(self) -> List[Tuple[Joueur, Optional[Joueur]]]:
+        """Génère les paires de joueurs pour un tour (système suisse, ou ronde suivante du calendrier).
+
+        Le premier joueur de chaque paire a les blancs. Si le nombre de joueurs est impair,
+        le joueur exempt figure en dernier, associé à None.
+        """
+        if self.systeme != 'suisse':
+            return self._paires_calendrier() if len(self.joueurs) >= 2 else []
+
+        joueurs = {joueur.id: joueur for joueur in self.get_joueurs_objets()}
 
-    def generer_paires(self) -> List[tuple]:
-        """Génère les paires de joueurs pour un tour"""
-        joueurs = self.get_joueurs_objets()
-        
         if len(joueurs) < 2:
             return []
-        
-        joueurs_tries = sorted(joueurs, key=lambda j: j.points, reverse=True)
-        random.shuffle(joueurs_tries)
-        
-        # Générer les paires en prenant 2 joueurs à la fois
-        paires = []
-        for i in range(0, len(joueurs_tries) - 1, 2):
-            paires.append((joueurs_tries[i], joueurs_tries[i + 1]))
-        
-        return paires
+
+        historique = self.historique
+        etats = [EtatJoueur(joueur_id, score=self.scores.points.get(joueur_id, 0), classement=joueur.classement,
+                            adversaires=historique.adversaires.get(joueur_id, set()),
+                            couleurs=historique.couleurs.get(joueur_id, ''), exempte=joueur_id in historique.exemptes)
+                 for joueur_id, joueur in joueurs.items()]
+
+        paires, exempt = apparier(etats)
+        resultat: List[Tuple[Joueur, Optional[Joueur]]] = [(joueurs[blanc], joueurs[noir]) for blanc, noir in paires]
+        if exempt is not None:
+            resultat.append((joueurs[exempt], None))
+        return resultat
+
+    @property
+    def tour_en_cours(self) -> Optional[Tour]:
+        """Dernier tour s'il a été apparié mais pas encore terminé"""
+        if self.tours and self.tours[-1].fin is None:
+            return self.tours[-1]
+        return None
+
+    def commencer_tour(self) -> Optional[Tour]:
+        """Apparie le tour suivant et l'enregistre sans résultats (le bye est compté d'office).
+
+        Si un autre arbitre a apparié ce tour entre-temps, c'est son tour qui est retourné.
+        """
+        def operation() -> Optional[Tour]:
+            if self.tour_en_cours is not None:
+                return self.tour_en_cours
+            paires = self.generer_paires()
+            if not paires:
+                return None
+
+            tour = Tour(f"Tour {len(self.tours) + 1}")
+            for j1, j2 in paires:
+                match = Match(j1, j2)
+                tour.ajouter_match(match)
+                if j2 is None:
+                    # Le joueur exempt marque le point du bye
+                    self.enregistrer_resultat(match, (1, 0))
+            self.ajouter_tour(tour)
+            return tour
+
+        return self.modifier(operation)
+
+    def _verifier_resultats(self, resultats: Dict[int, Tuple[float, float]], complet: bool) -> Tour:
+        """Vérifie des résultats du tour en cours et retourne ce tour.
+
+        Lève une ValueError qui liste tous les problèmes ; avec ``complet``, tous les
+        échiquiers encore sans résultat doivent être renseignés.
+        """
+        tour = self.tour_en_cours
+        if tour is None:
+            raise ValueError("Aucun tour en cours pour ce tournoi.")
+
+        erreurs = []
+        for echiquier, resultat in resultats.items():
+            if not 0 <= echiquier < len(tour.codes):
+                erreurs.append(f"Échiquier {echiquier + 1} : n'existe pas dans le {tour.nom}")
+            elif resultat is None or tuple(resultat) not in RESULTATS_CODES:
+                erreurs.append(f"Échiquier {echiquier + 1} : résultat invalide {resultat}")
+            elif tour.noirs[echiquier] == EXEMPT and tuple(resultat) != (1, 0):
+                erreurs.append(f"Échiquier {echiquier + 1} : un bye vaut toujours 1-0")
+        if complet:
+            for echiquier, code in enumerate(tour.codes):
+                if code == RESULTATS_CODES[None] and echiquier not in resultats:
+                    erreurs.append(f"Échiquier {echiquier + 1} : résultat manquant")
+        if erreurs:
+            raise ValueError("\n".join(erreurs))
+        return tour
+
+    def _appliquer_resultats(self, tour: Tour, resultats: Dict[int, Tuple[float, float]]):
+        for echiquier, resultat in resultats.items():
+            if tour.codes[echiquier] != RESULTATS_CODES[tuple(resultat)]:
+                self.enregistrer_resultat(tour.match(echiquier), tuple(resultat))
+
+    def saisir_resultats(self, resultats: Dict[int, Tuple[float, float]]):
+        """Enregistre les résultats de quelques échiquiers du tour en cours, sans le terminer.
+
+        Plusieurs arbitres peuvent saisir en même temps les résultats d'échiquiers différents :
+        chaque saisie est rejouée sur la dernière version du tournoi en cas de conflit.
+        """
+        self._verifier_resultats(resultats, complet=False)
+
+        def operation():
+            self._appliquer_resultats(self._verifier_resultats(resultats, complet=False), resultats)
+
+        self.modifier(operation)
+
+    def cloturer_tour(self, resultats: Dict[int, Tuple[float, float]]):
+        """Enregistre d'un bloc les résultats du tour en cours, puis le termine.
+
+        ``resultats`` associe l'index d'un échiquier (à partir de 0) à son résultat. Tous les
+        échiquiers encore sans résultat doivent être renseignés. Les résultats sont vérifiés
+        avant toute modification : en cas d'erreur, une ValueError liste les problèmes et
+        rien n'est enregistré. Sinon, le tour est écrit en une seule fois.
+        """
+        self._verifier_resultats(resultats, complet=True)
+
+        def operation():
+            tour = self._verifier_resultats(resultats, complet=True)
+            self._appliquer_resultats(tour, resultats)
+            tour.terminer_tour()
+            self.scores.terminer_tour(self.joueurs)
+            tour.mettre_a_jour_classements()
+
+        self.modifier(operation)
 
     def jouer_tour(self):
-        """Lance un tour de tournoi"""
-        tour_num = len(self.tours) + 1
-        print(f"\n=== Tour {tour_num} ===")
+        """Lance un tour de tournoi, ou reprend la saisie du tour en cours"""
+        tour = self.tour_en_cours
+        if tour is None:
+            print(f"\n=== Tour {len(self.tours) + 1} ===")
 
-        joueurs = self.get_joueurs_objets()
-        
-        if len(joueurs) < 2:
-            print("⚠️ Le tournoi doit avoir au moins 2 joueurs.")
-            return
+            joueurs = self.get_joueurs_objets()
 
-        tour = Tour(f"Tour {tour_num}")
-        paires = self.generer_paires()
+            if len(joueurs) < 2:
+                print("⚠️ Le tournoi doit avoir au moins 2 joueurs.")
+                return
 
-        if not paires:
-            print("⚠️ Impossible de générer des paires de joueurs.")
-            return
+            tour = self.commencer_tour()
+
+            if tour is None:
+                print("⚠️ Impossible de générer des paires de joueurs.")
+                return
+        else:
+            print(f"\n=== {tour.nom} (reprise de la saisie) ===")
 
-        for j1, j2 in paires:
-            print(f"\nPartie : {j1.prenom} {j1.nom_famille} vs {j2.prenom} {j2.nom_famille}")
+        resultats = {}
+        for match in tour.matches:
+            j1, j2 = match.joueur1, match.joueur2
+            if j2 is None:
+                print(f"\n{j1.prenom} {j1.nom_famille} est exempt ce tour-ci (1 point).")
+                continue
+            if match.resultat is not None:
+                continue
+
+            print(f"\nPartie : {j1.prenom} {j1.nom_famille} (blancs) vs {j2.prenom} {j2.nom_famille} (noirs)")
             print("Résultat : 1 = victoire du 1er | 2 = victoire du 2e | 0 = nul")
             res = input("→ Entrez le résultat : ")
 
-            match = Match(j1, j2)
-
             if res == "1":
-                j1.points += 1
-                match.resultat = (1, 0)
+                resultats[match.echiquier] = (1, 0)
             elif res == "2":
-                j2.points += 1
-                match.resultat = (0, 1)
+                resultats[match.echiquier] = (0, 1)
             elif res == "0":
-                j1.points += 0.5
-                j2.points += 0.5
-                match.resultat = (0.5, 0.5)
+                resultats[match.echiquier] = (0.5, 0.5)
             else:
                 print("Résultat invalide, partie comptée nulle.")
-                j1.points += 0.5
-                j2.points += 0.5
-                match.resultat = (0.5, 0.5)
-
-            tour.ajouter_match(match)
+                resultats[match.echiquier] = (0.5, 0.5)
 
-        tour.terminer_tour()
-        self.tours.append(tour)
-        self.save()
+        self.cloturer_tour(resultats)
         self.afficher_classement()
 
     def afficher_classement(self):
         """Affiche le classement actuel du tournoi"""
         print("\n🏁 Classement actuel :")
-        joueurs = self.get_joueurs_objets()
-        classement = sorted(joueurs, key=lambda j: j.points, reverse=True)
-        for i, j in enumerate(classement, 1):
-            print(f"{i}. {j.prenom} {j.nom_famille} - {j.points} pts")
+        for i, joueur_id in enumerate(self.scores.classer(self.joueurs), 1):
+            j = depot_joueurs.get(joueur_id)
+            if j is None:
+                continue
+            points, buchholz, sonneborn_berger, progressif = self.scores.cle(joueur_id)
+            print(f"{i}. {j.prenom} {j.nom_famille} - {points:g} pts "
+                  f"(Buchholz {buchholz:g}, S-B {sonneborn_berger:g}, progressif {progressif:g})")
 
     def tournoi_termine(self):
         """Termine le tournoi et affiche le classement final"""
@@ -321,37 +1050,112 @@ class Tournoi:
         self.save()
 
 
-class GestionnaireTournois:
+class DepotConfrontations:
+    """Bilans des face-à-face entre joueurs, calculés au premier besoin sur tous les tournois.
+
+    Chaque écriture d'un tournoi met à jour les bilans ; les tournois écrits par d'autres
+    processus sont relus à l'ouverture d'une unité de travail, comme les joueurs.
+    """
+
     def __init__(self):
+        self._confrontations: Optional[Confrontations] = None
+
+    @staticmethod
+    def _colonnes(data: Dict[str, Any]) -> List[Tuple[array, array, bytearray]]:
+        tours = [Tour.from_dict(tour_data) for tour_data in data.get('tours', [])]
+        return [(tour.blancs, tour.noirs, tour.codes) for tour in tours]
+
+    def get(self) -> Confrontations:
+        if self._confrontations is None:
+            confrontations = Confrontations()
+            for item in tournois_table.all():
+                confrontations.mettre_a_jour(item.doc_id, self._colonnes(item))
+            self._confrontations = confrontations
+        return self._confrontations
+
+    def bilan(self, joueur_id: int, adversaire_id: int) -> Tuple[int, int, int]:
+        """(gains, nulles, défaites) d'un joueur face à un autre, tous tournois confondus"""
+        return self.get().bilan(joueur_id, adversaire_id)
+
+    def enregistrer(self, tournoi: Tournoi):
+        """Prend en compte la version du tournoi qui vient d'être écrite"""
+        if self._confrontations is not None:
+            self._confrontations.mettre_a_jour(tournoi.id, [(tour.blancs, tour.noirs, tour.codes)
+                                                            for tour in tournoi.tours])
+
+    def invalider(self, tournoi_id: Optional[int] = None):
+        """Relit un tournoi modifié ailleurs (ou oublie tous les bilans)"""
+        if self._confrontations is None:
+            return
+        if tournoi_id is None:
+            self._confrontations = None
+            return
+        data = tournois_table.get(doc_id=tournoi_id)
+        self._confrontations.mettre_a_jour(tournoi_id, self._colonnes(data) if data is not None else [])
+
+
+depot_confrontations = DepotConfrontations()
+
+# Index des gestionnaires de tournois ouverts, tenus à jour à chaque sauvegarde d'un tournoi
+index_ouverts: 'WeakSet[IndexTournois]' = WeakSet()
+
+
+class GestionnaireTournois:
+    def __init__(self, paresseux: bool = True):
+        self.paresseux = paresseux  # Les tournois ne chargent leurs tours qu'à l'ouverture
         self.load_data()
 
     def load_data(self):
         """Charge les données depuis la base de données"""
-        self.tournois = Tournoi.get_all()
-        self.joueurs = Joueur.get_all()
+        self.tournois = Tournoi.get_entetes() if self.paresseux else Tournoi.get_all()
+        self.index = IndexTournois(self.tournois)
+        index_ouverts.add(self.index)
+        if not self.paresseux:
+            depot_joueurs.get_all()
+
+    @property
+    def joueurs(self) -> List[Joueur]:
+        """Tous les joueurs, lus au premier besoin plutôt qu'au démarrage"""
+        return depot_joueurs.get_all()
 
     def ajouter_joueur(self, joueur: Joueur):
         """Ajoute un joueur à la base de données"""
         joueur.save()
-        self.joueurs.append(joueur)
 
     def ajouter_tournoi(self, tournoi: 'Tournoi'):
         """Ajoute un tournoi à la base de données"""
         tournoi.save()
         self.tournois.append(tournoi)
+        self.index.ajouter(tournoi)
 
     def liste_joueurs_alphabetique(self) -> List[Joueur]:
         """Retourne la liste de tous les joueurs par ordre alphabétique"""
-        return sorted(self.joueurs, key=lambda j: (j.nom_famille.lower(), j.prenom.lower()))
+        return depot_joueurs.vue('alphabetique').liste()
 
     def liste_joueurs_classement(self) -> List[Joueur]:
         """Retourne la liste de tous les joueurs par classement"""
-        return sorted(self.joueurs, key=lambda j: j.classement, reverse=True)
+        return depot_joueurs.vue('classement').liste()
 
     def liste_tournois(self) -> List['Tournoi']:
         """Retourne la liste de tous les tournois"""
         return self.tournois
 
+    def rechercher_tournois(self, debut: Optional[str] = None, fin: Optional[str] = None,
+                            lieu: Optional[str] = None, controle_temps: Optional[str] = None,
+                            joueur_id: Optional[int] = None, limite: Optional[int] = None) -> List['Tournoi']:
+        """Tournois en cours entre ``debut`` et ``fin`` (AAAA-MM-JJ), à un lieu, pour un contrôle
+        du temps ou avec un joueur inscrit ; du plus récent au plus ancien"""
+        return self.index.rechercher(debut, fin, lieu, controle_temps, joueur_id, limite)
+
+    def tournois_en_cours(self, jour: Optional[str] = None) -> List['Tournoi']:
+        """Tournois qui se déroulent le jour donné (aujourd'hui par défaut)"""
+        jour = jour or date.today().isoformat()
+        return self.index.rechercher(debut=jour, fin=jour)
+
+    def tournois_du_joueur(self, joueur_id: int) -> List['Tournoi']:
+        """Tournois où le joueur est inscrit, du plus récent au plus ancien"""
+        return self.index.rechercher(joueur_id=joueur_id)
+
 
 def afficher_menu():
     print("\n=== MENU PRINCIPAL ===")
@@ -361,7 +1165,8 @@ def afficher_menu():
     print("4. Lancer une partie")
     print("5. Afficher les rapports")
     print("6. Quitter")
-    return input("Choix : ")
+    print("(préfixez le choix par p pour profiler l'action, par exemple p4)")
+    return input("Choix : ").strip()
 
 
 def menu_rapports(gestionnaire: GestionnaireTournois):
@@ -371,7 +1176,10 @@ def menu_rapports(gestionnaire: GestionnaireTournois):
         print("2. Liste des joueurs par classement")
         print("3. Liste de tous les tournois")
         print("4. Détails d'un tournoi spécifique")
-        print("5. Retour au menu principal")
+        print("5. Exporter un rapport (CSV, HTML ou JSON)")
+        print("6. Pronostics d'un tournoi en cours")
+        print("7. Face-à-face de deux joueurs")
+        print("8. Retour au menu principal")
 
         choix = input("Choix : ")
 
@@ -386,8 +1194,17 @@ def menu_rapports(gestionnaire: GestionnaireTournois):
                 print(f"- {joueur}")
 
         elif choix == "3":
+            tournois = gestionnaire.liste_tournois()
+            if len(tournois) > LIMITE_MENU:
+                texte = input(f"Filtrer ({AIDE_RECHERCHE} ; Entrée pour tous) : ")
+                try:
+                    if texte.strip():
+                        tournois = gestionnaire.rechercher_tournois(**lire_recherche(texte, Tournoi.CONTROLES_TEMPS))
+                except ValueError as e:
+                    print(f"⚠️ {e}")
+                    continue
             print("\nListe des tournois:")
-            for tournoi in gestionnaire.liste_tournois():
+            for tournoi in tournois:
                 print(f"- {tournoi}")
 
         elif choix == "4":
@@ -395,13 +1212,10 @@ def menu_rapports(gestionnaire: GestionnaireTournois):
                 print("Aucun tournoi disponible.")
                 continue
 
-            print("\nTournois disponibles:")
-            for i, tournoi in enumerate(gestionnaire.tournois, 1):
-                print(f"{i}. {tournoi.nom}")
-
             try:
-                choix_tournoi = int(input("Numéro du tournoi : ")) - 1
-                tournoi = gestionnaire.tournois[choix_tournoi]
+                tournoi = choisir_tournoi(gestionnaire)
+                if tournoi is None:
+                    continue
 
                 print(f"\nDétails du tournoi {tournoi.nom}:")
                 print("\nJoueurs par ordre alphabétique:")
@@ -422,12 +1236,155 @@ def menu_rapports(gestionnaire: GestionnaireTournois):
                 print("Choix invalide.")
 
         elif choix == "5":
+            exporter_rapport(gestionnaire)
+
+        elif choix == "6":
+            pronostics(gestionnaire)
+
+        elif choix == "7":
+            face_a_face()
+
+        elif choix == "8":
             break
 
 
+def exporter_rapport(gestionnaire: GestionnaireTournois):
+    """Exporte un rapport dans un fichier, écrit au fil de l'eau"""
+    print("\n1. Joueurs par ordre alphabétique")
+    print("2. Joueurs par classement")
+    print("3. Liste des tournois")
+    print("4. Joueurs d'un tournoi")
+    print("5. Tours et matches d'un tournoi")
+
+    try:
+        choix = input("Rapport : ")
+        if choix == "1":
+            rapport, titre = rapport_joueurs(depot_joueurs.vue('alphabetique')), "Joueurs"
+        elif choix == "2":
+            rapport, titre = rapport_joueurs(depot_joueurs.vue('classement')), "Joueurs par classement"
+        elif choix == "3":
+            rapport, titre = rapport_tournois(gestionnaire.tournois), "Tournois"
+        elif choix in ("4", "5"):
+            tournoi = choisir_tournoi(gestionnaire)
+            if tournoi is None:
+                return
+            if choix == "4":
+                rapport, titre = rapport_joueurs(tournoi.vue_joueurs('alphabetique')), f"Joueurs - {tournoi.nom}"
+            else:
+                rapport, titre = rapport_tours(tournoi), f"Tours - {tournoi.nom}"
+        else:
+            print("Choix invalide.")
+            return
+
+        chemin = input(f"Fichier de sortie ({'/'.join(FORMATS)}) : ")
+        nb_lignes = exporter_fichier(rapport, chemin, titre=titre)
+        print(f"✅ {nb_lignes} lignes exportées dans {chemin}.")
+    except (ValueError, IndexError) as e:
+        print(f"⚠️ Export impossible : {e}")
+    except OSError as e:
+        print(f"⚠️ Écriture impossible : {e}")
+
+
+def pronostics(gestionnaire: GestionnaireTournois):
+    """Chances de victoire et de prix de chaque joueur, par simulation des tours restants"""
+    if not gestionnaire.tournois:
+        print("Aucun tournoi disponible.")
+        return
+    try:
+        tournoi = choisir_tournoi(gestionnaire, lambda t: f" ({t.nb_tours_joues}/{t.nb_tours} tours)")
+        if tournoi is None:
+            return
+        nb_prix = int(input("Nombre de places de prix [3] : ") or 3)
+        etat = etat_depuis_tournoi(tournoi)
+        if len(etat.ids) < 2:
+            print("⚠️ Le tournoi doit avoir au moins 2 joueurs.")
+            return
+        print(f"Simulation de {etat.tours_restants} tour(s) restant(s)...")
+        resultat = simuler(etat)
+    except (ValueError, IndexError) as e:
+        print(f"⚠️ Pronostics impossibles : {e}")
+        return
+    print(f"\n🎲 Pronostics du tournoi {tournoi.nom} ({resultat.nb_simulations} simulations) :")
+    afficher_pronostics(resultat, {j.id: f"{j.prenom} {j.nom_famille}" for j in tournoi.get_joueurs_objets()}, nb_prix)
+
+
+def face_a_face():
+    """Affiche le bilan des rencontres entre deux joueurs, tous tournois confondus"""
+    try:
+        joueur = choisir_joueur()
+        adversaire = choisir_joueur() if joueur is not None else None
+    except (ValueError, IndexError):
+        print("Choix invalide.")
+        return
+    if adversaire is None:
+        return
+    gains, nulles, pertes = depot_confrontations.bilan(joueur.id, adversaire.id)
+    if not gains + nulles + pertes:
+        print(f"\n{joueur} et {adversaire} ne se sont jamais rencontrés.")
+        return
+    print(f"\n{joueur} contre {adversaire} : {gains} gain(s), {nulles} nulle(s), {pertes} défaite(s)")
+
+
+LIMITE_MENU = 20  # Au-delà, un menu ne propose que les tournois en cours ou à venir, ou ceux d'une recherche
+AIDE_RECHERCHE = "lieu, bullet/blitz/rapide, AAAA-MM-JJ[..AAAA-MM-JJ], semaine, #id d'un joueur"
+
+
+def choisir_tournoi(gestionnaire: GestionnaireTournois,
+                    details: Callable[['Tournoi'], str] = lambda tournoi: "") -> Optional['Tournoi']:
+    """Fait choisir un tournoi parmi les tournois en cours ou à venir (tous s'il y en a peu), ou parmi
+    ceux d'une recherche"""
+    if len(gestionnaire.tournois) <= LIMITE_MENU:
+        proposes, titre = gestionnaire.tournois, "Tournois disponibles"
+    else:
+        titre = "Tournois en cours ou à venir"
+        proposes = gestionnaire.rechercher_tournois(debut=date.today().isoformat())
+    while True:
+        print(f"\n{titre} :" if proposes else f"\n{titre} : aucun.")
+        for i, tournoi in enumerate(proposes[:LIMITE_MENU], 1):
+            print(f"{i}. {tournoi.nom} - {tournoi.lieu}, {tournoi.date_debut}{details(tournoi)}")
+        if len(proposes) > LIMITE_MENU:
+            print(f"... et {len(proposes) - LIMITE_MENU} autres : précisez la recherche.")
+        texte = input(f"Numéro du tournoi, ou recherche ({AIDE_RECHERCHE} ; Entrée pour annuler) : ").strip()
+        if not texte:
+            return None
+        if texte.isdigit():
+            if not 1 <= int(texte) <= min(len(proposes), LIMITE_MENU):
+                raise IndexError(texte)
+            return proposes[int(texte) - 1]
+        try:
+            proposes = gestionnaire.rechercher_tournois(**lire_recherche(texte, Tournoi.CONTROLES_TEMPS))
+        except ValueError as e:
+            print(f"⚠️ {e}")
+            continue
+        titre = f"Tournois pour « {texte} »"
+
+
+def choisir_joueur() -> Optional[Joueur]:
+    """Recherche un joueur par nom, prénom, id ou plage de classement ('1800-2000'), puis le fait choisir"""
+    while True:
+        texte = input("\nRechercher un joueur (nom, prénom, id ou classement min-max, Entrée pour annuler) : ")
+        if not texte.strip():
+            return None
+
+        minimum, tiret, maximum = texte.replace(' ', '').partition('-')
+        if tiret and minimum.isdigit() and maximum.isdigit():
+            resultats = depot_joueurs.par_classement(int(minimum), int(maximum), limite=20)
+        else:
+            resultats = depot_joueurs.rechercher(texte)
+        if not resultats:
+            print("Aucun joueur trouvé.")
+            continue
+
+        for i, joueur in enumerate(resultats, 1):
+            print(f"{i}. {joueur} [id {joueur.id}]")
+        choix = input("Numéro du joueur (Entrée pour une nouvelle recherche) : ")
+        if choix.strip():
+            return resultats[int(choix) - 1]
+
+
 def ajouter_joueur_au_tournoi(gestionnaire: GestionnaireTournois):
     """Ajoute un joueur existant à un tournoi"""
-    if not gestionnaire.joueurs:
+    if not len(joueurs_table):  # Compte sans charger les joueurs
         print("\n⚠️ Aucun joueur dans la base de données.")
         return
 
@@ -435,29 +1392,23 @@ def ajouter_joueur_au_tournoi(gestionnaire: GestionnaireTournois):
         print("\n⚠️ Aucun tournoi disponible.")
         return
 
-    print("\nJoueurs disponibles:")
-    for i, joueur in enumerate(gestionnaire.joueurs, 1):
-        print(f"{i}. {joueur}")
-
     try:
-        choix_joueur = int(input("Numéro du joueur : ")) - 1
-        joueur = gestionnaire.joueurs[choix_joueur]
-
-        print("\nTournois disponibles:")
-        for i, tournoi in enumerate(gestionnaire.tournois, 1):
-            print(f"{i}. {tournoi.nom} ({len(tournoi.joueurs)}/8 joueurs)")
-
-        choix_tournoi = int(input("Numéro du tournoi : ")) - 1
-        tournoi = gestionnaire.tournois[choix_tournoi]
+        joueur = choisir_joueur()
+        if joueur is None:
+            return
 
-        if len(tournoi.joueurs) >= 8:
-            print("⚠️ Ce tournoi a atteint le maximum de 8 joueurs.")
+        tournoi = choisir_tournoi(gestionnaire, lambda t: f" ({len(t.joueurs)} joueurs)")
+        if tournoi is None:
             return
 
         if joueur.id in tournoi.joueurs:
             print("⚠️ Ce joueur est déjà dans ce tournoi.")
             return
 
+        if tournoi.calendrier is not None:
+            print("⚠️ Le calendrier de ce tournoi toutes rondes est établi : il est trop tard pour s'inscrire.")
+            return
+
         tournoi.ajouter_joueur(joueur)
         print(f"\n✅ {joueur} a été ajouté au tournoi {tournoi.nom}!")
 
@@ -473,13 +1424,11 @@ def lancer_partie(gestionnaire: GestionnaireTournois):
         print("\n⚠️ Aucun tournoi disponible.")
         return
 
-    print("\nTournois disponibles:")
-    for i, tournoi in enumerate(gestionnaire.tournois, 1):
-        print(f"{i}. {tournoi.nom} ({len(tournoi.joueurs)} joueurs)")
-
     try:
-        choix_tournoi = int(input("Numéro du tournoi : ")) - 1
-        tournoi = gestionnaire.tournois[choix_tournoi]
+        tournoi = choisir_tournoi(gestionnaire, lambda t: f" ({len(t.joueurs)} joueurs, "
+                                                          f"{t.nb_tours_joues}/{t.nb_tours} tours)")
+        if tournoi is None:
+            return
 
         if len(tournoi.joueurs) < 2:
             print("⚠️ Le tournoi doit avoir au moins 2 joueurs pour lancer une partie.")
@@ -487,17 +1436,16 @@ def lancer_partie(gestionnaire: GestionnaireTournois):
 
         print(f"\n{tournoi.nom} - Tours: {len(tournoi.tours)}/{tournoi.nb_tours}")
 
-        if len(tournoi.tours) >= tournoi.nb_tours:
+        if tournoi.tour_en_cours is None and len(tournoi.tours) >= tournoi.nb_tours:
             print("⚠️ Ce tournoi a déjà atteint le nombre de tours maximum.")
             return
 
-        print(f"\nLancement du tour suivant...\n")
+        print("\nLancement du tour suivant...\n")
         try:
             tournoi.jouer_tour()
-            gestionnaire.ajouter_tournoi(tournoi)
             print("\n✅ Tour enregistré avec succès!")
         except KeyboardInterrupt:
-            print("\n⚠️ Tour annulé.")
+            print("\n⚠️ Saisie interrompue : les appariements sont conservés, le tour reste en cours.")
         except ValueError:
             print("\n⚠️ Erreur lors de la saisie.")
 
@@ -512,78 +1460,101 @@ def main():
     while True:
         choix = afficher_menu()
 
-        if choix == "1":
-            # Création du tournoi
-            nom_tournoi = input("Nom du tournoi : ")
-            lieu = input("Lieu du tournoi : ")
-            date_debut = input("Date de début (YYYY-MM-DD) : ")
-            date_fin = input("Date de fin (YYYY-MM-DD) : ")
-            controle_temps = input("Contrôle du temps (bullet/blitz/rapide) : ")
-            description = input("Description du tournoi : ")
-
-            tournoi = Tournoi(nom_tournoi, lieu, date_debut, date_fin,
-                              controle_temps=controle_temps, description=description)
-            gestionnaire.ajouter_tournoi(tournoi)
-
-            print("\nAjoutez jusqu'à 8 joueurs :")
-            try:
-                while len(tournoi.joueurs) < 8:
-                    print(f"\nJoueur {len(tournoi.joueurs) + 1} :")
-                    print("(ou tapez 'stop' pour terminer)")
-                    nom_famille = input("Nom de famille : ")
-                    if nom_famille.lower() == "stop":
-                        break
-
-                    prenom = input("Prénom : ")
-                    date_naissance = input("Date de naissance (YYYY-MM-DD) : ")
-                    sexe = input("Sexe (M/F) : ")
-                    classement = int(input("Classement : "))
-
-                    joueur = Joueur(nom_famille, prenom, date_naissance, sexe, classement)
-                    tournoi.ajouter_joueur(joueur)
-                    gestionnaire.ajouter_joueur(joueur)
-                    print(f"✅ Joueur ajouté : {joueur}")
-
-                print(f"\n✅ Tournoi '{tournoi.nom}' créé avec succès!")
-                print(f"   Joueurs: {len(tournoi.joueurs)}/8")
-                print(f"   Tours à jouer: {tournoi.nb_tours}")
-            except KeyboardInterrupt:
-                print("\n\n⚠️ Création de tournoi annulée.")
-            except ValueError:
-                print("\n⚠️ Erreur : Veuillez entrer des données valides.")
-
-        elif choix == "2":
-            print("\nAjout d'un nouveau joueur:")
-            try:
-                nom_famille = input("Nom de famille : ")
-                prenom = input("Prénom : ")
-                date_naissance = input("Date de naissance (YYYY-MM-DD) : ")
-                sexe = input("Sexe (M/F) : ")
-                classement = int(input("Classement : "))
-
-                joueur = Joueur(nom_famille, prenom, date_naissance, sexe, classement)
-                gestionnaire.ajouter_joueur(joueur)
-                print(f"✅ Joueur ajouté : {joueur}")
-            except KeyboardInterrupt:
-                print("\n\n⚠️ Ajout de joueur annulé.")
-            except ValueError:
-                print("\n⚠️ Erreur : Veuillez entrer des données valides.")
-
-        elif choix == "3":
-            ajouter_joueur_au_tournoi(gestionnaire)
-
-        elif choix == "4":
-            lancer_partie(gestionnaire)
+        # « p4 » : l'action 4 est exécutée sous cProfile
+        profil = choix[:1].lower() == 'p' and choix[1:] in ('1', '2', '3', '4', '5')
+        if profil:
+            choix = choix[1:]
 
-        elif choix == "5":
-            menu_rapports(gestionnaire)
-
-        elif choix == "6":
-            print("Au revoir!")
-            break
-
-        else:
-            print("Choix invalide.")
+        try:
+            with profiler(f"action_{choix}") if profil else nullcontext():
+                if choix == "1":
+                    # Création du tournoi
+                    nom_tournoi = input("Nom du tournoi : ")
+                    lieu = input("Lieu du tournoi : ")
+                    date_debut = input("Date de début (YYYY-MM-DD) : ")
+                    date_fin = input("Date de fin (YYYY-MM-DD) : ")
+                    controle_temps = input("Contrôle du temps (bullet/blitz/rapide) : ")
+                    systeme = input("Système (suisse/toutes_rondes/aller_retour) [suisse] : ") or "suisse"
+                    description = input("Description du tournoi : ")
+
+                    try:
+                        tournoi = Tournoi(nom_tournoi, lieu, date_debut, date_fin,
+                                          controle_temps=controle_temps, description=description, systeme=systeme)
+                    except ValueError as e:
+                        print(f"\n⚠️ Erreur : {e}")
+                        continue
+
+                    # Toute la saisie précède l'écriture : la base n'est pas verrouillée pendant que l'arbitre tape
+                    joueurs = []
+                    print("\nAjoutez les joueurs :")
+                    try:
+                        while True:
+                            print(f"\nJoueur {len(joueurs) + 1} :")
+                            print("(ou tapez 'stop' pour terminer)")
+                            nom_famille = input("Nom de famille : ")
+                            if nom_famille.lower() == "stop":
+                                break
+
+                            prenom = input("Prénom : ")
+                            date_naissance = input("Date de naissance (YYYY-MM-DD) : ")
+                            sexe = input("Sexe (M/F) : ")
+                            try:
+                                classement = int(input("Classement : "))
+                            except ValueError:
+                                # Le joueur est ressaisi : les précédents restent inscrits
+                                print("\n⚠️ Erreur : Veuillez entrer des données valides. Joueur à ressaisir.")
+                                continue
+
+                            joueurs.append(Joueur(nom_famille, prenom, date_naissance, sexe, classement))
+                    except KeyboardInterrupt:
+                        print("\n\n⚠️ Création de tournoi annulée.")
+                        continue
+
+                    # Le tournoi et ses joueurs sont écrits ensemble, une fois la saisie terminée
+                    with unite_de_travail():
+                        gestionnaire.ajouter_tournoi(tournoi)
+                        for joueur in joueurs:
+                            gestionnaire.ajouter_joueur(joueur)
+                            tournoi.ajouter_joueur(joueur)
+
+                    print(f"\n✅ Tournoi '{tournoi.nom}' créé avec succès!")
+                    print(f"   Joueurs: {len(tournoi.joueurs)}")
+                    print(f"   Tours à jouer: {tournoi.nb_tours}")
+
+                elif choix == "2":
+                    print("\nAjout d'un nouveau joueur:")
+                    try:
+                        nom_famille = input("Nom de famille : ")
+                        prenom = input("Prénom : ")
+                        date_naissance = input("Date de naissance (YYYY-MM-DD) : ")
+                        sexe = input("Sexe (M/F) : ")
+                        classement = int(input("Classement : "))
+
+                        joueur = Joueur(nom_famille, prenom, date_naissance, sexe, classement)
+                        gestionnaire.ajouter_joueur(joueur)
+                        print(f"✅ Joueur ajouté : {joueur}")
+                    except KeyboardInterrupt:
+                        print("\n\n⚠️ Ajout de joueur annulé.")
+                    except ValueError:
+                        print("\n⚠️ Erreur : Veuillez entrer des données valides.")
+
+                elif choix == "3":
+                    ajouter_joueur_au_tournoi(gestionnaire)
+
+                elif choix == "4":
+                    lancer_partie(gestionnaire)
+
+                elif choix == "5":
+                    menu_rapports(gestionnaire)
+
+                elif choix == "6":
+                    print("Au revoir!")
+                    break
+
+                else:
+                    print("Choix invalide.")
+        except BaseVerrouillee as e:
+            print(f"\n⚠️ {e}")
 
 
 if __name__ == "__main__":
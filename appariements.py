@@ -0,0 +1,243 @@
+# Appariements au système suisse, et calendriers des tournois toutes rondes (tables de Berger)
+
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, List, Optional, Set, Tuple
+
+BLANC = 'B'
+NOIR = 'N'
+
+Paire = Tuple['EtatJoueur', 'EtatJoueur']
+
+LIMITE_RECHERCHE = 100_000  # Essais au-delà desquels la recherche d'un appariement sans revanche abandonne
+
+
+class EtatJoueur:
+    """Situation d'un joueur avant l'appariement d'un tour"""
+
+    def __init__(self, id: int, score: float = 0, classement: int = 0, adversaires: Optional[Set[int]] = None,
+                 couleurs: str = "", exempte: bool = False):
+        self.id = id
+        self.score = score
+        self.classement = classement
+        self.adversaires = adversaires if adversaires is not None else set()
+        self.couleurs = couleurs  # Suite des couleurs jouées, ex. "BNB"
+        self.exempte = exempte  # A déjà reçu un bye
+
+    def difference_couleurs(self) -> int:
+        """Nombre de parties avec les blancs moins le nombre de parties avec les noirs"""
+        return self.couleurs.count(BLANC) - self.couleurs.count(NOIR)
+
+    def couleur_imposee(self) -> Optional[str]:
+        """Couleur que le joueur doit recevoir (déséquilibre de 2 ou même couleur deux fois de suite)"""
+        difference = self.difference_couleurs()
+        if difference <= -2 or self.couleurs[-2:] == NOIR * 2:
+            return BLANC
+        if difference >= 2 or self.couleurs[-2:] == BLANC * 2:
+            return NOIR
+        return None
+
+
+def _compatibles(a: EtatJoueur, b: EtatJoueur, couleurs_strictes: bool) -> bool:
+    """Deux joueurs peuvent-ils se rencontrer ?"""
+    if b.id in a.adversaires:
+        return False
+    if couleurs_strictes:
+        imposee = a.couleur_imposee()
+        return imposee is None or imposee != b.couleur_imposee()
+    return True
+
+
+def attribuer_couleurs(a: EtatJoueur, b: EtatJoueur) -> Tuple[EtatJoueur, EtatJoueur]:
+    """Retourne (blancs, noirs) ; ``a`` est le mieux classé des deux"""
+    imposee_a, imposee_b = a.couleur_imposee(), b.couleur_imposee()
+    if imposee_a is not None or imposee_b is not None:
+        if imposee_a == BLANC or imposee_b == NOIR:
+            return a, b
+        return b, a
+
+    difference_a, difference_b = a.difference_couleurs(), b.difference_couleurs()
+    if difference_a != difference_b:
+        return (a, b) if difference_a < difference_b else (b, a)
+
+    if a.couleurs and b.couleurs and a.couleurs[-1] != b.couleurs[-1]:
+        return (a, b) if a.couleurs[-1] == NOIR else (b, a)
+
+    # À égalité, le mieux classé alterne par rapport à sa dernière couleur
+    if a.couleurs and a.couleurs[-1] == BLANC:
+        return b, a
+    return a, b
+
+
+def _rang(joueur: EtatJoueur) -> Tuple[float, int, int]:
+    """Clé de tri : score, puis classement, décroissants"""
+    return -joueur.score, -joueur.classement, joueur.id
+
+
+def _choisir_exempt(joueurs: List[EtatJoueur]) -> EtatJoueur:
+    """Le bye revient au joueur le moins bien placé qui n'en a pas encore reçu"""
+    for joueur in reversed(joueurs):
+        if not joueur.exempte:
+            return joueur
+    return joueurs[-1]
+
+
+def _apparier_groupe(groupe: List[EtatJoueur], revanches: bool = False,
+                     couleurs: Tuple[bool, ...] = (True, False)) -> Tuple[List[Paire], List[EtatJoueur]]:
+    """Apparie un groupe de score : la moitié haute rencontre la moitié basse.
+
+    ``couleurs`` donne les passes de recherche d'un adversaire : en respectant les couleurs
+    imposées (True), puis sans (False). Retourne les paires formées et les joueurs qui flottent
+    vers le groupe suivant.
+    """
+    moitie = len(groupe) // 2
+    restants = groupe[moitie:] + groupe[:moitie]  # S2 puis S1 : on cherche d'abord dans la moitié basse
+    debut = 0  # Les candidats avant cette position sont tous déjà placés
+    places = set()
+    paires = []
+    flottants = []
+
+    for joueur in groupe:
+        if joueur.id in places:
+            continue
+        places.add(joueur.id)
+        adversaire = None
+        for couleurs_strictes in couleurs:
+            for candidat in islice(restants, debut, None):
+                if candidat.id in places:
+                    continue
+                if revanches or _compatibles(joueur, candidat, couleurs_strictes):
+                    adversaire = candidat
+                    break
+            if adversaire is not None or revanches:
+                break
+        if adversaire is None:
+            flottants.append(joueur)
+            continue
+        places.add(adversaire.id)
+        paires.append((joueur, adversaire))
+
+        # On saute les joueurs déjà placés en tête de liste pour garder des recherches courtes
+        while debut < len(restants) and restants[debut].id in places:
+            debut += 1
+
+    return paires, flottants
+
+
+def _apparier_par_recherche(groupe: List[EtatJoueur], couleurs_strictes: bool) -> Optional[List[Paire]]:
+    """Appariement complet et sans revanche d'un groupe, par recherche avec retour arrière.
+
+    Le mieux placé des joueurs libres essaie ses adversaires dans l'ordre de ``_apparier_groupe``
+    (moitié basse d'abord). Les ensembles de joueurs libres déjà reconnus sans solution ne sont
+    pas réexplorés. Retourne None si aucun appariement n'est trouvé en LIMITE_RECHERCHE essais.
+    """
+    moitie = len(groupe) // 2
+    ordre = list(range(moitie, len(groupe))) + list(range(moitie))
+    sans_solution: Set[int] = set()  # Ensembles de joueurs libres (bits des positions) sans appariement
+    choix: List[Tuple[int, int, int]] = []  # (joueur, adversaire, position du prochain candidat dans ordre)
+    libres = (1 << len(groupe)) - 1
+    position = 0  # 0 : nouvel ensemble de joueurs libres ; sinon reprise après un retour arrière
+    essais = 0
+    while libres:
+        premier = (libres & -libres).bit_length() - 1
+        adversaire = None
+        if position or (libres not in sans_solution and essais < LIMITE_RECHERCHE):
+            if not position:
+                essais += 1
+            for position in range(position, len(ordre)):
+                autre = ordre[position]
+                if autre != premier and libres >> autre & 1 \
+                        and _compatibles(groupe[premier], groupe[autre], couleurs_strictes):
+                    adversaire = autre
+                    break
+        if adversaire is not None:
+            choix.append((premier, adversaire, position + 1))
+            libres &= ~(1 << premier | 1 << adversaire)
+            position = 0
+            continue
+        sans_solution.add(libres)
+        if not choix:
+            return None
+        premier, adversaire, position = choix.pop()
+        libres |= 1 << premier | 1 << adversaire
+    return [(groupe[premier], groupe[adversaire]) for premier, adversaire, _ in choix]
+
+
+def apparier(joueurs: List[EtatJoueur]) -> Tuple[List[Tuple[int, int]], Optional[int]]:
+    """Calcule les appariements d'un tour suisse.
+
+    Les joueurs sont appariés par groupes de score, sans revanche quand c'est possible ;
+    ceux qui ne trouvent pas d'adversaire dans leur groupe flottent vers le groupe suivant.
+    Retourne la liste des paires (id des blancs, id des noirs) et l'id du joueur exempt.
+    """
+    ordre = sorted(joueurs, key=_rang)
+
+    exempt = None
+    if len(ordre) % 2:
+        exempt = _choisir_exempt(ordre)
+        ordre.remove(exempt)
+
+    groupes: Dict[float, List[EtatJoueur]] = {}
+    for joueur in ordre:
+        groupes.setdefault(joueur.score, []).append(joueur)
+
+    paires: List[Paire] = []
+    debuts: List[int] = []  # Position dans ``paires`` des premières paires de chaque groupe
+    flottants: List[EtatJoueur] = []
+    for score in sorted(groupes, reverse=True):
+        debuts.append(len(paires))
+        # Un joueur flotte plutôt que de recevoir deux fois de suite une couleur imposée
+        nouvelles, flottants = _apparier_groupe(flottants + groupes[score], couleurs=(True,))
+        paires.extend(nouvelles)
+
+    # Des joueurs restent sans adversaire : on fusionne les derniers groupes, du bas vers le haut,
+    # jusqu'à trouver un appariement sans revanche ; les couleurs imposées ne sont abandonnées
+    # que si aucune fusion ne permet de les respecter
+    for couleurs_strictes in (True, False):
+        for debut in reversed(debuts):
+            if not flottants:
+                break
+            fusion = sorted([joueur for paire in paires[debut:] for joueur in paire] + flottants, key=_rang)
+            trouvees = _apparier_par_recherche(fusion, couleurs_strictes)
+            if trouvees is not None:
+                paires[debut:] = trouvees
+                flottants = []
+
+    if flottants:
+        # Aucun appariement sans revanche n'a été trouvé : la revanche est alors acceptée
+        nouvelles, _ = _apparier_groupe(flottants, revanches=True)
+        paires.extend(nouvelles)
+
+    resultat = []
+    for a, b in paires:
+        blancs, noirs = attribuer_couleurs(a, b)
+        resultat.append((blancs.id, noirs.id))
+    return resultat, exempt.id if exempt is not None else None
+
+
+RondeBerger = Tuple[Tuple[int, int], ...]  # Paires (place des blancs, place des noirs) d'une ronde
+
+
+@lru_cache(maxsize=None)
+def table_berger(nb_joueurs: int, aller_retour: bool = False) -> Tuple[RondeBerger, ...]:
+    """Table de Berger (FIDE) d'un tournoi toutes rondes, en numéros de place de 1 à ``nb_joueurs``.
+
+    Pour un nombre impair de joueurs, la place ``nb_joueurs + 1`` est fictive : la rencontrer
+    vaut un bye. En aller-retour, la seconde moitié reprend la première couleurs inversées.
+    Chaque table n'est calculée qu'une fois, puis partagée par tous les tournois de même taille.
+    """
+    if nb_joueurs < 2:
+        raise ValueError("Un tournoi toutes rondes demande au moins 2 joueurs")
+    n = nb_joueurs + nb_joueurs % 2
+    m = n - 1
+    rondes = []
+    for ronde in range(1, n):
+        # Le joueur qui rencontre la place n est celui dont le double vaut ronde + 1 (modulo n - 1)
+        pivot = ((ronde + 1) * (m + 1) // 2 - 1) % m + 1
+        paires = [(pivot, n) if ronde % 2 else (n, pivot)]
+        for ecart in range(1, n // 2):
+            paires.append(((pivot + ecart - 1) % m + 1, (pivot - ecart - 1) % m + 1))
+        rondes.append(tuple(paires))
+    if aller_retour:
+        rondes += [tuple((noir, blanc) for blanc, noir in ronde) for ronde in rondes]
+    return tuple(rondes)
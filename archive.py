@@ -0,0 +1,290 @@
+# Archive en colonnes des parties des tournois terminés, pour les statistiques sur plusieurs années
+#
+# Usage :
+#   python archive.py exporter [-o data/archive.colonnes]     réécrit l'archive depuis la base
+#   python archive.py ecarts [--largeur 100]                   score des blancs par écart de classement
+#   python archive.py couleurs                                 avantage des blancs
+#   python archive.py activite [--joueur ID] [--limite 20]     parties par joueur, ou par année pour un joueur
+#   (--debut/--fin AAAA-MM-JJ limitent les statistiques à une période)
+#
+# Le fichier contient un en-tête de 16 octets puis une colonne de largeur fixe par champ (tournoi,
+# tour, jour, blancs, noirs, code de résultat, classements des deux joueurs avant la partie), chaque
+# colonne étant alignée sur 8 octets. Il est ouvert par mmap : chaque colonne est une memoryview
+# typée, parcourue par des itérateurs en C (map, zip, Counter, compress), sans relire la base ni
+# recréer de tournois. Les parties sont rangées par date de début de tournoi (une date illisible
+# compte pour le jour 0, en tête) : une période est une tranche de chaque colonne, trouvée par dichotomie.
+#
+# La base ne garde pas l'historique des classements : ceux d'avant chaque partie sont recalculés en
+# rejouant les tours dans l'ordre, avec le recalcul complet de ``python elo.py``.
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date
+from itertools import compress, repeat
+from operator import eq, floordiv, sub
+from typing import Any, Dict, List, Optional, Tuple
+
+from elo import classements_officiels, recalculer, score_attendu
+
+MAGIQUE = b'ECHA'
+VERSION = 1
+ENTETE = struct.Struct('<4sBBHQ')  # Magique, version, ordre des octets, réservé, nombre de parties
+ORDRES_OCTETS = {'little': 0, 'big': 1}
+ALIGNEMENT = 8
+FICHIER = 'archive.colonnes'
+
+# Colonnes, dans l'ordre du fichier, avec leur type (module array)
+COLONNES = (
+    ('tournoi', 'i'),
+    ('tour', 'H'),  # Numéro du tour, à partir de 1
+    ('jour', 'i'),  # Date de début du tournoi (date.toordinal)
+    ('blancs', 'i'),
+    ('noirs', 'i'),
+    ('code', 'B'),  # Comme Echec.RESULTATS_CODES : '1' gain des blancs, '2' gain des noirs, '3' nulle
+    ('classement_blancs', 'h'),
+    ('classement_noirs', 'h'),
+)
+
+GAIN_BLANCS, GAIN_NOIRS, NULLE = ord('1'), ord('2'), ord('3')
+
+
+def _decalages(nb_parties: int) -> Dict[str, int]:
+    """Position de chaque colonne dans le fichier"""
+    decalages, position = {}, ENTETE.size
+    for nom, type_ in COLONNES:
+        position += -position % ALIGNEMENT
+        decalages[nom] = position
+        position += nb_parties * array(type_).itemsize
+    return decalages
+
+
+def _jour(texte: str) -> int:
+    try:
+        return date.fromisoformat(texte).toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+def _borne(classement: float) -> int:
+    return min(max(round(classement), 0), 32767)
+
+
+def ecrire(colonnes: Dict[str, array], chemin: str):
+    """Écrit des colonnes de même longueur dans un fichier d'archive (remplacé d'un coup)"""
+    nb_parties = len(colonnes['code'])
+    temporaire = f'{chemin}.{os.getpid()}.tmp'
+    with open(temporaire, 'wb') as f:
+        f.write(ENTETE.pack(MAGIQUE, VERSION, ORDRES_OCTETS[sys.byteorder], 0, nb_parties))
+        for nom, debut in _decalages(nb_parties).items():
+            f.write(bytes(debut - f.tell()))
+            f.write(colonnes[nom].tobytes())
+    os.replace(temporaire, chemin)
+
+
+def exporter(chemin: Optional[str] = None) -> int:
+    """Écrit dans l'archive toutes les parties jouées des tournois terminés ; retourne leur nombre.
+
+    Les tournois sont lus un à un, par jour de début ; seules les colonnes restent en mémoire.
+    Les classements d'avant chaque partie viennent du recalcul d'elo.py, avec les mêmes points
+    de départ : classement officiel (id_externe) ou CLASSEMENT_INITIAL.
+    """
+    import Echec
+    from Echec import CODES_RESULTATS, EXEMPT, RESULTATS_CODES, Tournoi
+
+    chemin = chemin or os.path.join(Echec.DOSSIER_DONNEES, FICHIER)
+    colonnes = {nom: array(type_) for nom, type_ in COLONNES}
+    points_blancs, periodes = array('d'), array('l')
+    periode = 0
+    non_joue = RESULTATS_CODES[None]
+
+    # Rangés selon le jour stocké (0 pour une date illisible) : la colonne reste triée pour ``tranche``
+    for tournoi in sorted(Tournoi.get_entetes(), key=lambda t: (_jour(t.date_debut), t.id)):
+        if tournoi.nb_tours_joues < tournoi.nb_tours:
+            continue
+        tours = tournoi.tours
+        if not tours or tours[-1].fin is None:
+            continue
+        jour = _jour(tournoi.date_debut)
+        for numero, tour in enumerate(tours, 1):
+            periode += 1
+            for blanc, noir, code in zip(tour.blancs, tour.noirs, tour.codes):
+                if noir == EXEMPT or code == non_joue:
+                    continue
+                colonnes['tournoi'].append(tournoi.id)
+                colonnes['tour'].append(numero)
+                colonnes['jour'].append(jour)
+                colonnes['blancs'].append(blanc)
+                colonnes['noirs'].append(noir)
+                colonnes['code'].append(code)
+                points_blancs.append(CODES_RESULTATS[code][0])
+                periodes.append(periode)
+
+    avant = (array('d'), array('d'))
+    recalculer(colonnes['blancs'], colonnes['noirs'], points_blancs, periodes,
+               initiaux=classements_officiels(Echec.depot_joueurs.get_all()), avant=avant)
+    colonnes['classement_blancs'].extend(map(_borne, avant[0]))
+    colonnes['classement_noirs'].extend(map(_borne, avant[1]))
+
+    ecrire(colonnes, chemin)
+    return len(colonnes['code'])
+
+
+class Archive:
+    """Archive ouverte en lecture par mmap ; ``colonnes`` associe à chaque champ une memoryview typée"""
+
+    def __init__(self, chemin: str):
+        self.chemin = chemin
+        with open(chemin, 'rb') as f:
+            self._carte = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._carte) < ENTETE.size:
+                raise ValueError(f"{chemin} n'est pas une archive de parties")
+            magique, version, ordre, _, self.nb_parties = ENTETE.unpack_from(self._carte)
+            if magique != MAGIQUE:
+                raise ValueError(f"{chemin} n'est pas une archive de parties")
+            if version != VERSION:
+                raise ValueError(f"Version d'archive non prise en charge : {version}")
+            if ordre != ORDRES_OCTETS[sys.byteorder]:
+                raise ValueError("Archive écrite sur une machine d'un autre ordre d'octets : réexportez-la")
+            decalages = _decalages(self.nb_parties)
+            nom, type_ = COLONNES[-1]
+            if decalages[nom] + self.nb_parties * array(type_).itemsize > len(self._carte):
+                raise ValueError(f"Archive tronquée : {chemin}")
+        except Exception:
+            self._carte.close()
+            raise
+        vue = memoryview(self._carte)
+        self.colonnes: Dict[str, memoryview] = {
+            nom: vue[debut:debut + self.nb_parties * array(type_).itemsize].cast(type_)
+            for (nom, type_), debut in zip(COLONNES, decalages.values())}
+
+    def fermer(self):
+        """Ferme l'archive ; les tranches obtenues auparavant doivent avoir été abandonnées"""
+        for colonne in self.colonnes.values():
+            colonne.release()
+        self.colonnes = {}
+        self._carte.close()
+
+    def __enter__(self) -> 'Archive':
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def __len__(self) -> int:
+        return self.nb_parties
+
+    def tranche(self, debut: Optional[str] = None, fin: Optional[str] = None) -> Dict[str, memoryview]:
+        """Colonnes restreintes aux tournois commencés entre deux dates (AAAA-MM-JJ, incluses), sans copie"""
+        jours = self.colonnes['jour']
+        premier = bisect_left(jours, date.fromisoformat(debut).toordinal()) if debut else 0
+        dernier = bisect_right(jours, date.fromisoformat(fin).toordinal()) if fin else len(jours)
+        return {nom: colonne[premier:dernier] for nom, colonne in self.colonnes.items()}
+
+    def score_par_ecart(self, largeur: int = 100, debut: Optional[str] = None,
+                        fin: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Score des blancs par tranche d'écart de classement (blancs - noirs), comparé au score attendu"""
+        if largeur < 1:
+            raise ValueError("La largeur des tranches doit être positive")
+        colonnes = self.tranche(debut, fin)
+        ecarts = map(floordiv, map(sub, colonnes['classement_blancs'], colonnes['classement_noirs']),
+                     repeat(largeur))
+        comptes = Counter(zip(ecarts, colonnes['code']))
+        tranches: Dict[int, List[int]] = {}
+        for (tranche, code), nombre in comptes.items():
+            gains_nulles = tranches.setdefault(tranche, [0, 0, 0])
+            gains_nulles[0] += nombre
+            if code == GAIN_BLANCS:
+                gains_nulles[1] += nombre
+            elif code == NULLE:
+                gains_nulles[2] += nombre
+        return [{'ecart_min': tranche * largeur, 'ecart_max': (tranche + 1) * largeur - 1, 'parties': parties,
+                 'score_blancs': (gains + nulles / 2) / parties,
+                 'score_attendu': score_attendu((tranche + 0.5) * largeur, 0)}
+                for tranche, (parties, gains, nulles) in sorted(tranches.items())]
+
+    def avantage_blancs(self, debut: Optional[str] = None, fin: Optional[str] = None) -> Dict[str, Any]:
+        """Répartition des résultats et score moyen des blancs"""
+        codes = self.tranche(debut, fin)['code'].tobytes()
+        gains, pertes, nulles = codes.count(GAIN_BLANCS), codes.count(GAIN_NOIRS), codes.count(NULLE)
+        return {'parties': len(codes), 'gains_blancs': gains, 'nulles': nulles, 'gains_noirs': pertes,
+                'score_blancs': (gains + nulles / 2) / len(codes) if codes else 0.0}
+
+    def activite(self, debut: Optional[str] = None, fin: Optional[str] = None) -> Counter:
+        """Nombre de parties jouées par joueur"""
+        colonnes = self.tranche(debut, fin)
+        parties = Counter(colonnes['blancs'])
+        parties.update(colonnes['noirs'])
+        return parties
+
+    def activite_joueur(self, joueur_id: int, debut: Optional[str] = None,
+                        fin: Optional[str] = None) -> Dict[int, int]:
+        """Nombre de parties d'un joueur par année"""
+        colonnes = self.tranche(debut, fin)
+        jours = colonnes['jour']
+        parties = Counter(compress(jours, map(eq, colonnes['blancs'], repeat(joueur_id))))
+        parties.update(compress(jours, map(eq, colonnes['noirs'], repeat(joueur_id))))
+        annees: Dict[int, int] = {}
+        for jour, nombre in parties.items():
+            annee = date.fromordinal(jour).year if jour else 0
+            annees[annee] = annees.get(annee, 0) + nombre
+        return dict(sorted(annees.items()))
+
+
+def _periode(args) -> Tuple[Optional[str], Optional[str]]:
+    for texte in (args.debut, args.fin):
+        if texte and _jour(texte) == 0:
+            raise ValueError(f"date invalide : {texte} (attendu AAAA-MM-JJ)")
+    return args.debut, args.fin
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Archive en colonnes des parties et statistiques")
+    parser.add_argument('commande', choices=['exporter', 'ecarts', 'couleurs', 'activite'], help="action")
+    parser.add_argument('-o', '--archive', help=f"fichier d'archive (data/{FICHIER} par défaut)")
+    parser.add_argument('--debut', help="première date de début de tournoi prise en compte (AAAA-MM-JJ)")
+    parser.add_argument('--fin', help="dernière date de début de tournoi prise en compte (AAAA-MM-JJ)")
+    parser.add_argument('--largeur', type=int, default=100, help="largeur des tranches d'écart de classement")
+    parser.add_argument('--joueur', type=int, help="identifiant du joueur (activite)")
+    parser.add_argument('--limite', type=int, default=20, help="nombre de joueurs affichés (activite)")
+    args = parser.parse_args(argv)
+    chemin = args.archive or os.path.join('data', FICHIER)
+
+    try:
+        if args.commande == 'exporter':
+            nb_parties = exporter(chemin)
+            print(f"✅ {nb_parties} parties archivées dans {chemin}.")
+            return 0
+
+        debut, fin = _periode(args)
+        with Archive(chemin) as archive:
+            if args.commande == 'ecarts':
+                print(f"{'écart':>13} {'parties':>9} {'score blancs':>13} {'attendu':>8}")
+                for ligne in archive.score_par_ecart(args.largeur, debut, fin):
+                    print(f"{ligne['ecart_min']:>6}..{ligne['ecart_max']:<5} {ligne['parties']:>9} "
+                          f"{ligne['score_blancs']:>13.1%} {ligne['score_attendu']:>8.1%}")
+            elif args.commande == 'couleurs':
+                avantage = archive.avantage_blancs(debut, fin)
+                print(f"{avantage['parties']} parties : {avantage['gains_blancs']} gains des blancs, "
+                      f"{avantage['nulles']} nulles, {avantage['gains_noirs']} gains des noirs "
+                      f"(score des blancs {avantage['score_blancs']:.1%})")
+            elif args.joueur is not None:
+                for annee, nombre in archive.activite_joueur(args.joueur, debut, fin).items():
+                    print(f"{annee or '?':>6} {nombre:>6}")
+            else:
+                for joueur_id, nombre in archive.activite(debut, fin).most_common(args.limite):
+                    print(f"{joueur_id:>8} {nombre:>6}")
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Archive inutilisable : {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
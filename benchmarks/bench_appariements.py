@@ -0,0 +1,62 @@
+# Mesure du temps d'appariement suisse en fonction du nombre de joueurs
+#
+# Usage : python benchmarks/bench_appariements.py [nb_joueurs ...]
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from appariements import BLANC, NOIR, EtatJoueur, apparier  # noqa: E402
+
+TAILLES = [100, 250, 500, 1000, 2000, 4000]
+TOURS_JOUES = 6
+
+
+def simuler_historique(nb_joueurs: int, nb_tours: int, graine: int = 42):
+    """Crée des joueurs et joue quelques tours au hasard pour obtenir des groupes de score réalistes"""
+    hasard = random.Random(graine)
+    etats = [EtatJoueur(i, classement=hasard.randint(1000, 2800)) for i in range(1, nb_joueurs + 1)]
+    par_id = {etat.id: etat for etat in etats}
+
+    for _ in range(nb_tours):
+        paires, exempt = apparier(etats)
+        for blanc_id, noir_id in paires:
+            blanc, noir = par_id[blanc_id], par_id[noir_id]
+            points_blanc = hasard.choice((0, 0.5, 1))
+            blanc.score += points_blanc
+            noir.score += 1 - points_blanc
+            blanc.adversaires.add(noir_id)
+            noir.adversaires.add(blanc_id)
+            blanc.couleurs += BLANC
+            noir.couleurs += NOIR
+        if exempt is not None:
+            par_id[exempt].score += 1
+            par_id[exempt].exempte = True
+    return etats
+
+
+def mesurer(nb_joueurs: int, repetitions: int = 3) -> float:
+    """Meilleur temps (en secondes) pour apparier le tour suivant"""
+    etats = simuler_historique(nb_joueurs, TOURS_JOUES)
+    meilleur = float('inf')
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        apparier(etats)
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur
+
+
+def main():
+    tailles = [int(arg) for arg in sys.argv[1:]] or TAILLES
+    print(f"Appariement du tour {TOURS_JOUES + 1} (meilleur de 3)")
+    print(f"{'joueurs':>8} {'temps (ms)':>12} {'µs/joueur':>10}")
+    for nb_joueurs in tailles:
+        duree = mesurer(nb_joueurs)
+        print(f"{nb_joueurs:>8} {duree * 1000:>12.2f} {duree * 1e6 / nb_joueurs:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+# Mesures des opérations courantes du gestionnaire de tournois sur des bases synthétiques
+#
+# Usage :
+#   python benchmarks/bench_tournoi.py                          tailles par défaut, tableau à l'écran
+#   python benchmarks/bench_tournoi.py --taille 2000x50x7x100   joueurs x tournois x tours x inscrits
+#   python benchmarks/bench_tournoi.py -o avant.json            résultats enregistrés en JSON
+#   python benchmarks/bench_tournoi.py --comparer avant.json    écart avec une mesure précédente
+#
+# Chaque base est générée dans un dossier temporaire à partir d'une graine fixe : deux versions du
+# code mesurées avec la même graine et les mêmes tailles travaillent sur les mêmes données.
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Echec  # noqa: E402
+from Echec import RESULTATS_CODES, GestionnaireTournois, Tour, Tournoi, depot_joueurs, unite_de_travail  # noqa: E402
+
+FORMAT_RESULTATS = 1  # Version du fichier JSON produit
+REPETITIONS = 5
+GRAINE = 42
+NOMS = ["Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy", "Moreau",
+        "Simon", "Laurent", "Lefèvre", "Michel", "Garcia", "David", "Bertrand", "Roux", "Vincent", "Fournier"]
+PRENOMS = ["Jean", "Marie", "Pierre", "Anne", "Luc", "Claire", "Paul", "Sophie", "Louis", "Julie",
+           "Hugo", "Léa", "Noé", "Emma", "Jules", "Chloé", "Adam", "Inès", "Léon", "Zoé"]
+RESULTATS = [(1, 0), (0, 1), (0.5, 0.5)]
+
+
+class Taille(NamedTuple):
+    joueurs: int
+    tournois: int
+    tours: int
+    inscrits: int  # Joueurs par tournoi
+
+    @classmethod
+    def depuis_texte(cls, texte: str) -> 'Taille':
+        """'2000x50x7x100' -> Taille(2000, 50, 7, 100)"""
+        try:
+            joueurs, tournois, tours, inscrits = (int(valeur) for valeur in texte.lower().split('x'))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"taille invalide : {texte} (attendu JOUEURSxTOURNOISxTOURSxINSCRITS)")
+        if inscrits > joueurs or inscrits < 2:
+            raise argparse.ArgumentTypeError(f"taille invalide : {texte} (2 <= inscrits <= joueurs)")
+        return cls(joueurs, tournois, tours, inscrits)
+
+    def __str__(self):
+        return f"{self.joueurs}x{self.tournois}x{self.tours}x{self.inscrits}"
+
+
+TAILLES = [Taille(500, 10, 5, 50), Taille(5000, 50, 7, 200), Taille(50000, 200, 9, 500)]
+
+
+def generer(taille: Taille, graine: int = GRAINE) -> List[int]:
+    """Remplit la base ouverte de joueurs et de tournois terminés ; retourne les ids des tournois.
+
+    Les appariements des tours sont tirés au hasard (pas d'appariement suisse) pour que la
+    génération reste rapide ; les scores sont recalculés à partir des tours.
+    """
+    hasard = random.Random(graine)
+    documents = [{'nom_famille': hasard.choice(NOMS), 'prenom': hasard.choice(PRENOMS),
+                  'date_naissance': f"{hasard.randint(1940, 2015)}-{hasard.randint(1, 12):02d}-"
+                                    f"{hasard.randint(1, 28):02d}",
+                  'sexe': hasard.choice('MF'), 'classement': hasard.randint(1000, 2800)}
+                 for _ in range(taille.joueurs)]
+    ids_joueurs = Echec.joueurs_table.insert_multiple(documents)
+
+    ids_tournois = []
+    with unite_de_travail():
+        for numero in range(taille.tournois):
+            tournoi = Tournoi(f"Open {numero}", hasard.choice(["Paris", "Lyon", "Lille", "Nantes"]),
+                              "2024-01-01", "2024-01-03", nb_tours=taille.tours,
+                              controle_temps=hasard.choice(Tournoi.CONTROLES_TEMPS))
+            tournoi.joueurs = hasard.sample(ids_joueurs, taille.inscrits)
+            for numero_tour in range(taille.tours):
+                tour = Tour(f"Tour {numero_tour + 1}")
+                ordre = tournoi.joueurs[:]
+                hasard.shuffle(ordre)
+                for blanc, noir in zip(ordre[::2], ordre[1::2]):
+                    tour.blancs.append(blanc)
+                    tour.noirs.append(noir)
+                    tour.codes.append(RESULTATS_CODES[hasard.choice(RESULTATS)])
+                if len(ordre) % 2:
+                    tour.blancs.append(ordre[-1])
+                    tour.noirs.append(Echec.EXEMPT)
+                    tour.codes.append(RESULTATS_CODES[(1, 0)])
+                tour.terminer_tour()
+                tournoi.tours.append(tour)
+            tournoi.scores = None  # Recalculés depuis les tours à l'écriture
+            ids_tournois.append(tournoi.save())
+    depot_joueurs.invalider()
+    return ids_tournois
+
+
+def chronometrer(operation: Callable[[], Any], repetitions: int = REPETITIONS,
+                 preparer: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    """Durées (ms) de ``repetitions`` appels ; ``preparer`` est appelé avant chacun, hors mesure"""
+    durees = []
+    for _ in range(repetitions):
+        if preparer is not None:
+            preparer()
+        debut = time.perf_counter()
+        operation()
+        durees.append((time.perf_counter() - debut) * 1000)
+    return {'meilleur_ms': min(durees), 'mediane_ms': statistics.median(durees)}
+
+
+def mesurer(taille: Taille, stockage: str, repetitions: int = REPETITIONS, graine: int = GRAINE) -> Dict[str, Any]:
+    """Génère une base de la taille demandée et mesure chaque opération"""
+    with tempfile.TemporaryDirectory() as dossier:
+        Echec.ouvrir_base(stockage, dossier, instantane=False)
+        try:
+            debut = time.perf_counter()
+            ids_tournois = generer(taille, graine)
+            generation_ms = (time.perf_counter() - debut) * 1000
+
+            tournoi = Tournoi.get(ids_tournois[0])
+            document = Echec.tournois_table.get(doc_id=tournoi.id)
+            gestionnaire = GestionnaireTournois()
+
+            # Les vues triées sont gardées entre deux rapports : on les oublie pour mesurer le tri
+            def oublier_vues_tournoi():
+                tournoi._vues.clear()
+
+            def oublier_vues_joueurs():
+                depot_joueurs._vues = None
+
+            operations = {
+                'load_data': (gestionnaire.load_data, None),
+                'load_data_complet': (lambda: GestionnaireTournois(paresseux=False), depot_joueurs.invalider),
+                'tournoi_from_dict': (lambda: Tournoi.from_dict(document, id=tournoi.id), None),
+                'tournoi_to_dict': (tournoi.to_dict, None),
+                'tournoi_save': (tournoi.save, None),
+                'generer_paires': (tournoi.generer_paires, None),
+                'get_joueurs_objets': (tournoi.get_joueurs_objets, None),
+                'tri_inscrits_alphabetique': (tournoi.liste_joueurs_alphabetique, oublier_vues_tournoi),
+                'tri_inscrits_classement': (tournoi.liste_joueurs_classement, oublier_vues_tournoi),
+                'tri_joueurs_alphabetique': (gestionnaire.liste_joueurs_alphabetique, oublier_vues_joueurs),
+                'tri_joueurs_classement': (gestionnaire.liste_joueurs_classement, oublier_vues_joueurs),
+            }
+            mesures = {nom: chronometrer(operation, repetitions, preparer)
+                       for nom, (operation, preparer) in operations.items()}
+        finally:
+            Echec.fermer_base()
+    return {'taille': taille._asdict(), 'generation_ms': generation_ms, 'mesures': mesures}
+
+
+def version_code() -> str:
+    """Commit git du code mesuré, s'il est connu"""
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'inconnue'
+
+
+def afficher(resultat: Dict[str, Any], reference: Optional[Dict[str, Any]] = None):
+    taille = Taille(**resultat['taille'])
+    print(f"\n{taille.joueurs} joueurs, {taille.tournois} tournois de {taille.tours} tours "
+          f"et {taille.inscrits} inscrits (génération {resultat['generation_ms'] / 1000:.1f} s)")
+    entete = f"{'opération':<30} {'meilleur (ms)':>14} {'médiane (ms)':>13}"
+    print(entete + (f" {'référence':>10} {'écart':>8}" if reference else ''))
+    for nom, mesure in resultat['mesures'].items():
+        ligne = f"{nom:<30} {mesure['meilleur_ms']:>14.3f} {mesure['mediane_ms']:>13.3f}"
+        ancienne = reference['mesures'].get(nom) if reference else None
+        if ancienne:
+            ecart = (mesure['meilleur_ms'] / ancienne['meilleur_ms'] - 1) * 100 if ancienne['meilleur_ms'] else 0.0
+            ligne += f" {ancienne['meilleur_ms']:>10.3f} {ecart:>+7.0f}%"
+        print(ligne)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mesures des opérations du gestionnaire de tournois")
+    parser.add_argument('--taille', type=Taille.depuis_texte, action='append',
+                        help="JOUEURSxTOURNOISxTOURSxINSCRITS (répétable)")
+    parser.add_argument('--repetitions', type=int, default=REPETITIONS, help="appels mesurés par opération")
+    parser.add_argument('--graine', type=int, default=GRAINE, help="graine des données générées")
+    parser.add_argument('--stockage', choices=['journal', 'sqlite'], default='journal', help="moteur de stockage")
+    parser.add_argument('-o', '--sortie', help="fichier JSON où enregistrer les résultats")
+    parser.add_argument('--comparer', help="fichier JSON d'une mesure précédente à comparer")
+    args = parser.parse_args(argv)
+
+    references: Dict[str, Dict[str, Any]] = {}
+    if args.comparer:
+        try:
+            with open(args.comparer, encoding='utf-8') as f:
+                references = {str(Taille(**r['taille'])): r for r in json.load(f)['resultats']}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Mesure de référence illisible : {e}", file=sys.stderr)
+            return 1
+
+    resultats = []
+    for taille in args.taille or TAILLES:
+        resultat = mesurer(taille, args.stockage, args.repetitions, args.graine)
+        afficher(resultat, references.get(str(taille)))
+        resultats.append(resultat)
+
+    if args.sortie:
+        rapport = {'format': FORMAT_RESULTATS, 'date': datetime.now().isoformat(timespec='seconds'),
+                   'version': version_code(), 'python': platform.python_version(), 'machine': platform.machine(),
+                   'stockage': args.stockage, 'graine': args.graine, 'repetitions': args.repetitions,
+                   'resultats': resultats}
+        with open(args.sortie, 'w', encoding='utf-8') as f:
+            json.dump(rapport, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ Résultats enregistrés dans {args.sortie}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
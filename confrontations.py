@@ -0,0 +1,104 @@
+# Historique des rencontres : adversaires de chaque joueur dans un tournoi, et bilan des
+# face-à-face entre deux joueurs sur l'ensemble des tournois
+#
+# Les deux index sont tenus à jour au fil des tours et des résultats : savoir si deux joueurs
+# se sont déjà rencontrés, ou quel est leur bilan, est une simple lecture de dictionnaire.
+
+from array import array
+from typing import Dict, Iterable, List, Set, Tuple
+
+from appariements import BLANC, NOIR
+
+EXEMPT = 0  # Comme Echec.EXEMPT : id des noirs pour un bye
+GAIN_BLANCS, GAIN_NOIRS, NULLE = ord('1'), ord('2'), ord('3')  # Comme Echec.RESULTATS_CODES
+
+Colonnes = Tuple[array, array, bytes]  # Blancs, noirs et codes de résultat d'un tour
+
+
+class HistoriqueTournoi:
+    """Adversaires, couleurs et byes de chaque joueur d'un tournoi, complétés à chaque nouveau tour"""
+
+    __slots__ = ('adversaires', 'couleurs', 'exemptes')
+
+    def __init__(self):
+        self.adversaires: Dict[int, Set[int]] = {}
+        self.couleurs: Dict[int, str] = {}  # Suite des couleurs jouées, ex. "BNB"
+        self.exemptes: Set[int] = set()  # Joueurs ayant déjà reçu un bye
+
+    def ajouter_tour(self, blancs: Iterable[int], noirs: Iterable[int]):
+        for blanc, noir in zip(blancs, noirs):
+            if noir == EXEMPT:
+                self.exemptes.add(blanc)
+                continue
+            self.adversaires.setdefault(blanc, set()).add(noir)
+            self.adversaires.setdefault(noir, set()).add(blanc)
+            self.couleurs[blanc] = self.couleurs.get(blanc, '') + BLANC
+            self.couleurs[noir] = self.couleurs.get(noir, '') + NOIR
+
+    def ont_joue(self, joueur: int, adversaire: int) -> bool:
+        return adversaire in self.adversaires.get(joueur, ())
+
+
+class Confrontations:
+    """Bilan (gains, nulles, défaites) de chaque paire de joueurs, sur tous les tournois.
+
+    Les parties comptées sont gardées tour par tour pour chaque tournoi : une nouvelle version
+    du tournoi ne recompte que les tours dont les appariements ou les résultats ont changé.
+    """
+
+    def __init__(self):
+        # (plus petit id, plus grand id) -> [gains du premier, nulles, gains du second]
+        self._bilans: Dict[Tuple[int, int], List[int]] = {}
+        self._tournois: Dict[int, List[Colonnes]] = {}
+
+    def _compter(self, blancs: array, noirs: array, codes: bytes, sens: int):
+        for blanc, noir, code in zip(blancs, noirs, codes):
+            if noir == EXEMPT or code not in (GAIN_BLANCS, GAIN_NOIRS, NULLE):
+                continue
+            if blanc < noir:
+                cle, case = (blanc, noir), 0 if code == GAIN_BLANCS else 2 if code == GAIN_NOIRS else 1
+            else:
+                cle, case = (noir, blanc), 2 if code == GAIN_BLANCS else 0 if code == GAIN_NOIRS else 1
+            bilan = self._bilans.get(cle)
+            if bilan is None:
+                bilan = self._bilans[cle] = [0, 0, 0]
+            bilan[case] += sens
+            if sens < 0 and not any(bilan):
+                del self._bilans[cle]
+
+    def mettre_a_jour(self, tournoi_id: int, tours: Iterable[Colonnes]):
+        """Prend en compte la dernière version des tours d'un tournoi"""
+        anciens = self._tournois.get(tournoi_id, [])
+        nouveaux: List[Colonnes] = []
+        for numero, (blancs, noirs, codes) in enumerate(tours):
+            ancien = anciens[numero] if numero < len(anciens) else None
+            if ancien is not None and ancien[2] == codes and ancien[0] == blancs and ancien[1] == noirs:
+                nouveaux.append(ancien)
+                continue
+            if ancien is not None:
+                self._compter(*ancien, -1)
+            copie = (array('l', blancs), array('l', noirs), bytes(codes))
+            self._compter(*copie, 1)
+            nouveaux.append(copie)
+        for ancien in anciens[len(nouveaux):]:
+            self._compter(*ancien, -1)
+        if nouveaux:
+            self._tournois[tournoi_id] = nouveaux
+        else:
+            self._tournois.pop(tournoi_id, None)
+
+    def retirer(self, tournoi_id: int):
+        """Retire toutes les parties d'un tournoi"""
+        self.mettre_a_jour(tournoi_id, [])
+
+    def bilan(self, joueur: int, adversaire: int) -> Tuple[int, int, int]:
+        """(gains, nulles, défaites) de ``joueur`` face à ``adversaire``"""
+        if joueur < adversaire:
+            gains, nulles, pertes = self._bilans.get((joueur, adversaire), (0, 0, 0))
+        else:
+            pertes, nulles, gains = self._bilans.get((adversaire, joueur), (0, 0, 0))
+        return gains, nulles, pertes
+
+    def __len__(self) -> int:
+        """Nombre de paires de joueurs qui se sont rencontrées"""
+        return len(self._bilans)
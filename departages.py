@@ -0,0 +1,176 @@
+# Scores et départages (Buchholz, Sonneborn-Berger, progressif) d'un tournoi
+
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from metriques import mesure
+
+# Une partie jouée : (tour, id des blancs, id des noirs ou None pour un bye, points des blancs, points des noirs)
+Partie = Tuple[int, int, Optional[int], float, float]
+
+CRITERES = ('points', 'buchholz', 'sonneborn_berger', 'progressif')
+
+
+class ScoresTournoi:
+    """Agrégats de score d'un tournoi, mis à jour résultat par résultat.
+
+    Chaque nouveau résultat ne touche que les deux joueurs concernés et leurs adversaires
+    précédents : le classement est disponible immédiatement, sans recalcul complet.
+    """
+
+    def __init__(self):
+        self.points: Dict[int, float] = {}
+        self.buchholz: Dict[int, float] = {}
+        self.sonneborn_berger: Dict[int, float] = {}
+        self.progressif: Dict[int, float] = {}
+        # Pour chaque joueur : liste de (adversaire, points marqués par l'adversaire dans leur partie)
+        self._adversaires: Optional[Dict[int, List[Tuple[int, float]]]] = {}
+
+    @property
+    def adversaires_connus(self) -> bool:
+        """Faux pour des agrégats relus de la base tant que les rencontres n'ont pas été rechargées"""
+        return self._adversaires is not None
+
+    def reconstruire_adversaires(self, parties: Iterable[Partie]):
+        """Recharge la liste des rencontres sans modifier les agrégats"""
+        self._adversaires = {}
+        for _, blanc, noir, points_blanc, points_noir in parties:
+            if noir is not None:
+                self._adversaires.setdefault(blanc, []).append((noir, points_noir))
+                self._adversaires.setdefault(noir, []).append((blanc, points_blanc))
+
+    def _ajouter_points(self, joueur: int, points: float):
+        """Ajoute des points à un joueur et répercute la variation sur ses adversaires"""
+        self.points[joueur] = self.points.get(joueur, 0) + points
+        for adversaire, obtenus in self._adversaires.get(joueur, ()):
+            self.buchholz[adversaire] = self.buchholz.get(adversaire, 0) + points
+            self.sonneborn_berger[adversaire] = self.sonneborn_berger.get(adversaire, 0) + obtenus * points
+
+    def _ajouter_rencontre(self, blanc: int, noir: int, points_blanc: float, points_noir: float, sens: int):
+        """Ajoute (sens = 1) ou retire (sens = -1) la contribution d'une rencontre aux départages"""
+        score_blanc, score_noir = self.points.get(blanc, 0), self.points.get(noir, 0)
+        self.buchholz[blanc] = self.buchholz.get(blanc, 0) + sens * score_noir
+        self.buchholz[noir] = self.buchholz.get(noir, 0) + sens * score_blanc
+        self.sonneborn_berger[blanc] = self.sonneborn_berger.get(blanc, 0) + sens * points_blanc * score_noir
+        self.sonneborn_berger[noir] = self.sonneborn_berger.get(noir, 0) + sens * points_noir * score_blanc
+
+    def _ajouter_progressif(self, joueur: int, points: float, tours_termines: int):
+        """Répercute des points sur le progressif des tours déjà terminés"""
+        if tours_termines:
+            self.progressif[joueur] = self.progressif.get(joueur, 0) + points * tours_termines
+
+    def enregistrer(self, blanc: int, noir: Optional[int], points_blanc: float, points_noir: float,
+                    tours_termines: int = 0):
+        """Prend en compte le résultat d'une partie (noir vaut None pour un bye).
+
+        ``tours_termines`` est le nombre de tours déjà clos depuis celui de la partie,
+        non nul seulement quand on corrige le résultat d'un tour terminé.
+        """
+        self._ajouter_progressif(blanc, points_blanc, tours_termines)
+        if noir is None:
+            self._ajouter_points(blanc, points_blanc)
+            return
+        self._ajouter_progressif(noir, points_noir, tours_termines)
+        self._ajouter_rencontre(blanc, noir, points_blanc, points_noir, 1)
+        self._adversaires.setdefault(blanc, []).append((noir, points_noir))
+        self._adversaires.setdefault(noir, []).append((blanc, points_blanc))
+        self._ajouter_points(blanc, points_blanc)
+        self._ajouter_points(noir, points_noir)
+
+    def retirer(self, blanc: int, noir: Optional[int], points_blanc: float, points_noir: float,
+                tours_termines: int = 0):
+        """Annule un résultat précédemment enregistré (correction d'une saisie)"""
+        self._ajouter_progressif(blanc, -points_blanc, tours_termines)
+        self._ajouter_points(blanc, -points_blanc)
+        if noir is None:
+            return
+        self._ajouter_progressif(noir, -points_noir, tours_termines)
+        self._ajouter_points(noir, -points_noir)
+        self._adversaires[blanc].remove((noir, points_noir))
+        self._adversaires[noir].remove((blanc, points_blanc))
+        self._ajouter_rencontre(blanc, noir, points_blanc, points_noir, -1)
+
+    def terminer_tour(self, joueurs: Iterable[int]):
+        """Ajoute le score de fin de tour de chaque joueur à son score progressif"""
+        for joueur in joueurs:
+            self.progressif[joueur] = self.progressif.get(joueur, 0) + self.points.get(joueur, 0)
+
+    def cle(self, joueur: int) -> Tuple[float, float, float, float]:
+        """Critères de classement d'un joueur, dans l'ordre des départages"""
+        return (self.points.get(joueur, 0), self.buchholz.get(joueur, 0),
+                self.sonneborn_berger.get(joueur, 0), self.progressif.get(joueur, 0))
+
+    @mesure('classement.tri')
+    def classer(self, joueurs: Iterable[int]) -> List[int]:
+        """Retourne les joueurs du premier au dernier"""
+        return sorted(joueurs, key=self.cle, reverse=True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convertit les agrégats en dictionnaire pour stockage"""
+        return {critere: {str(joueur): valeur for joueur, valeur in getattr(self, critere).items()}
+                for critere in CRITERES}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ScoresTournoi':
+        """Recrée les agrégats stockés ; les rencontres seront rechargées à la première mise à jour"""
+        scores = cls()
+        for critere in CRITERES:
+            setattr(scores, critere, {int(joueur): valeur for joueur, valeur in data.get(critere, {}).items()})
+        scores._adversaires = None
+        return scores
+
+    @classmethod
+    @mesure('classement.calcul')
+    def calculer(cls, parties: List[Partie], joueurs: Iterable[int],
+                 tours_termines: Optional[int] = None) -> 'ScoresTournoi':
+        """Recalcule tous les agrégats à partir de l'ensemble des parties, rangées par tour.
+
+        Deux parcours des parties : le premier cumule points et progressif, le second
+        Buchholz et Sonneborn-Berger une fois les scores finaux connus. Les joueurs sont
+        numérotés de 0 à n-1 pour indexer des tableaux de flottants plutôt que des dictionnaires.
+        Seuls les ``tours_termines`` premiers tours comptent pour le progressif (tous par défaut).
+        """
+        ids = list(dict.fromkeys(list(joueurs) + [p[1] for p in parties] +
+                                 [p[2] for p in parties if p[2] is not None]))
+        index = {joueur: i for i, joueur in enumerate(ids)}
+        n = len(ids)
+
+        tours = array('l', (p[0] for p in parties))
+        blancs = array('l', (index[p[1]] for p in parties))
+        noirs = array('l', (index[p[2]] if p[2] is not None else -1 for p in parties))
+        points_blancs = array('d', (p[3] for p in parties))
+        points_noirs = array('d', (p[4] for p in parties))
+
+        if tours_termines is None:
+            tours_termines = tours[-1] if parties else 0
+
+        points = array('d', bytes(8 * n))
+        progressif = array('d', bytes(8 * n))
+        for k in range(len(parties)):
+            points[blancs[k]] += points_blancs[k]
+            if noirs[k] >= 0:
+                points[noirs[k]] += points_noirs[k]
+            fin_de_tour = k + 1 == len(parties) or tours[k + 1] != tours[k]
+            if fin_de_tour and tours[k] <= tours_termines:
+                # Le score cumulé de chacun à la fin du tour s'ajoute au progressif
+                for i in range(n):
+                    progressif[i] += points[i]
+
+        buchholz = array('d', bytes(8 * n))
+        sonneborn_berger = array('d', bytes(8 * n))
+        for k in range(len(parties)):
+            blanc, noir = blancs[k], noirs[k]
+            if noir < 0:
+                continue
+            buchholz[blanc] += points[noir]
+            buchholz[noir] += points[blanc]
+            sonneborn_berger[blanc] += points_blancs[k] * points[noir]
+            sonneborn_berger[noir] += points_noirs[k] * points[blanc]
+
+        scores = cls()
+        scores.points = dict(zip(ids, points))
+        scores.buchholz = dict(zip(ids, buchholz))
+        scores.sonneborn_berger = dict(zip(ids, sonneborn_berger))
+        scores.progressif = dict(zip(ids, progressif))
+        scores.reconstruire_adversaires(parties)
+        return scores
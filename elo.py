@@ -0,0 +1,153 @@
+# Calcul des classements Elo à partir des résultats des parties
+#
+# Recalcul complet depuis l'historique de toutes les parties :
+#   python elo.py                 aperçu, rien n'est enregistré
+#   python elo.py --enregistrer   remplace les classements enregistrés, après confirmation
+#
+# Un joueur venu d'une liste officielle (id_externe) garde son classement, qui sert de départ au recalcul ;
+# les autres partent de CLASSEMENT_INITIAL.
+
+import argparse
+import time
+from array import array
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+CLASSEMENT_INITIAL = 1500
+K_FACTEUR = 20
+
+# Une partie à évaluer : (id des blancs, id des noirs, points des blancs)
+PartieElo = Tuple[int, int, float]
+
+
+def score_attendu(classement: float, classement_adversaire: float) -> float:
+    """Score moyen attendu face à un adversaire selon la formule Elo"""
+    return 1 / (1 + 10 ** ((classement_adversaire - classement) / 400))
+
+
+def variations(parties: Iterable[PartieElo], classements: Dict[int, float], k: float = K_FACTEUR) -> Dict[int, float]:
+    """Variations de classement pour un ensemble de parties jouées simultanément (un tour).
+
+    Toutes les parties sont évaluées avec les classements d'avant le tour.
+    """
+    resultat: Dict[int, float] = {}
+    for blanc, noir, points_blanc in parties:
+        attendu = score_attendu(classements[blanc], classements[noir])
+        ecart = k * (points_blanc - attendu)
+        resultat[blanc] = resultat.get(blanc, 0) + ecart
+        resultat[noir] = resultat.get(noir, 0) - ecart
+    return resultat
+
+
+def recalculer(blancs: Sequence[int], noirs: Sequence[int], points_blancs: Sequence[float], periodes: Sequence[int],
+               initiaux: Optional[Dict[int, float]] = None, k: float = K_FACTEUR,
+               avant: Optional[Tuple[array, array]] = None) -> Dict[int, float]:
+    """Recalcule les classements de tous les joueurs sur tout un historique, période par période.
+
+    Les parties sont données en colonnes, dans l'ordre chronologique ; ``periodes`` identifie
+    le tour de chaque partie. À l'intérieur d'une période, toutes les parties sont évaluées
+    avec les classements du début de période, puis les variations sont appliquées ensemble.
+    Les joueurs sont numérotés pour tenir classements et variations dans des tableaux de flottants.
+    ``avant``, s'il est donné, reçoit le classement des blancs et celui des noirs avant chaque partie.
+    """
+    initiaux = initiaux or {}
+    ids = list(dict.fromkeys(list(blancs) + list(noirs)))
+    index = {joueur: i for i, joueur in enumerate(ids)}
+
+    colonne_blancs = array('l', (index[joueur] for joueur in blancs))
+    colonne_noirs = array('l', (index[joueur] for joueur in noirs))
+    colonne_points = array('d', points_blancs)
+    classements = array('d', (initiaux.get(joueur, CLASSEMENT_INITIAL) for joueur in ids))
+    cumul = array('d', bytes(8 * len(ids)))
+
+    nb_parties = len(colonne_points)
+    debut = 0
+    while debut < nb_parties:
+        fin = debut
+        while fin < nb_parties and periodes[fin] == periodes[debut]:
+            fin += 1
+        # Les parties de la période sont évaluées, puis les variations appliquées ensemble
+        for partie in range(debut, fin):
+            blanc, noir = colonne_blancs[partie], colonne_noirs[partie]
+            if avant is not None:
+                avant[0].append(classements[blanc])
+                avant[1].append(classements[noir])
+            attendu = 1 / (1 + 10 ** ((classements[noir] - classements[blanc]) / 400))
+            ecart = k * (colonne_points[partie] - attendu)
+            cumul[blanc] += ecart
+            cumul[noir] -= ecart
+        for partie in range(debut, fin):
+            for joueur in (colonne_blancs[partie], colonne_noirs[partie]):
+                classements[joueur] += cumul[joueur]
+                cumul[joueur] = 0
+        debut = fin
+
+    return dict(zip(ids, classements))
+
+
+def classements_officiels(joueurs: Iterable[Any]) -> Dict[int, float]:
+    """Classements des joueurs venus d'une liste officielle (id_externe), points de départ des recalculs"""
+    return {joueur.id: joueur.classement for joueur in joueurs if joueur.id_externe}
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    # Import différé : Echec importe ce module pour les mises à jour après chaque tour
+    from Echec import CODES_RESULTATS, EXEMPT, Tournoi, depot_joueurs, unite_de_travail
+
+    parser = argparse.ArgumentParser(description="Recalcul des classements Elo depuis l'historique des parties")
+    parser.add_argument('--enregistrer', action='store_true',
+                        help="remplace les classements enregistrés par ceux recalculés, après confirmation")
+    parser.add_argument('--oui', action='store_true', help="enregistre sans demander de confirmation")
+    args = parser.parse_args(argv)
+
+    joueurs = {joueur.id: joueur for joueur in depot_joueurs.get_all()}
+    officiels = classements_officiels(joueurs.values())
+    blancs, noirs, points_blancs, periodes = array('l'), array('l'), array('d'), array('l')
+    periode = 0
+    ignorees = 0
+    for tournoi in sorted(Tournoi.get_all(), key=lambda t: (t.date_debut, t.id)):
+        for tour in tournoi.tours:
+            periode += 1
+            for blanc, noir, code in zip(tour.blancs, tour.noirs, tour.codes):
+                resultat = CODES_RESULTATS[code]
+                if noir == EXEMPT or resultat is None:
+                    continue
+                if blanc not in joueurs or noir not in joueurs:
+                    ignorees += 1  # Joueur supprimé de la base depuis la partie
+                    continue
+                blancs.append(blanc)
+                noirs.append(noir)
+                points_blancs.append(resultat[0])
+                periodes.append(periode)
+
+    debut = time.perf_counter()
+    classements = recalculer(blancs, noirs, points_blancs, periodes, initiaux=officiels)
+    duree = time.perf_counter() - debut
+    print(f"{len(points_blancs)} parties recalculées en {duree:.2f} s")
+    if ignorees:
+        print(f"⚠️ {ignorees} parties ignorées : joueur absent de la base")
+
+    nouveaux = {joueur_id: max(1, round(classement)) for joueur_id, classement in classements.items()
+                if joueur_id not in officiels}
+    modifies = {joueur_id: classement for joueur_id, classement in nouveaux.items()
+                if classement != joueurs[joueur_id].classement}
+    print(f"{len(modifies)} classements à remplacer ({len(officiels)} classements officiels conservés)")
+    if not args.enregistrer:
+        print("Aperçu seulement : relancez avec --enregistrer pour remplacer les classements.")
+        return
+    if not modifies:
+        return
+    question = f"Remplacer {len(modifies)} classements enregistrés ? (oui/non) : "
+    if not args.oui and input(question).strip().lower() != 'oui':
+        print("⚠️ Aucun classement modifié.")
+        return
+
+    with unite_de_travail():
+        for joueur_id, classement in modifies.items():
+            joueur = joueurs[joueur_id]
+            joueur.classement = classement
+            joueur.save()
+    print(f"✅ {len(modifies)} classements mis à jour")
+
+
+if __name__ == "__main__":
+    main()
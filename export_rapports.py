@@ -0,0 +1,184 @@
+# Export des rapports en CSV, HTML ou JSON, écrits au fil de l'eau par paquets de lignes
+#
+# Usage :
+#   python export_rapports.py joueurs [--ordre alphabetique|classement] [--format csv|html|json] [-o fichier]
+#   python export_rapports.py tournois                  liste des tournois
+#   python export_rapports.py inscrits TOURNOI_ID       joueurs d'un tournoi
+#   python export_rapports.py tours TOURNOI_ID          historique des tours et des matches d'un tournoi
+#
+# Les lignes sont produites une à une à partir des vues triées des joueurs : la mémoire utilisée
+# par l'export ne dépend pas du nombre de joueurs, seulement de la taille d'un paquet.
+# Ce module ne dépend pas d'Echec (le menu des rapports l'utilise) ; seul main() ouvre la base.
+
+import argparse
+import csv
+import html
+import json
+import sys
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from vues_triees import ORDRES
+
+TAILLE_PAQUET = 1000  # Lignes écrites à la fois
+
+TEXTE_RESULTATS = {(1, 0): '1-0', (0, 1): '0-1', (0.5, 0.5): '1/2-1/2'}
+
+COLONNES_JOUEURS = ['id', 'nom_famille', 'prenom', 'date_naissance', 'sexe', 'classement']
+COLONNES_TOURNOIS = ['id', 'nom', 'lieu', 'date_debut', 'date_fin', 'controle_temps', 'nb_tours',
+                     'nb_tours_joues', 'nb_joueurs', 'description']
+COLONNES_TOURS = ['tour', 'nom_tour', 'debut', 'fin', 'echiquier', 'blancs', 'nom_blancs', 'noirs', 'nom_noirs',
+                  'resultat']
+
+Rapport = Tuple[List[str], Iterator[Dict[str, Any]]]  # Colonnes et lignes du rapport
+
+
+def _joueur(joueur) -> Dict[str, Any]:
+    return {colonne: getattr(joueur, colonne) for colonne in COLONNES_JOUEURS}
+
+
+def _nom(joueur) -> str:
+    return f"{joueur.prenom} {joueur.nom_famille}" if joueur is not None else 'exempt'
+
+
+def rapport_joueurs(joueurs: Iterable[Any]) -> Rapport:
+    """Joueurs dans l'ordre où ils sont fournis (une vue triée, de préférence)"""
+    return COLONNES_JOUEURS, map(_joueur, joueurs)
+
+
+def rapport_tournois(tournois: Iterable[Any]) -> Rapport:
+    """Liste des tournois ; leurs tours ne sont pas lus"""
+    def lignes():
+        for tournoi in tournois:
+            yield {'id': tournoi.id, 'nom': tournoi.nom, 'lieu': tournoi.lieu, 'date_debut': tournoi.date_debut,
+                   'date_fin': tournoi.date_fin, 'controle_temps': tournoi.controle_temps,
+                   'nb_tours': tournoi.nb_tours, 'nb_tours_joues': tournoi.nb_tours_joues,
+                   'nb_joueurs': len(tournoi.joueurs), 'description': tournoi.description}
+    return COLONNES_TOURNOIS, lignes()
+
+
+def rapport_tours(tournoi) -> Rapport:
+    """Historique d'un tournoi : une ligne par match de chaque tour"""
+    def lignes():
+        for numero, tour in enumerate(tournoi.tours, 1):
+            debut = tour.debut.isoformat() if tour.debut else ''
+            fin = tour.fin.isoformat() if tour.fin else ''
+            for match in tour.matches:
+                j1, j2 = match.joueur1, match.joueur2
+                yield {'tour': numero, 'nom_tour': tour.nom, 'debut': debut, 'fin': fin,
+                       'echiquier': match.echiquier + 1, 'blancs': j1.id, 'nom_blancs': _nom(j1),
+                       'noirs': j2.id if j2 is not None else '', 'nom_noirs': _nom(j2),
+                       'resultat': TEXTE_RESULTATS.get(match.resultat, '')}
+    return COLONNES_TOURS, lignes()
+
+
+def paquets(lignes: Iterable[Dict[str, Any]], taille: int = TAILLE_PAQUET) -> Iterator[List[Dict[str, Any]]]:
+    """Découpe un flux de lignes en listes d'au plus ``taille`` lignes"""
+    lignes = iter(lignes)
+    while True:
+        paquet = list(islice(lignes, taille))
+        if not paquet:
+            return
+        yield paquet
+
+
+def ecrire_csv(flux: TextIO, colonnes: List[str], lignes: Iterable[Dict[str, Any]], titre: str = '') -> int:
+    ecrivain = csv.DictWriter(flux, fieldnames=colonnes)
+    ecrivain.writeheader()
+    nb_lignes = 0
+    for paquet in paquets(lignes):
+        ecrivain.writerows(paquet)
+        nb_lignes += len(paquet)
+    return nb_lignes
+
+
+def ecrire_json(flux: TextIO, colonnes: List[str], lignes: Iterable[Dict[str, Any]], titre: str = '') -> int:
+    flux.write('[')
+    nb_lignes = 0
+    for paquet in paquets(lignes):
+        separateur = ',\n' if nb_lignes else '\n'
+        flux.write(separateur + ',\n'.join(json.dumps(ligne, ensure_ascii=False) for ligne in paquet))
+        nb_lignes += len(paquet)
+    flux.write('\n]\n')
+    return nb_lignes
+
+
+def ecrire_html(flux: TextIO, colonnes: List[str], lignes: Iterable[Dict[str, Any]], titre: str = '') -> int:
+    titre = html.escape(titre)
+    flux.write(f'<!DOCTYPE html>\n<html lang="fr">\n<head><meta charset="utf-8"><title>{titre}</title></head>\n'
+               f'<body>\n<h1>{titre}</h1>\n<table>\n<thead><tr>')
+    flux.write(''.join(f'<th>{html.escape(colonne)}</th>' for colonne in colonnes))
+    flux.write('</tr></thead>\n<tbody>\n')
+    nb_lignes = 0
+    for paquet in paquets(lignes):
+        flux.write(''.join('<tr>' + ''.join(f'<td>{html.escape(str(ligne[colonne]))}</td>' for colonne in colonnes)
+                           + '</tr>\n' for ligne in paquet))
+        nb_lignes += len(paquet)
+    flux.write('</tbody>\n</table>\n</body>\n</html>\n')
+    return nb_lignes
+
+
+FORMATS = {'csv': ecrire_csv, 'html': ecrire_html, 'json': ecrire_json}
+
+
+def exporter(rapport: Rapport, flux: TextIO, format: str = 'csv', titre: str = '') -> int:
+    """Écrit un rapport dans le format demandé ; retourne le nombre de lignes écrites"""
+    if format not in FORMATS:
+        raise ValueError(f"Le format doit être parmi : {', '.join(FORMATS)}")
+    colonnes, lignes = rapport
+    return FORMATS[format](flux, colonnes, lignes, titre)
+
+
+def exporter_fichier(rapport: Rapport, chemin: str, format: Optional[str] = None, titre: str = '') -> int:
+    """Écrit un rapport dans un fichier ; le format est déduit de l'extension s'il n'est pas donné"""
+    format = format or chemin.rsplit('.', 1)[-1].lower()
+    if format not in FORMATS:
+        raise ValueError(f"Le format doit être parmi : {', '.join(FORMATS)}")
+    with open(chemin, 'w', encoding='utf-8', newline='') as flux:
+        return exporter(rapport, flux, format, titre)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export des rapports en CSV, HTML ou JSON")
+    parser.add_argument('rapport', choices=['joueurs', 'tournois', 'inscrits', 'tours'], help="rapport à exporter")
+    parser.add_argument('tournoi', type=int, nargs='?', help="identifiant du tournoi (inscrits, tours)")
+    parser.add_argument('--ordre', choices=list(ORDRES), default='alphabetique', help="ordre des joueurs")
+    parser.add_argument('--format', choices=list(FORMATS), help="format du fichier (d'après l'extension, sinon csv)")
+    parser.add_argument('-o', '--sortie', help="fichier de sortie (sortie standard par défaut)")
+    args = parser.parse_args(argv)
+
+    if args.rapport in ('inscrits', 'tours') and args.tournoi is None:
+        parser.error("indiquez l'identifiant du tournoi")
+
+    from Echec import Tournoi, depot_joueurs
+
+    try:
+        if args.rapport == 'joueurs':
+            rapport, titre = rapport_joueurs(depot_joueurs.vue(args.ordre)), "Joueurs"
+        elif args.rapport == 'tournois':
+            rapport, titre = rapport_tournois(Tournoi.get_entetes()), "Tournois"
+        else:
+            tournoi = Tournoi.get(args.tournoi)
+            if tournoi is None:
+                raise ValueError(f"tournoi {args.tournoi} introuvable")
+            if args.rapport == 'inscrits':
+                rapport = rapport_joueurs(tournoi.vue_joueurs(args.ordre))
+                titre = f"Joueurs du tournoi {tournoi.nom}"
+            else:
+                rapport, titre = rapport_tours(tournoi), f"Tours du tournoi {tournoi.nom}"
+
+        if args.sortie:
+            nb_lignes = exporter_fichier(rapport, args.sortie, args.format, titre)
+        else:
+            nb_lignes = exporter(rapport, sys.stdout, args.format or 'csv', titre)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Export impossible : {e}", file=sys.stderr)
+        return 1
+
+    if args.sortie:
+        print(f"✅ {nb_lignes} lignes exportées dans {args.sortie}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+# Import de listes de classement officielles (FIDE ou fédération nationale) dans la table des joueurs
+#
+# Usage : python import_classements.py players_list_foa.txt [--cadence rapide] [--source FIDE] [--lot 20000]
+#
+# Formats reconnus (une archive .zip contenant la liste est lue directement) :
+#   - texte à colonnes fixes des listes FIDE : la position des colonnes est lue dans l'en-tête
+#     ("ID Number", "Name", "Sex", "SRtng"/"RRtng"/"BRtng" ou "MAR24" pour une liste d'un mois, "B-day")
+#   - XML des listes FIDE : <player><fideid/><name/><sex/><rating/><rapid_rating/><blitz_rating/><birthday/></player>
+#
+# Chaque joueur est retrouvé par son identifiant dans la liste ("FIDE:1503014"), gardé dans
+# Joueur.id_externe : un joueur connu voit son classement (et son nom) mis à jour, un nouveau
+# joueur est créé. La liste est lue au fil de l'eau et écrite par lots.
+
+import argparse
+import io
+import re
+import sys
+import time
+import zipfile
+from typing import Dict, IO, Iterable, Iterator, List, NamedTuple, Optional
+from xml.etree import ElementTree
+
+import Echec
+from Echec import Joueur, depot_joueurs, unite_de_travail
+from elo import CLASSEMENT_INITIAL
+from import_pgn import separer_nom
+
+TAILLE_LOT = 20000
+
+CADENCES = ('standard', 'rapide', 'blitz')
+COLONNES_TEXTE = {'standard': 'SRtng', 'rapide': 'RRtng', 'blitz': 'BRtng'}
+BALISES_XML = {'standard': 'rating', 'rapide': 'rapid_rating', 'blitz': 'blitz_rating'}
+RE_COLONNE_MOIS = re.compile(r'(?<!\S)[A-Z]{3}\d{2}(?!\S)')  # Classement d'une liste d'un mois, ex. "MAR24"
+
+
+class LigneClassement(NamedTuple):
+    identifiant: str
+    nom_famille: str
+    prenom: str
+    sexe: str
+    annee_naissance: str  # "" si inconnue
+    classement: Optional[int]  # None pour un joueur non classé dans la cadence
+
+
+def _entier(texte: Optional[str]) -> Optional[int]:
+    texte = (texte or '').strip()
+    return int(texte) if texte.isdigit() and int(texte) > 0 else None
+
+
+def _annee(texte: Optional[str]) -> str:
+    texte = (texte or '').strip()
+    return texte if len(texte) == 4 and texte.isdigit() and texte != '0000' else ''
+
+
+def _ligne(identifiant: Optional[str], nom: Optional[str], sexe: Optional[str], naissance: Optional[str],
+           classement: Optional[str]) -> Optional[LigneClassement]:
+    identifiant = (identifiant or '').strip()
+    if not identifiant:
+        return None
+    nom_famille, prenom = separer_nom(nom or '')
+    return LigneClassement(identifiant, nom_famille, prenom, (sexe or '').strip().upper(), _annee(naissance),
+                           _entier(classement))
+
+
+def positions_colonnes(entete: str, libelles: Iterable[str]) -> Dict[str, slice]:
+    """Tranche de chaque colonne d'une ligne, d'après la position des libellés dans l'en-tête"""
+    debuts = sorted((m.start(), m.group(0)) for m in re.finditer(r'ID Number|\S+', entete))
+    tranches = {libelle: slice(debut, fin)
+                for (debut, libelle), (fin, _) in zip(debuts, debuts[1:] + [(None, None)])}
+    return {libelle: tranches[libelle] for libelle in libelles if libelle in tranches}
+
+
+def lire_texte(flux: Iterable[str], cadence: str = 'standard') -> Iterator[LigneClassement]:
+    """Parcourt une liste à colonnes fixes, une ligne à la fois"""
+    lignes = iter(flux)
+    entete = next(lignes, '')
+    colonne_classement = COLONNES_TEXTE[cadence]
+    if colonne_classement not in entete.split():
+        mois = RE_COLONNE_MOIS.search(entete)
+        colonne_classement = mois.group(0) if mois else colonne_classement
+    colonnes = positions_colonnes(entete, ('ID Number', 'Name', 'Sex', 'B-day', colonne_classement))
+    if 'ID Number' not in colonnes or 'Name' not in colonnes:
+        raise ValueError(f"En-tête de liste non reconnu : {entete.strip()[:80]!r}")
+    if colonne_classement not in colonnes:
+        raise ValueError(f"Colonne de classement {cadence} absente de la liste")
+
+    vide = slice(0, 0)
+    identifiant, nom, classement = colonnes['ID Number'], colonnes['Name'], colonnes[colonne_classement]
+    sexe, naissance = colonnes.get('Sex', vide), colonnes.get('B-day', vide)
+    for texte in lignes:
+        ligne = _ligne(texte[identifiant], texte[nom], texte[sexe], texte[naissance], texte[classement])
+        if ligne is not None:
+            yield ligne
+
+
+def lire_xml(flux: IO[bytes], cadence: str = 'standard') -> Iterator[LigneClassement]:
+    """Parcourt une liste XML, un élément <player> à la fois"""
+    balise_classement = BALISES_XML[cadence]
+    for _, element in ElementTree.iterparse(flux):
+        if element.tag != 'player':
+            continue
+        ligne = _ligne(element.findtext('fideid'), element.findtext('name'), element.findtext('sex'),
+                       element.findtext('birthday'), element.findtext(balise_classement))
+        element.clear()  # Libère le joueur lu : la mémoire reste constante quelle que soit la taille de la liste
+        if ligne is not None:
+            yield ligne
+
+
+def ouvrir_liste(chemin: str, cadence: str = 'standard', encodage: str = 'utf-8') -> Iterator[LigneClassement]:
+    """Lignes d'une liste au format texte ou XML, éventuellement dans une archive .zip"""
+    if zipfile.is_zipfile(chemin):
+        with zipfile.ZipFile(chemin) as archive:
+            noms = [nom for nom in archive.namelist() if not nom.endswith('/')]
+            if len(noms) != 1:
+                raise ValueError(f"L'archive doit contenir une seule liste ({len(noms)} fichiers)")
+            with archive.open(noms[0]) as flux:
+                yield from _lire_flux(flux, cadence, encodage)
+    else:
+        with open(chemin, 'rb') as flux:
+            yield from _lire_flux(flux, cadence, encodage)
+
+
+def _lire_flux(flux: IO[bytes], cadence: str, encodage: str) -> Iterator[LigneClassement]:
+    tampon = io.BufferedReader(flux) if not hasattr(flux, 'peek') else flux
+    if tampon.peek(64).lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'<'):
+        yield from lire_xml(tampon, cadence)
+    else:
+        yield from lire_texte(io.TextIOWrapper(tampon, encoding=encodage, errors='replace'), cadence)
+
+
+class ImportateurClassements:
+    """Crée ou met à jour les joueurs d'une liste de classement, par lots.
+
+    Les joueurs sont retrouvés par leur identifiant externe (source et numéro dans la liste).
+    Chaque lot est écrit en une seule fois : insertion groupée des nouveaux joueurs, puis mise
+    à jour des seuls champs modifiés des joueurs connus. Les joueurs déjà en mémoire sont
+    modifiés sur place, les tournois qui les référencent voient donc le nouveau classement.
+    """
+
+    def __init__(self, source: str = 'FIDE', taille_lot: int = TAILLE_LOT):
+        self.source = source
+        self.taille_lot = taille_lot
+        self.joueurs: Dict[str, Joueur] = {j.id_externe: j for j in depot_joueurs.get_all() if j.id_externe}
+        self._lignes: List[LigneClassement] = []
+        self.nb_lignes = 0
+        self.nb_crees = 0
+        self.nb_modifies = 0
+
+    @staticmethod
+    def _champs_modifies(joueur: Joueur, ligne: LigneClassement) -> Dict[str, object]:
+        """Champs du joueur que la ligne de la liste modifie"""
+        champs: Dict[str, object] = {}
+        if ligne.nom_famille and (ligne.nom_famille, ligne.prenom) != (joueur.nom_famille, joueur.prenom):
+            champs['nom_famille'], champs['prenom'] = ligne.nom_famille, ligne.prenom
+        if ligne.sexe and ligne.sexe != joueur.sexe:
+            champs['sexe'] = ligne.sexe
+        # Une date complète déjà connue est plus précise que l'année donnée par la liste
+        if ligne.annee_naissance and not joueur.date_naissance.startswith(ligne.annee_naissance):
+            champs['date_naissance'] = ligne.annee_naissance
+        if ligne.classement is not None and ligne.classement != joueur.classement:
+            champs['classement'] = ligne.classement
+        return champs
+
+    def ajouter(self, ligne: LigneClassement):
+        """Prend en compte une ligne de la liste ; le lot est écrit quand il est plein"""
+        self._lignes.append(ligne)
+        self.nb_lignes += 1
+        if len(self._lignes) >= self.taille_lot:
+            self.vider()
+
+    def vider(self):
+        """Écrit le lot courant : nouveaux joueurs, puis joueurs modifiés"""
+        if not self._lignes:
+            return
+
+        nouveaux: List[Joueur] = []
+        modifications: Dict[int, Dict[str, object]] = {}
+        for ligne in self._lignes:
+            id_externe = f"{self.source}:{ligne.identifiant}"
+            joueur = self.joueurs.get(id_externe)
+            if joueur is None:
+                joueur = Joueur(ligne.nom_famille, ligne.prenom, ligne.annee_naissance, ligne.sexe,
+                                ligne.classement or CLASSEMENT_INITIAL, id_externe=id_externe)
+                self.joueurs[id_externe] = joueur
+                nouveaux.append(joueur)
+            elif joueur.id is None:
+                # Identifiant répété dans le même lot : le joueur n'est pas encore écrit
+                for champ, valeur in self._champs_modifies(joueur, ligne).items():
+                    setattr(joueur, champ, valeur)
+            else:
+                champs = self._champs_modifies(joueur, ligne)
+                if champs:
+                    modifications.setdefault(joueur.id, {}).update(champs)
+        self._lignes = []
+
+        with unite_de_travail():
+            if nouveaux:
+                ids = Echec.joueurs_table.insert_multiple(j.to_dict() for j in nouveaux)
+                for joueur, joueur_id in zip(nouveaux, ids):
+                    joueur.id = joueur_id
+            if modifications:
+                Echec.joueurs_table.modifier_documents(modifications)
+        modifies = [depot_joueurs.get(joueur_id) for joueur_id in modifications]
+        for joueur, champs in zip(modifies, modifications.values()):
+            for champ, valeur in champs.items():
+                setattr(joueur, champ, valeur)
+        depot_joueurs.enregistrer_multiple(nouveaux + modifies)
+        self.nb_crees += len(nouveaux)
+        self.nb_modifies += len(modifications)
+
+
+def importer(lignes: Iterable[LigneClassement], source: str = 'FIDE', taille_lot: int = TAILLE_LOT,
+             progression: bool = True) -> ImportateurClassements:
+    """Importe toutes les lignes d'une liste de classement"""
+    importateur = ImportateurClassements(source, taille_lot)
+    debut = time.perf_counter()
+    for ligne in lignes:
+        importateur.ajouter(ligne)
+        if progression and importateur.nb_lignes % taille_lot == 0:
+            duree = time.perf_counter() - debut
+            print(f"  {importateur.nb_lignes} joueurs ({importateur.nb_lignes / duree:.0f}/s) : "
+                  f"{importateur.nb_crees} créés, {importateur.nb_modifies} mis à jour", file=sys.stderr)
+    importateur.vider()
+    return importateur
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import d'une liste de classement officielle dans la base")
+    parser.add_argument('fichier', help="liste au format texte FIDE ou XML FIDE, éventuellement en .zip")
+    parser.add_argument('--cadence', choices=CADENCES, default='standard', help="classement à importer")
+    parser.add_argument('--source', default='FIDE', help="préfixe des identifiants de la liste (FIDE, FFE...)")
+    parser.add_argument('--lot', type=int, default=TAILLE_LOT, help="nombre de joueurs écrits à la fois")
+    parser.add_argument('--encodage', default='utf-8', help="encodage d'une liste au format texte")
+    args = parser.parse_args(argv)
+
+    debut = time.perf_counter()
+    try:
+        importateur = importer(ouvrir_liste(args.fichier, args.cadence, args.encodage), args.source, args.lot)
+    except ValueError as e:
+        print(f"⚠️ {e}", file=sys.stderr)
+        return 1
+    duree = time.perf_counter() - debut
+
+    inchanges = importateur.nb_lignes - importateur.nb_crees - importateur.nb_modifies
+    print(f"✅ {importateur.nb_lignes} joueurs lus en {duree:.1f} s : {importateur.nb_crees} créés, "
+          f"{importateur.nb_modifies} mis à jour, {inchanges} inchangés.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
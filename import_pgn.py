@@ -0,0 +1,254 @@
+# Import de parties au format PGN : tournois, tours, matches et joueurs
+#
+# Usage : python import_pgn.py parties.pgn [--lot 5000]
+#
+# Seuls les en-têtes des parties sont lus (les coups sont ignorés) :
+#   Event, Site      -> Tournoi (nom, lieu)
+#   Date             -> dates de début et de fin du tournoi
+#   Round            -> numéro du tour ("3" ou "3.12" pour l'échiquier 12 du tour 3)
+#   White, Black     -> Joueur ("Nom, Prénom"), avec WhiteElo/BlackElo pour le classement
+#   WhiteBirthDate, BlackBirthDate (facultatifs) -> date de naissance, utilisée pour distinguer les homonymes
+#   Result           -> résultat du match
+#   TimeControl      -> contrôle du temps (bullet/blitz/rapide)
+
+import argparse
+import re
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+import Echec
+from Echec import RESULTATS_CODES, Joueur, Tour, Tournoi, depot_joueurs, unite_de_travail
+from departages import ScoresTournoi
+from elo import CLASSEMENT_INITIAL
+
+RE_ENTETE = re.compile(r'\[(\w+)\s+"(.*)"\]')
+
+RESULTATS_PGN = {'1-0': (1, 0), '0-1': (0, 1), '1/2-1/2': (0.5, 0.5)}
+
+TAILLE_LOT = 5000
+TOURNOIS_OUVERTS = 64  # Nombre de tournois gardés en mémoire entre deux lots
+
+CleJoueur = Tuple[str, str, str]
+
+
+def lire_entetes(flux: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """Parcourt un flux PGN et produit les en-têtes de chaque partie, une partie à la fois"""
+    entetes: Dict[str, str] = {}
+    dans_les_coups = False
+    for ligne in flux:
+        if ligne.startswith('['):
+            if dans_les_coups and entetes:
+                yield entetes
+                entetes = {}
+            dans_les_coups = False
+            correspondance = RE_ENTETE.match(ligne)
+            if correspondance:
+                entetes[correspondance.group(1)] = correspondance.group(2)
+        elif ligne.strip():
+            dans_les_coups = True
+    if entetes:
+        yield entetes
+
+
+def separer_nom(nom: str) -> Tuple[str, str]:
+    """Sépare 'Nom, Prénom' (ou 'Prénom Nom') en (nom de famille, prénom)"""
+    if ',' in nom:
+        nom_famille, prenom = nom.split(',', 1)
+    else:
+        prenom, _, nom_famille = nom.strip().rpartition(' ')
+    return nom_famille.strip(), prenom.strip()
+
+
+def lire_date(texte: Optional[str]) -> Optional[str]:
+    """Convertit une date PGN ('2024.03.17', éventuellement avec des '?') au format YYYY-MM-DD"""
+    if not texte or '?' in texte:
+        return None
+    return texte.replace('.', '-')
+
+
+def controle_du_temps(texte: Optional[str]) -> str:
+    """Déduit bullet/blitz/rapide du tag TimeControl ('180+2' : secondes + incrément)"""
+    try:
+        base, _, increment = (texte or '').split(':')[0].partition('+')
+        duree = int(base) + 40 * int(increment or 0)  # Durée estimée d'une partie de 40 coups
+    except ValueError:
+        return 'rapide'
+    if duree < 180:
+        return 'bullet'
+    if duree <= 600:
+        return 'blitz'
+    return 'rapide'
+
+
+def lire_tour(texte: Optional[str]) -> int:
+    """Numéro du tour à partir du tag Round ('3' ou '3.12') ; 1 s'il est inconnu"""
+    try:
+        return max(1, int((texte or '').split('.')[0]))
+    except ValueError:
+        return 1
+
+
+class ImportateurPGN:
+    """Construit tournois, tours et joueurs à partir d'un flux d'en-têtes PGN, par lots.
+
+    Les joueurs sont dédoublonnés par (nom, prénom, date de naissance), y compris avec ceux
+    déjà présents dans la base ; les tournois par (Event, Site). Chaque lot de parties est
+    écrit en une seule fois : insertion groupée des nouveaux joueurs puis sauvegarde des
+    tournois modifiés.
+    """
+
+    def __init__(self, taille_lot: int = TAILLE_LOT):
+        self.taille_lot = taille_lot
+        self.joueurs: Dict[CleJoueur, Joueur] = {self._cle(j.nom_famille, j.prenom, j.date_naissance): j
+                                                 for j in depot_joueurs.get_all()}
+        self.tournois_ids: Dict[Tuple[str, str], int] = {(t.nom, t.lieu): t.id for t in Tournoi.get_entetes()}
+        self._tournois: 'OrderedDict[Tuple[str, str], Tournoi]' = OrderedDict()
+        self._nouveaux_joueurs: List[Joueur] = []
+        self._parties: List[Tuple[Tuple[str, str], int, Joueur, Joueur, Optional[Tuple[float, float]],
+                                  Optional[str], str]] = []
+        self.nb_parties = 0
+        self.nb_joueurs_crees = 0
+        self.nb_tournois_crees = 0
+
+    @staticmethod
+    def _cle(nom_famille: str, prenom: str, date_naissance: str) -> CleJoueur:
+        return nom_famille.lower(), prenom.lower(), date_naissance
+
+    def _joueur(self, nom: str, date_naissance: Optional[str], elo: Optional[str]) -> Joueur:
+        """Retrouve ou crée (sans l'enregistrer) le joueur correspondant"""
+        nom_famille, prenom = separer_nom(nom)
+        date_naissance = lire_date(date_naissance) or ""
+        cle = self._cle(nom_famille, prenom, date_naissance)
+        joueur = self.joueurs.get(cle)
+        if joueur is None:
+            classement = int(elo) if elo and elo.isdigit() else CLASSEMENT_INITIAL
+            joueur = Joueur(nom_famille, prenom, date_naissance, "", classement)
+            self.joueurs[cle] = joueur
+            self._nouveaux_joueurs.append(joueur)
+        return joueur
+
+    def _tournoi(self, cle: Tuple[str, str], date: Optional[str], controle_temps: str) -> Tournoi:
+        """Retrouve, recharge ou crée le tournoi d'une partie"""
+        tournoi = self._tournois.get(cle)
+        if tournoi is not None:
+            self._tournois.move_to_end(cle)
+            return tournoi
+
+        tournoi_id = self.tournois_ids.get(cle)
+        if tournoi_id is not None:
+            tournoi = Tournoi.get(tournoi_id)
+        else:
+            tournoi = Tournoi(cle[0], cle[1], date or "", date or "", nb_tours=0, controle_temps=controle_temps)
+            tournoi.save()
+            self.tournois_ids[cle] = tournoi.id
+            self.nb_tournois_crees += 1
+        self._tournois[cle] = tournoi
+        return tournoi
+
+    def ajouter(self, entetes: Dict[str, str]):
+        """Prend en compte les en-têtes d'une partie ; le lot est écrit quand il est plein"""
+        cle = (entetes.get('Event') or '?', entetes.get('Site') or '?')
+        blancs = self._joueur(entetes.get('White', '?'), entetes.get('WhiteBirthDate'), entetes.get('WhiteElo'))
+        noirs = self._joueur(entetes.get('Black', '?'), entetes.get('BlackBirthDate'), entetes.get('BlackElo'))
+        resultat = RESULTATS_PGN.get(entetes.get('Result', '*'))
+        self._parties.append((cle, lire_tour(entetes.get('Round')), blancs, noirs, resultat,
+                              lire_date(entetes.get('Date')), controle_du_temps(entetes.get('TimeControl'))))
+        self.nb_parties += 1
+        if len(self._parties) >= self.taille_lot:
+            self.vider()
+
+    def vider(self):
+        """Écrit le lot courant : nouveaux joueurs, puis tours et tournois modifiés"""
+        if not self._parties and not self._nouveaux_joueurs:
+            return
+
+        with unite_de_travail():
+            if self._nouveaux_joueurs:
+                ids = Echec.joueurs_table.insert_multiple(j.to_dict() for j in self._nouveaux_joueurs)
+                for joueur, joueur_id in zip(self._nouveaux_joueurs, ids):
+                    joueur.id = joueur_id
+                    depot_joueurs.enregistrer(joueur)
+                self.nb_joueurs_crees += len(ids)
+                self._nouveaux_joueurs = []
+
+            modifies: Dict[int, Tournoi] = {}
+            inscrits: Dict[int, Set[int]] = {}
+            for cle, numero, blancs, noirs, resultat, date, controle_temps in self._parties:
+                tournoi = self._tournoi(cle, date, controle_temps)
+                if tournoi.id not in inscrits:
+                    inscrits[tournoi.id] = set(tournoi.joueurs)
+                self._ajouter_partie(tournoi, inscrits[tournoi.id], numero, blancs, noirs, resultat, date)
+                modifies[tournoi.id] = tournoi
+            self._parties = []
+
+            for tournoi in modifies.values():
+                tournoi.scores = ScoresTournoi.calculer(tournoi.parties(), tournoi.joueurs)
+                tournoi.save()
+
+        # Seuls les tournois les plus récemment utilisés restent en mémoire
+        while len(self._tournois) > TOURNOIS_OUVERTS:
+            self._tournois.popitem(last=False)
+
+    @staticmethod
+    def _ajouter_partie(tournoi: Tournoi, inscrits: Set[int], numero: int, blancs: Joueur, noirs: Joueur,
+                        resultat: Optional[Tuple[float, float]], date: Optional[str]):
+        """Ajoute une partie aux colonnes du tour correspondant"""
+        for joueur in (blancs, noirs):
+            if joueur.id not in inscrits:
+                inscrits.add(joueur.id)
+                tournoi.joueurs.append(joueur.id)
+
+        while len(tournoi.tours) < numero:
+            tour = Tour(f"Tour {len(tournoi.tours) + 1}")
+            tour.terminer_tour()
+            tournoi.tours.append(tour)
+        tournoi.nb_tours = max(tournoi.nb_tours, numero)
+
+        tour = tournoi.tours[numero - 1]
+        if date:
+            tour.debut = tour.fin = datetime.fromisoformat(date)
+            tournoi.date_debut = min(tournoi.date_debut or date, date)
+            tournoi.date_fin = max(tournoi.date_fin or date, date)
+        tour.blancs.append(blancs.id)
+        tour.noirs.append(noirs.id)
+        tour.codes.append(RESULTATS_CODES[resultat])
+        tour.modifie()
+
+
+def importer(flux: TextIO, taille_lot: int = TAILLE_LOT, progression: bool = True) -> ImportateurPGN:
+    """Importe toutes les parties d'un flux PGN"""
+    importateur = ImportateurPGN(taille_lot)
+    debut = time.perf_counter()
+    for entetes in lire_entetes(flux):
+        importateur.ajouter(entetes)
+        if progression and importateur.nb_parties % taille_lot == 0:
+            duree = time.perf_counter() - debut
+            print(f"  {importateur.nb_parties} parties ({importateur.nb_parties / duree:.0f}/s)", file=sys.stderr)
+    importateur.vider()
+    return importateur
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import de parties PGN dans la base du gestionnaire de tournois")
+    parser.add_argument('fichier', help="fichier PGN ('-' pour l'entrée standard)")
+    parser.add_argument('--lot', type=int, default=TAILLE_LOT, help="nombre de parties écrites à la fois")
+    args = parser.parse_args(argv)
+
+    debut = time.perf_counter()
+    if args.fichier == '-':
+        importateur = importer(sys.stdin, args.lot)
+    else:
+        with open(args.fichier, encoding='utf-8', errors='replace') as f:
+            importateur = importer(f, args.lot)
+    duree = time.perf_counter() - debut
+
+    print(f"✅ {importateur.nb_parties} parties importées en {duree:.1f} s : "
+          f"{importateur.nb_tournois_crees} tournois et {importateur.nb_joueurs_crees} joueurs créés.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
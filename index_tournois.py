@@ -0,0 +1,219 @@
+# Recherche de tournois par période, lieu, contrôle du temps ou joueur inscrit, sans parcourir tous les tournois
+#
+# - période : les tournois sont rangés par date de début et par date de fin dans deux vues triées ; les
+#   tournois en cours pendant une période sont lus par dichotomie dans la plus courte des deux plages
+#   possibles (début dans la période élargie de DUREE_FENETRE jours, ou fin après le début) ; les rares
+#   tournois plus longs, ou aux dates illisibles, sont vérifiés un par un ;
+# - lieu (sans accents ni majuscules) et contrôle du temps : tables de hachage vers les ids des tournois ;
+# - joueur : index inversé, de l'id d'un joueur vers les tournois où il est inscrit (construit à la
+#   première recherche par joueur).
+# Une recherche part du critère le plus sélectif, puis vérifie les autres tournoi par tournoi.
+
+import re
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from recherche import normaliser
+from vues_triees import Cle, VueTriee
+
+FIN_DATES = '\U0010ffff'  # Plus grand que toute date : borne haute d'une période ouverte
+DUREE_FENETRE = 31  # Durée (en jours) au-delà de laquelle un tournoi est vérifié à chaque recherche par période
+RE_PERIODE = re.compile(r'(\d{4}-\d{2}-\d{2})(?:\.\.(\d{4}-\d{2}-\d{2}))?')
+
+
+def cle_debut(tournoi) -> Cle:
+    return (tournoi.date_debut,)
+
+
+def cle_fin(tournoi) -> Cle:
+    return (tournoi.date_fin,)
+
+
+def lire_jour(texte: str) -> date:
+    """Date au format AAAA-MM-JJ, ou ValueError"""
+    try:
+        return date.fromisoformat(texte)
+    except (TypeError, ValueError):
+        raise ValueError(f"Date invalide : {texte!r} (format AAAA-MM-JJ)") from None
+
+
+def _duree(tournoi) -> Optional[int]:
+    """Durée du tournoi en jours, ou None si ses dates sont illisibles"""
+    try:
+        return (date.fromisoformat(tournoi.date_fin) - date.fromisoformat(tournoi.date_debut)).days
+    except (TypeError, ValueError):
+        return None
+
+
+class IndexTournois:
+    """Index des tournois, construit une fois puis tenu à jour à chaque sauvegarde d'un tournoi"""
+
+    def __init__(self, tournois: Iterable[Any] = ()):
+        tournois = [tournoi for tournoi in tournois if tournoi.id is not None]
+        self._tournois: Dict[int, Any] = {}
+        self._debuts = VueTriee(cle_debut, tournois)
+        self._fins = VueTriee(cle_fin, tournois)
+        self._longs: Set[int] = set()  # Tournois plus longs que DUREE_FENETRE ou aux dates illisibles
+        self._par_lieu: Dict[str, Set[int]] = {}
+        self._par_controle: Dict[str, Set[int]] = {}
+        self._par_joueur: Optional[Dict[int, Set[int]]] = None
+        self._cles: Dict[int, Tuple[str, str]] = {}  # Lieu et contrôle indexés
+        self._inscrits: Dict[int, Set[int]] = {}  # Inscrits indexés, une fois l'index par joueur construit
+        for tournoi in tournois:
+            self._tournois[tournoi.id] = tournoi
+            self._indexer(tournoi)
+
+    def __len__(self) -> int:
+        return len(self._tournois)
+
+    def __contains__(self, tournoi_id: int) -> bool:
+        return tournoi_id in self._tournois
+
+    def _indexer(self, tournoi):
+        duree = _duree(tournoi)
+        if duree is None or duree > DUREE_FENETRE:
+            self._longs.add(tournoi.id)
+        else:
+            self._longs.discard(tournoi.id)
+        lieu, controle = self._cles.get(tournoi.id, (None, None))
+        nouveau_lieu, nouveau_controle = normaliser(tournoi.lieu), tournoi.controle_temps
+        if nouveau_lieu != lieu:
+            self._deplacer(self._par_lieu, tournoi.id, lieu, nouveau_lieu)
+        if nouveau_controle != controle:
+            self._deplacer(self._par_controle, tournoi.id, controle, nouveau_controle)
+        self._cles[tournoi.id] = nouveau_lieu, nouveau_controle
+        if self._par_joueur is not None:
+            self._indexer_inscrits(tournoi)
+
+    def _indexer_inscrits(self, tournoi):
+        inscrits = self._inscrits.get(tournoi.id, set())
+        nouveaux_inscrits = self._inscrits[tournoi.id] = set(tournoi.joueurs)
+        for joueur_id in inscrits - nouveaux_inscrits:
+            self._deplacer(self._par_joueur, tournoi.id, joueur_id, None)
+        for joueur_id in nouveaux_inscrits - inscrits:
+            self._par_joueur.setdefault(joueur_id, set()).add(tournoi.id)
+
+    def _index_joueurs(self) -> Dict[int, Set[int]]:
+        """Index inversé des inscriptions, construit au premier besoin"""
+        if self._par_joueur is None:
+            self._par_joueur = {}
+            for tournoi in self._tournois.values():
+                self._indexer_inscrits(tournoi)
+        return self._par_joueur
+
+    @staticmethod
+    def _deplacer(index: Dict[Any, Set[int]], tournoi_id: int, ancienne: Any, nouvelle: Any):
+        """Range un tournoi sous une nouvelle clé d'un index de hachage (None : aucune)"""
+        if ancienne is not None:
+            ids = index.get(ancienne, set())
+            ids.discard(tournoi_id)
+            if not ids:
+                index.pop(ancienne, None)
+        if nouvelle is not None:
+            index.setdefault(nouvelle, set()).add(tournoi_id)
+
+    def ajouter(self, tournoi):
+        """Indexe un nouveau tournoi, ou réindexe un tournoi modifié"""
+        self._tournois[tournoi.id] = tournoi
+        self._debuts.ajouter(tournoi)
+        self._fins.ajouter(tournoi)
+        self._indexer(tournoi)
+
+    def mettre_a_jour(self, tournoi):
+        """Réindexe un tournoi qui vient d'être sauvegardé, s'il s'agit de l'instance indexée"""
+        if self._tournois.get(tournoi.id) is tournoi:
+            self.ajouter(tournoi)
+
+    def retirer(self, tournoi_id: int):
+        if self._tournois.pop(tournoi_id, None) is None:
+            return
+        self._debuts.retirer(tournoi_id)
+        self._fins.retirer(tournoi_id)
+        self._longs.discard(tournoi_id)
+        lieu, controle = self._cles.pop(tournoi_id)
+        self._deplacer(self._par_lieu, tournoi_id, lieu, None)
+        self._deplacer(self._par_controle, tournoi_id, controle, None)
+        for joueur_id in self._inscrits.pop(tournoi_id, ()):
+            self._deplacer(self._par_joueur, tournoi_id, joueur_id, None)
+
+    def _periode(self, debut: Optional[str], fin: Optional[str]) -> Tuple[int, Callable[[], Iterable[int]]]:
+        """Nombre de tournois candidats pour une période, et de quoi lire leurs ids (à vérifier)"""
+        borne_haute = (fin + '\0',) if fin is not None else (FIN_DATES,)
+        if debut is None:
+            candidats = [(self._debuts.nombre_entre(('',), borne_haute), self._debuts, ('',), borne_haute)]
+        else:
+            # Un tournoi court en cours à la date ``debut`` a commencé au plus tôt DUREE_FENETRE jours avant
+            plus_tot = (lire_jour(debut) - timedelta(days=DUREE_FENETRE)).isoformat()
+            candidats = [(self._debuts.nombre_entre((plus_tot,), borne_haute), self._debuts, (plus_tot,), borne_haute),
+                         (self._fins.nombre_entre((debut,), (FIN_DATES,)), self._fins, (debut,), (FIN_DATES,))]
+        nombre, vue, bas, haut = min(candidats, key=lambda candidat: candidat[0])
+        return nombre + len(self._longs), lambda: {t.id for t in vue.entre(bas, haut)} | self._longs
+
+    def rechercher(self, debut: Optional[str] = None, fin: Optional[str] = None, lieu: Optional[str] = None,
+                   controle_temps: Optional[str] = None, joueur_id: Optional[int] = None,
+                   limite: Optional[int] = None) -> List[Any]:
+        """Tournois en cours (au moins un jour) entre ``debut`` et ``fin`` inclus, et qui remplissent les
+        autres critères donnés ; du plus récent au plus ancien.
+
+        Les dates sont au format AAAA-MM-JJ ; une borne absente laisse la période ouverte.
+        """
+        if fin is not None:
+            lire_jour(fin)
+        lieu = normaliser(lieu) if lieu is not None else None
+        # (nombre de candidats, lecture de leurs ids) pour chaque critère ; seul le plus sélectif est lu
+        candidats: List[Tuple[int, Callable[[], Iterable[int]]]] = []
+        par_joueur = self._index_joueurs() if joueur_id is not None else {}
+        for index, cle in ((self._par_lieu, lieu), (self._par_controle, controle_temps and controle_temps.lower()),
+                           (par_joueur, joueur_id)):
+            if cle is not None:
+                ids = index.get(cle, set())
+                candidats.append((len(ids), lambda ids=ids: ids))
+        if debut is not None or fin is not None:
+            candidats.append(self._periode(debut, fin))
+        if not candidats:
+            candidats.append((len(self._tournois), lambda: self._tournois))
+        ids = min(candidats, key=lambda candidat: candidat[0])[1]()
+
+        trouves = []
+        for tournoi_id in ids:
+            tournoi = self._tournois[tournoi_id]
+            tournoi_lieu, tournoi_controle = self._cles[tournoi_id]
+            if ((lieu is None or tournoi_lieu == lieu)
+                    and (controle_temps is None or tournoi_controle == controle_temps.lower())
+                    and (joueur_id is None or joueur_id in self._inscrits[tournoi_id])
+                    and (fin is None or tournoi.date_debut <= fin)
+                    and (debut is None or tournoi.date_fin >= debut)):
+                trouves.append(tournoi)
+        trouves.sort(key=lambda tournoi: (tournoi.date_debut, tournoi.id), reverse=True)
+        return trouves[:limite] if limite is not None else trouves
+
+
+def lire_recherche(texte: str, controles: Iterable[str] = ()) -> Dict[str, Any]:
+    """Critères d'une recherche saisie en texte libre.
+
+    Une date (AAAA-MM-JJ) ou une période (AAAA-MM-JJ..AAAA-MM-JJ), 'semaine' pour la semaine en cours,
+    un contrôle du temps, '#42' pour les tournois du joueur 42 ; les autres mots forment le lieu.
+    Exemples : 'blitz lyon', '2024-03-04..2024-03-10', 'semaine #42'.
+    """
+    criteres: Dict[str, Any] = {}
+    lieu = []
+    controles = {controle.lower() for controle in controles}
+    for mot in texte.split():
+        periode = RE_PERIODE.fullmatch(mot)
+        if periode:
+            debut, fin = periode.group(1), periode.group(2) or periode.group(1)
+            if lire_jour(debut) > lire_jour(fin):
+                raise ValueError(f"Période invalide : {mot} (la fin précède le début)")
+            criteres['debut'], criteres['fin'] = debut, fin
+        elif mot.lower() == 'semaine':
+            lundi = date.today() - timedelta(days=date.today().weekday())
+            criteres['debut'], criteres['fin'] = lundi.isoformat(), (lundi + timedelta(days=6)).isoformat()
+        elif mot.lower() in controles:
+            criteres['controle_temps'] = mot.lower()
+        elif mot.startswith('#') and mot[1:].isdigit():
+            criteres['joueur_id'] = int(mot[1:])
+        else:
+            lieu.append(mot)
+    if lieu:
+        criteres['lieu'] = ' '.join(lieu)
+    return criteres
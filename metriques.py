@@ -0,0 +1,257 @@
+# Mesures de l'application : compteurs, histogrammes de latence et profil cProfile à la demande
+#
+# Les fonctions instrumentées (lectures et écritures de la base, (dé)sérialisation des tournois,
+# appariement, classements) sont décorées par ``mesure``. Tant que les mesures sont désactivées,
+# le décorateur ne coûte qu'un test de drapeau par appel.
+#
+# Activation :
+#   ECHEC_METRIQUES=metriques.json python Echec.py     fichier réécrit toutes les 60 s et à la sortie
+#   ECHEC_METRIQUES_PERIODE=10                          autre période d'écriture, en secondes
+#   kill -USR1 <pid>                                    écriture immédiate du fichier (Unix)
+#   python metriques.py metriques.json                  affiche un fichier de mesures
+#
+# Dans le menu principal, un choix préfixé par « p » (p4, p5...) est exécuté sous cProfile.
+
+import atexit
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+NB_SEAUX = 32  # Seau i : durées de moins de 2**i µs (le dernier reçoit tout ce qui dépasse)
+PERIODE = 60.0
+QUANTILES = (0.5, 0.9, 0.99)
+
+_actif = False
+_verrou = threading.Lock()
+_debut = time.time()
+_compteurs: Dict[str, int] = {}
+_latences: Dict[str, 'Histogramme'] = {}
+_fichier: Optional[str] = None
+_arret: Optional[threading.Event] = None
+
+
+class Histogramme:
+    """Latences d'une opération, par seaux de puissances de deux (en microsecondes)"""
+
+    __slots__ = ('nombre', 'total', 'maximum', 'seaux')
+
+    def __init__(self):
+        self.nombre = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.seaux = [0] * NB_SEAUX
+
+    def ajouter(self, duree: float):
+        self.nombre += 1
+        self.total += duree
+        if duree > self.maximum:
+            self.maximum = duree
+        self.seaux[min(int(duree * 1e6).bit_length(), NB_SEAUX - 1)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Borne haute (en secondes) du seau qui contient le quantile ``q``"""
+        rang = q * self.nombre
+        cumul = 0
+        for i, nombre in enumerate(self.seaux):
+            cumul += nombre
+            if nombre and cumul >= rang:
+                return min((1 << i) / 1e6, self.maximum)
+        return self.maximum
+
+    def to_dict(self) -> Dict[str, Any]:
+        resultat = {'nombre': self.nombre, 'total_ms': self.total * 1000,
+                    'moyenne_ms': self.total * 1000 / self.nombre if self.nombre else 0.0,
+                    'max_ms': self.maximum * 1000}
+        for q in QUANTILES:
+            resultat[f'p{round(q * 100)}_ms'] = self.quantile(q) * 1000
+        resultat['seaux_us'] = {str(1 << i): nombre for i, nombre in enumerate(self.seaux) if nombre}
+        return resultat
+
+
+def actif() -> bool:
+    return _actif
+
+
+def enregistrer(nom: str, duree: float):
+    """Ajoute une durée (en secondes) à l'histogramme d'une opération"""
+    with _verrou:
+        histogramme = _latences.get(nom)
+        if histogramme is None:
+            histogramme = _latences[nom] = Histogramme()
+        histogramme.ajouter(duree)
+
+
+def compter(nom: str, nombre: int = 1):
+    """Incrémente un compteur (sans effet si les mesures sont désactivées)"""
+    if _actif:
+        with _verrou:
+            _compteurs[nom] = _compteurs.get(nom, 0) + nombre
+
+
+def mesure(nom: str) -> Callable[[F], F]:
+    """Décorateur : chaque appel est compté et sa durée rangée dans l'histogramme ``nom``"""
+    def decorer(fonction: F) -> F:
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            if not _actif:
+                return fonction(*args, **kwargs)
+            debut = time.perf_counter()
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                enregistrer(nom, time.perf_counter() - debut)
+        return enveloppe  # type: ignore[return-value]
+    return decorer
+
+
+@contextmanager
+def chronometre(nom: str) -> Iterator[None]:
+    """Mesure la durée d'un bloc, comme ``mesure`` pour une fonction"""
+    if not _actif:
+        yield
+        return
+    debut = time.perf_counter()
+    try:
+        yield
+    finally:
+        enregistrer(nom, time.perf_counter() - debut)
+
+
+def instantane() -> Dict[str, Any]:
+    """Copie des compteurs et des histogrammes, prête à être écrite en JSON"""
+    with _verrou:
+        return {'debut': datetime.fromtimestamp(_debut).isoformat(timespec='seconds'),
+                'date': datetime.now().isoformat(timespec='seconds'), 'duree_s': time.time() - _debut,
+                'compteurs': dict(sorted(_compteurs.items())),
+                'latences': {nom: h.to_dict() for nom, h in sorted(_latences.items())}}
+
+
+def reinitialiser():
+    global _debut
+    with _verrou:
+        _compteurs.clear()
+        _latences.clear()
+        _debut = time.time()
+
+
+def ecrire(chemin: Optional[str] = None) -> Optional[str]:
+    """Écrit les mesures dans un fichier JSON (remplacé d'un coup) ; retourne son chemin"""
+    chemin = chemin or _fichier
+    if chemin is None:
+        return None
+    temporaire = f'{chemin}.{os.getpid()}.tmp'
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        json.dump(instantane(), f, ensure_ascii=False, indent=2)
+    os.replace(temporaire, chemin)
+    return chemin
+
+
+def rapport(mesures: Optional[Dict[str, Any]] = None) -> str:
+    """Tableau lisible des mesures (courantes, ou lues dans un fichier)"""
+    mesures = mesures or instantane()
+    lignes = [f"Mesures du {mesures['debut']} au {mesures['date']}"]
+    if mesures['latences']:
+        lignes.append(f"{'opération':<32} {'appels':>8} {'total (ms)':>11} {'moy. (ms)':>10} "
+                      f"{'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+        for nom, h in mesures['latences'].items():
+            lignes.append(f"{nom:<32} {h['nombre']:>8} {h['total_ms']:>11.1f} {h['moyenne_ms']:>10.3f} "
+                          f"{h['p50_ms']:>9.3f} {h['p90_ms']:>9.3f} {h['p99_ms']:>9.3f} {h['max_ms']:>9.3f}")
+    for nom, valeur in mesures['compteurs'].items():
+        lignes.append(f"{nom:<32} {valeur:>8}")
+    return '\n'.join(lignes)
+
+
+def _ecrire_periodiquement(arret: threading.Event, periode: float):
+    while not arret.wait(periode):
+        try:
+            ecrire()
+        except OSError as e:
+            print(f"⚠️ Mesures non écrites : {e}", file=sys.stderr)
+
+
+def activer(fichier: Optional[str] = None, periode: float = PERIODE):
+    """Active les mesures ; avec ``fichier``, elles y sont écrites toutes les ``periode`` secondes et à la sortie"""
+    global _actif, _fichier, _arret
+    desactiver()
+    _actif = True
+    _fichier = fichier
+    if fichier is None:
+        return
+    _arret = threading.Event()
+    threading.Thread(target=_ecrire_periodiquement, args=(_arret, periode), name='metriques', daemon=True).start()
+    if hasattr(signal, 'SIGUSR1') and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR1, lambda *_: ecrire())
+
+
+def desactiver():
+    """Arrête les mesures (et leur écriture périodique, après une dernière écriture)"""
+    global _actif, _fichier, _arret
+    if _arret is not None:
+        _arret.set()
+        _arret = None
+        try:
+            ecrire()
+        except OSError:
+            pass
+    _actif = False
+    _fichier = None
+
+
+@contextmanager
+def profiler(nom: str, dossier: str = '.', lignes: int = 20) -> Iterator[cProfile.Profile]:
+    """Exécute un bloc sous cProfile, affiche les fonctions les plus coûteuses et garde le profil complet.
+
+    Le fichier ``profil_<nom>_<date>.prof`` s'ouvre avec ``python -m pstats`` ou snakeviz.
+    """
+    profil = cProfile.Profile()
+    profil.enable()
+    try:
+        yield profil
+    finally:
+        profil.disable()
+        chemin = os.path.join(dossier, f"profil_{nom}_{datetime.now():%Y%m%d_%H%M%S}.prof")
+        profil.dump_stats(chemin)
+        sortie = io.StringIO()
+        pstats.Stats(profil, stream=sortie).sort_stats('cumulative').print_stats(lignes)
+        print(sortie.getvalue())
+        print(f"✅ Profil enregistré dans {chemin}.")
+
+
+def _activer_depuis_environnement():
+    fichier = os.environ.get('ECHEC_METRIQUES')
+    if fichier:
+        activer(fichier, float(os.environ.get('ECHEC_METRIQUES_PERIODE', PERIODE)))
+
+
+atexit.register(desactiver)
+_activer_depuis_environnement()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("Usage : python metriques.py fichier.json", file=sys.stderr)
+        return 2
+    try:
+        with open(argv[0], encoding='utf-8') as f:
+            print(rapport(json.load(f)))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️ Fichier de mesures illisible : {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+# Recherche de joueurs par nom, prénom ou classement, sans parcourir toute la base
+#
+# - préfixe : nom de famille et prénom sont rangés dans deux vues triées ; un préfixe correspond
+#   à une plage contiguë de clés, trouvée par dichotomie ;
+# - fautes de frappe : les noms et prénoms distincts sont indexés par trigrammes ; seuls ceux qui
+#   partagent des trigrammes avec le mot cherché sont comparés (distance d'édition bornée).
+# Accents et majuscules sont ignorés.
+
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from vues_triees import Cle, VueTriee
+
+FIN_PREFIXE = '\U0010ffff'  # Plus grand que tout caractère : borne haute d'une plage de préfixe
+LIMITE = 20
+
+
+@lru_cache(maxsize=1 << 16)
+def normaliser(texte: str) -> str:
+    """Minuscules sans accents : 'Lefèvre' -> 'lefevre'"""
+    if texte.isascii():
+        return texte.lower().strip()
+    decompose = unicodedata.normalize('NFKD', texte.lower())
+    return ''.join(c for c in decompose if not unicodedata.combining(c)).strip()
+
+
+def trigrammes(mot: str) -> Set[str]:
+    mot = f'^{mot}$'
+    return {mot[i:i + 3] for i in range(len(mot) - 2)}
+
+
+def distance(a: str, b: str, maximum: int) -> int:
+    """Distance d'édition (transpositions comprises), ou ``maximum + 1`` dès qu'elle est dépassée"""
+    if abs(len(a) - len(b)) > maximum:
+        return maximum + 1
+    avant_precedente: List[int] = []
+    precedente = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        courante = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            courante[j] = min(precedente[j] + 1, courante[j - 1] + 1, precedente[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                courante[j] = min(courante[j], avant_precedente[j - 2] + 1)
+        if min(courante) > maximum:
+            return maximum + 1
+        avant_precedente, precedente = precedente, courante
+    return precedente[-1]
+
+
+def tolerance(mot: str) -> int:
+    """Nombre de fautes acceptées selon la longueur du mot"""
+    return 0 if len(mot) < 3 else 1 if len(mot) < 8 else 2
+
+
+def cle_nom(joueur) -> Cle:
+    return normaliser(joueur.nom_famille), normaliser(joueur.prenom)
+
+
+def cle_prenom(joueur) -> Cle:
+    return normaliser(joueur.prenom), normaliser(joueur.nom_famille)
+
+
+class IndexJoueurs:
+    """Index de recherche des joueurs, construit une fois puis tenu à jour à chaque sauvegarde"""
+
+    def __init__(self, joueurs: Iterable[Any] = ()):
+        joueurs = list(joueurs)
+        self._noms = VueTriee(cle_nom, joueurs)
+        self._prenoms = VueTriee(cle_prenom, joueurs)
+        self._mots: Counter = Counter()  # Nom ou prénom normalisé -> nombre de joueurs qui le portent
+        self._trigrammes: Dict[str, Set[str]] = {}
+        self._mots_par_id: Dict[int, Tuple[str, str]] = {}
+        for joueur in joueurs:
+            self._indexer_mots(joueur)
+
+    def __len__(self) -> int:
+        return len(self._noms)
+
+    def _indexer_mots(self, joueur):
+        mots = self._mots_par_id[joueur.id] = cle_nom(joueur)
+        for mot in mots:
+            if mot and self._mots[mot] == 0:
+                for trigramme in trigrammes(mot):
+                    self._trigrammes.setdefault(trigramme, set()).add(mot)
+            self._mots[mot] += 1
+
+    def _oublier_mots(self, joueur_id: int):
+        for mot in self._mots_par_id.pop(joueur_id, ()):
+            self._mots[mot] -= 1
+            if self._mots[mot] <= 0:
+                del self._mots[mot]
+                for trigramme in trigrammes(mot):
+                    self._trigrammes.get(trigramme, set()).discard(mot)
+
+    def ajouter(self, joueur):
+        """Indexe un nouveau joueur, ou réindexe un joueur modifié"""
+        if self._mots_par_id.get(joueur.id) != cle_nom(joueur):
+            self._oublier_mots(joueur.id)
+            self._indexer_mots(joueur)
+        self._noms.ajouter(joueur)
+        self._prenoms.ajouter(joueur)
+
+    def retirer(self, joueur_id: int):
+        self._oublier_mots(joueur_id)
+        self._noms.retirer(joueur_id)
+        self._prenoms.retirer(joueur_id)
+
+    @staticmethod
+    def _prefixe(vue: VueTriee, *debut: str) -> Iterator[Any]:
+        """Joueurs dont la clé commence par ``debut`` (mots complets, puis préfixe du dernier)"""
+        return vue.entre(debut, debut[:-1] + (debut[-1] + FIN_PREFIXE,))
+
+    def mots_proches(self, mot: str) -> List[Tuple[int, str]]:
+        """Noms et prénoms connus à moins de quelques fautes de ``mot``, du plus proche au plus éloigné"""
+        maximum = tolerance(mot)
+        if maximum == 0:
+            return []
+        cherches = trigrammes(mot)
+        communs: Counter = Counter()
+        for trigramme in cherches:
+            communs.update(self._trigrammes.get(trigramme, ()))
+        # Chaque faute fait perdre au plus quatre trigrammes (transposition) : les autres candidats sont trop loin
+        minimum = max(1, len(cherches) - 4 * maximum)
+        proches = []
+        for candidat, nombre in communs.items():
+            if nombre >= minimum and abs(len(candidat) - len(mot)) <= maximum:
+                d = distance(mot, candidat, maximum)
+                if d <= maximum:
+                    proches.append((d, candidat))
+        proches.sort()
+        return proches
+
+    def rechercher(self, texte: str, limite: int = LIMITE) -> List[Any]:
+        """Joueurs correspondant à un texte libre ('dup', 'dupont jean', 'jean dupont', 'dupnot').
+
+        Les correspondances par préfixe sont cherchées d'abord ; s'il n'y en a aucune, les noms et
+        prénoms proches du premier mot sont essayés (fautes de frappe).
+        """
+        mots = normaliser(texte).split()
+        if not mots:
+            return []
+        trouves: Dict[int, Any] = {}
+
+        def ajouter(joueurs: Iterable[Any]) -> bool:
+            for joueur in joueurs:
+                if len(trouves) >= limite:
+                    return True
+                trouves.setdefault(joueur.id, joueur)
+            return len(trouves) >= limite
+
+        # Texte entier comme nom de famille (noms composés), puis nom + prénom dans les deux ordres
+        premier, reste = mots[0], ' '.join(mots[1:])
+        if ajouter(self._prefixe(self._noms, ' '.join(mots))):
+            return list(trouves.values())
+        if reste:
+            if (ajouter(self._prefixe(self._noms, premier, reste))
+                    or ajouter(self._prefixe(self._prenoms, premier, reste))):
+                return list(trouves.values())
+        elif ajouter(self._prefixe(self._prenoms, premier)):
+            return list(trouves.values())
+
+        # Fautes de frappe sur le premier mot, le reste servant de filtre
+        if trouves:
+            return list(trouves.values())
+        for _, mot in self.mots_proches(premier):
+            for vue, autre in ((self._noms, 1), (self._prenoms, 0)):
+                joueurs = self._prefixe(vue, mot, '')
+                if reste:
+                    joueurs = (j for j in joueurs if self._correspond(cle_nom(j)[autre], reste))
+                if ajouter(joueurs):
+                    return list(trouves.values())
+        return list(trouves.values())
+
+    @staticmethod
+    def _correspond(mot: str, cherche: str) -> bool:
+        """Le mot commence par ``cherche``, à quelques fautes près"""
+        maximum = tolerance(cherche)
+        return mot.startswith(cherche) or distance(mot[:len(cherche)], cherche, maximum) <= maximum
+
+    def __repr__(self):
+        return f"IndexJoueurs({len(self)} joueurs, {len(self._mots)} noms et prénoms)"
+
+
+def par_classement(vue_classement: VueTriee, minimum: Optional[int] = None, maximum: Optional[int] = None,
+                   limite: Optional[int] = None) -> List[Any]:
+    """Joueurs dont le classement est compris entre ``minimum`` et ``maximum`` (inclus), du meilleur au moins bon.
+
+    ``vue_classement`` est la vue triée par classement décroissant du dépôt des joueurs.
+    """
+    debut = (-maximum,) if maximum is not None else ()
+    fin = (-minimum + 1,) if minimum is not None else (float('inf'),)
+    joueurs = vue_classement.entre(debut, fin)
+    return [joueur for joueur, _ in zip(joueurs, range(limite))] if limite is not None else list(joueurs)
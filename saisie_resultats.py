@@ -0,0 +1,174 @@
+# Saisie non interactive des résultats d'un tour
+#
+# Usage :
+#   python saisie_resultats.py TOURNOI_ID --apparier      apparie le tour suivant et affiche les appariements en CSV
+#   python saisie_resultats.py TOURNOI_ID resultats.csv   enregistre les résultats du tour en cours
+#   python saisie_resultats.py TOURNOI_ID resultats.json
+#   python saisie_resultats.py TOURNOI_ID -               lit les résultats sur l'entrée standard
+#   python saisie_resultats.py TOURNOI_ID mes_echiquiers.csv --partiel
+#                                                          enregistre quelques échiquiers sans terminer le tour
+#
+# Plusieurs arbitres peuvent saisir leurs échiquiers en même temps avec --partiel ; le tour est
+# terminé par une dernière saisie sans --partiel, une fois tous les échiquiers renseignés.
+#
+# Format CSV : une ligne d'en-tête puis une ligne par échiquier,
+#   echiquier,blancs,noirs,resultat       (blancs et noirs sont facultatifs : ids vérifiés s'ils sont donnés)
+#   1,12,7,1-0
+# Format JSON : une liste d'objets avec les mêmes clés, ex. [{"echiquier": 1, "resultat": "1/2-1/2"}]
+
+import argparse
+import csv
+import json
+import sys
+from typing import Any, Dict, Iterable, List, TextIO, Tuple
+
+from Echec import EXEMPT, Tour, Tournoi
+
+RESULTATS_TEXTE = {
+    '1-0': (1, 0),
+    '0-1': (0, 1),
+    '1/2-1/2': (0.5, 0.5),
+    '½-½': (0.5, 0.5),
+    '0.5-0.5': (0.5, 0.5),
+}
+
+COLONNES = ['echiquier', 'blancs', 'noirs', 'resultat', 'nom_blancs', 'nom_noirs']
+
+
+def lire_resultat(texte: str) -> Tuple[float, float]:
+    """Convertit un résultat écrit ('1-0', '0-1', '1/2-1/2') en points"""
+    try:
+        return RESULTATS_TEXTE[texte.strip().replace(' ', '')]
+    except KeyError:
+        raise ValueError(f"résultat illisible '{texte}'") from None
+
+
+def lire_lignes(flux: TextIO) -> List[Dict[str, Any]]:
+    """Lit les lignes de résultats d'un flux CSV ou JSON (détecté d'après le premier caractère)"""
+    contenu = flux.read()
+    if contenu.lstrip().startswith('['):
+        return json.loads(contenu)
+    return list(csv.DictReader(contenu.splitlines()))
+
+
+def preparer_resultats(tour: Tour, lignes: Iterable[Dict[str, Any]]) -> Dict[int, Tuple[float, float]]:
+    """Vérifie les lignes lues par rapport aux appariements du tour.
+
+    Retourne les résultats par index d'échiquier, ou lève une ValueError qui liste
+    toutes les lignes en erreur.
+    """
+    resultats: Dict[int, Tuple[float, float]] = {}
+    erreurs = []
+    for numero_ligne, ligne in enumerate(lignes, 1):
+        if not isinstance(ligne, dict):
+            erreurs.append(f"Ligne {numero_ligne} : objet attendu, lu '{ligne}'")
+            continue
+        try:
+            echiquier = int(ligne['echiquier']) - 1
+            resultat = lire_resultat(str(ligne['resultat']))
+        except KeyError as e:
+            erreurs.append(f"Ligne {numero_ligne} : colonne {e} manquante")
+            continue
+        except TypeError:
+            erreurs.append(f"Ligne {numero_ligne} : échiquier illisible '{ligne['echiquier']}'")
+            continue
+        except ValueError as e:
+            erreurs.append(f"Ligne {numero_ligne} : {e}")
+            continue
+
+        if echiquier in resultats:
+            erreurs.append(f"Ligne {numero_ligne} : échiquier {echiquier + 1} saisi deux fois")
+            continue
+        if 0 <= echiquier < len(tour.codes):
+            # Les ids fournis doivent correspondre aux appariements
+            for colonne, attendu in (('blancs', tour.blancs[echiquier]), ('noirs', tour.noirs[echiquier])):
+                valeur = ligne.get(colonne)
+                if valeur in (None, ''):
+                    continue
+                if not str(valeur).strip().isdigit():
+                    erreurs.append(f"Ligne {numero_ligne} : id des {colonne} illisible '{valeur}'")
+                elif int(valeur) != attendu:
+                    attendu_texte = 'exempt' if attendu == EXEMPT else attendu
+                    erreurs.append(f"Ligne {numero_ligne} : {colonne} {valeur} ne correspond pas "
+                                   f"à l'appariement de l'échiquier {echiquier + 1} ({attendu_texte})")
+        resultats[echiquier] = resultat
+
+    if erreurs:
+        raise ValueError("\n".join(erreurs))
+    return resultats
+
+
+def ecrire_appariements(tour: Tour, flux: TextIO):
+    """Écrit les appariements d'un tour en CSV, prêts à être complétés avec les résultats"""
+    ecrivain = csv.DictWriter(flux, fieldnames=COLONNES)
+    ecrivain.writeheader()
+    for match in tour.matches:
+        j1, j2 = match.joueur1, match.joueur2
+        ecrivain.writerow({
+            'echiquier': match.echiquier + 1,
+            'blancs': j1.id,
+            'noirs': j2.id if j2 is not None else EXEMPT,
+            'resultat': '1-0' if j2 is None else '',
+            'nom_blancs': f"{j1.prenom} {j1.nom_famille}",
+            'nom_noirs': f"{j2.prenom} {j2.nom_famille}" if j2 is not None else 'exempt',
+        })
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Saisie des résultats d'un tour sans passer par le menu")
+    parser.add_argument('tournoi', type=int, help="identifiant du tournoi")
+    parser.add_argument('fichier', nargs='?', help="fichier de résultats CSV ou JSON ('-' pour l'entrée standard)")
+    parser.add_argument('--apparier', action='store_true', help="apparie le tour suivant et affiche les appariements")
+    parser.add_argument('--partiel', action='store_true', help="enregistre les résultats sans terminer le tour")
+    args = parser.parse_args(argv)
+
+    tournoi = Tournoi.get(args.tournoi)
+    if tournoi is None:
+        print(f"⚠️ Tournoi {args.tournoi} introuvable.", file=sys.stderr)
+        return 1
+
+    if args.apparier:
+        tour = tournoi.tour_en_cours
+        if tour is None:
+            if len(tournoi.tours) >= tournoi.nb_tours:
+                print("⚠️ Ce tournoi a déjà atteint le nombre de tours maximum.", file=sys.stderr)
+                return 1
+            tour = tournoi.commencer_tour()
+        if tour is None:
+            print("⚠️ Impossible de générer des paires de joueurs.", file=sys.stderr)
+            return 1
+        ecrire_appariements(tour, sys.stdout)
+        return 0
+
+    if args.fichier is None:
+        parser.error("indiquez un fichier de résultats ou --apparier")
+
+    tour = tournoi.tour_en_cours
+    if tour is None:
+        print("⚠️ Aucun tour en cours : lancez d'abord --apparier.", file=sys.stderr)
+        return 1
+
+    try:
+        if args.fichier == '-':
+            lignes = lire_lignes(sys.stdin)
+        else:
+            with open(args.fichier, encoding='utf-8') as f:
+                lignes = lire_lignes(f)
+        resultats = preparer_resultats(tour, lignes)
+        if args.partiel:
+            tournoi.saisir_resultats(resultats)
+        else:
+            tournoi.cloturer_tour(resultats)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Résultats refusés, rien n'a été enregistré :\n{e}", file=sys.stderr)
+        return 1
+
+    if args.partiel:
+        print(f"✅ {len(resultats)} résultats enregistrés pour le {tour.nom}.")
+    else:
+        print(f"✅ {tour.nom} enregistré : {len(tour.codes)} échiquiers.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+# Service HTTP en lecture seule : tournois, appariements, résultats et classements en JSON
+#
+# Usage : python serveur.py [--hote 0.0.0.0] [--port 8000]
+#
+#   GET /tournois                      liste des tournois
+#   GET /tournois/<id>                 en-tête du tournoi et liste des tours
+#   GET /tournois/<id>/appariements    appariements et résultats du dernier tour
+#   GET /tournois/<id>/tours/<n>       appariements et résultats du tour n (à partir de 1)
+#   GET /tournois/<id>/classement      classement avec départages
+#   GET /metriques                     compteurs et latences (si ECHEC_METRIQUES est défini)
+#
+# Les réponses sont gardées en mémoire, déjà encodées, et invalidées dès qu'une sauvegarde
+# d'un tournoi apparaît dans le journal de la base (écrite par la console d'arbitrage).
+
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import Echec
+import metriques
+from Echec import CODES_RESULTATS, EXEMPT, Tour, Tournoi, depot_joueurs
+
+INTERVALLE_RAFRAICHISSEMENT = 0.5  # Secondes entre deux lectures de la fin du journal
+DELAI_INACTIVITE = 30  # Secondes avant de fermer une connexion inactive
+
+TEXTE_RESULTATS = {(1, 0): '1-0', (0, 1): '0-1', (0.5, 0.5): '1/2-1/2'}
+
+STATUTS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+ROUTES = [
+    (re.compile(r'/tournois/?'), 'liste'),
+    (re.compile(r'/tournois/(\d+)/?'), 'tournoi'),
+    (re.compile(r'/tournois/(\d+)/appariements/?'), 'appariements'),
+    (re.compile(r'/tournois/(\d+)/tours/(\d+)/?'), 'tour'),
+    (re.compile(r'/tournois/(\d+)/classement/?'), 'classement'),
+]
+
+Reponse = Tuple[bytes, str]  # Corps JSON encodé et son ETag
+
+
+class NonTrouve(Exception):
+    """Ressource absente : tournoi ou tour inconnu"""
+
+
+def _joueur(joueur_id: int) -> Optional[Dict[str, Any]]:
+    """Identité d'un joueur telle qu'affichée dans les réponses"""
+    if joueur_id == EXEMPT:
+        return None
+    joueur = depot_joueurs.get(joueur_id)
+    if joueur is None:
+        return {'id': joueur_id, 'nom': None, 'classement': None}
+    return {'id': joueur_id, 'nom': f"{joueur.prenom} {joueur.nom_famille}", 'classement': joueur.classement}
+
+
+def _entete(tournoi: Tournoi) -> Dict[str, Any]:
+    return {
+        'id': tournoi.id,
+        'nom': tournoi.nom,
+        'lieu': tournoi.lieu,
+        'date_debut': tournoi.date_debut,
+        'date_fin': tournoi.date_fin,
+        'controle_temps': tournoi.controle_temps,
+        'nb_tours': tournoi.nb_tours,
+        'nb_tours_joues': tournoi.nb_tours_joues,
+        'nb_joueurs': len(tournoi.joueurs),
+    }
+
+
+def _tour(tour: Tour, numero: int) -> Dict[str, Any]:
+    return {
+        'numero': numero,
+        'nom': tour.nom,
+        'debut': tour.debut.isoformat() if tour.debut else None,
+        'fin': tour.fin.isoformat() if tour.fin else None,
+        'echiquiers': [
+            {
+                'echiquier': echiquier + 1,
+                'blancs': _joueur(blanc),
+                'noirs': _joueur(noir),
+                'resultat': TEXTE_RESULTATS.get(CODES_RESULTATS[code]),
+            }
+            for echiquier, (blanc, noir, code) in enumerate(zip(tour.blancs, tour.noirs, tour.codes))
+        ],
+    }
+
+
+def _tournoi(tournoi_id: str) -> Tournoi:
+    tournoi = Tournoi.get(int(tournoi_id))
+    if tournoi is None:
+        raise NonTrouve()
+    return tournoi
+
+
+def liste() -> Any:
+    return [_entete(tournoi) for tournoi in Tournoi.get_entetes()]
+
+
+def tournoi(tournoi_id: str) -> Any:
+    t = _tournoi(tournoi_id)
+    donnees = _entete(t)
+    donnees['tours'] = [{'numero': numero, 'nom': tour.nom, 'termine': tour.fin is not None}
+                        for numero, tour in enumerate(t.tours, 1)]
+    return donnees
+
+
+def appariements(tournoi_id: str) -> Any:
+    t = _tournoi(tournoi_id)
+    if not t.tours:
+        raise NonTrouve()
+    return _tour(t.tours[-1], len(t.tours))
+
+
+def tour(tournoi_id: str, numero: str) -> Any:
+    t = _tournoi(tournoi_id)
+    if not 1 <= int(numero) <= len(t.tours):
+        raise NonTrouve()
+    return _tour(t.tours[int(numero) - 1], int(numero))
+
+
+def classement(tournoi_id: str) -> Any:
+    t = _tournoi(tournoi_id)
+    lignes = []
+    for rang, joueur_id in enumerate(t.scores.classer(t.joueurs), 1):
+        points, buchholz, sonneborn_berger, progressif = t.scores.cle(joueur_id)
+        ligne = {'rang': rang, 'joueur': _joueur(joueur_id), 'points': points, 'buchholz': buchholz,
+                 'sonneborn_berger': sonneborn_berger, 'progressif': progressif}
+        lignes.append(ligne)
+    return lignes
+
+
+VUES: Dict[str, Callable[..., Any]] = {
+    'liste': liste, 'tournoi': tournoi, 'appariements': appariements, 'tour': tour, 'classement': classement,
+}
+
+
+class CacheReponses:
+    """Réponses déjà encodées, par chemin, invalidées tournoi par tournoi.
+
+    Les réponses sont construites hors de la boucle : une réponse commencée avant une
+    invalidation est rendue à sa requête, mais pas gardée.
+    """
+
+    def __init__(self):
+        self._reponses: Dict[str, Reponse] = {}
+        self._verrou = threading.Lock()
+        self._generation = 0  # Incrémentée à chaque invalidation
+
+    def get(self, chemin: str) -> Optional[Reponse]:
+        """Réponse déjà construite d'un chemin, ou None"""
+        return self._reponses.get(chemin)
+
+    def construire(self, chemin: str) -> Reponse:
+        """Construit et garde la réponse d'un chemin ; lève NonTrouve pour un chemin inconnu"""
+        generation = self._generation
+        for motif, vue in ROUTES:
+            correspondance = motif.fullmatch(chemin)
+            if correspondance:
+                break
+        else:
+            raise NonTrouve()
+        corps = json.dumps(VUES[vue](*correspondance.groups()), ensure_ascii=False).encode('utf-8')
+        reponse = corps, '"' + hashlib.blake2b(corps, digest_size=8).hexdigest() + '"'
+        with self._verrou:
+            if generation == self._generation:
+                self._reponses[chemin] = reponse
+        return reponse
+
+    def invalider_tournoi(self, tournoi_id: str):
+        """Oublie la liste des tournois et toutes les réponses d'un tournoi"""
+        prefixe = f'/tournois/{tournoi_id}'
+        with self._verrou:
+            self._generation += 1
+            for chemin in list(self._reponses):
+                if chemin.rstrip('/') == '/tournois' or chemin == prefixe or chemin.startswith(prefixe + '/'):
+                    del self._reponses[chemin]
+
+    def vider(self):
+        with self._verrou:
+            self._generation += 1
+            self._reponses.clear()
+
+    def __len__(self):
+        return len(self._reponses)
+
+
+class Serveur:
+    """Serveur HTTP/1.1 minimal sur asyncio, en lecture seule"""
+
+    def __init__(self, intervalle: float = INTERVALLE_RAFRAICHISSEMENT):
+        self.intervalle = intervalle
+        self.cache = CacheReponses()
+        # Un seul thread construit les réponses : les vues lisent les modèles l'une après l'autre
+        self._constructeur = ThreadPoolExecutor(max_workers=1)
+        self._constructions: Dict[str, 'asyncio.Future[Reponse]'] = {}  # Réponses en cours de construction
+
+    async def appliquer_modifications(self, modifies: Set[Tuple[str, Optional[str]]]):
+        """Invalide les caches touchés par les documents modifiés dans la base.
+
+        Les joueurs modifiés sont relus hors de la boucle : un import de classements en modifie
+        des milliers, que la boucle continue de servir avec les anciens pendant la relecture.
+        """
+        Echec.joueurs_table.clear_cache()
+        Echec.tournois_table.clear_cache()
+        # Les constructions en cours lisent peut-être les anciens documents : les requêtes suivantes
+        # en lancent de nouvelles
+        self._constructions.clear()
+        joueurs = [int(doc_id) if doc_id is not None else None for table, doc_id in modifies if table == 'joueurs']
+        if joueurs:
+            await asyncio.get_running_loop().run_in_executor(None, partial(depot_joueurs.oublier, joueurs,
+                                                                           relire=True))
+            # Noms et classements apparaissent dans les réponses de plusieurs tournois
+            self.cache.vider()
+            return
+        for table, doc_id in modifies:
+            if table == 'tournois' and doc_id is not None:
+                self.cache.invalider_tournoi(doc_id)
+            else:
+                self.cache.vider()
+
+    async def suivre_journal(self):
+        """Relit périodiquement la fin du journal, sans bloquer la boucle pendant la lecture du fichier"""
+        boucle = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.intervalle)
+            modifies = await boucle.run_in_executor(None, Echec.db.storage.rafraichir)
+            if modifies:
+                await self.appliquer_modifications(modifies)
+
+    async def construire(self, chemin: str) -> Reponse:
+        """Réponse absente du cache, construite hors de la boucle (une fois pour des requêtes simultanées)"""
+        construction = self._constructions.get(chemin)
+        if construction is None:
+            construction = asyncio.get_running_loop().run_in_executor(self._constructeur, self.cache.construire,
+                                                                      chemin)
+            self._constructions[chemin] = construction
+            construction.add_done_callback(partial(self._construction_terminee, chemin))
+        # Une requête abandonnée n'interrompt pas la construction attendue par les autres
+        return await asyncio.shield(construction)
+
+    def _construction_terminee(self, chemin: str, construction: 'asyncio.Future[Reponse]'):
+        if self._constructions.get(chemin) is construction:
+            del self._constructions[chemin]
+
+    async def repondre(self, methode: str, cible: str,
+                       entetes: Dict[str, str]) -> Tuple[int, bytes, Optional[str]]:
+        """Statut, corps et ETag de la réponse à une requête"""
+        if methode not in ('GET', 'HEAD'):
+            return 405, b'{"erreur": "lecture seule"}', None
+        chemin = urlsplit(cible).path
+        if chemin.rstrip('/') == '/metriques':
+            return 200, json.dumps(metriques.instantane(), ensure_ascii=False).encode('utf-8'), None
+        reponse = self.cache.get(chemin)
+        try:
+            corps, etag = reponse if reponse is not None else await self.construire(chemin)
+        except NonTrouve:
+            return 404, b'{"erreur": "introuvable"}', None
+        if entetes.get('if-none-match') == etag:
+            return 304, b'', etag
+        return 200, corps, etag
+
+    async def servir(self, lecteur: asyncio.StreamReader, ecrivain: asyncio.StreamWriter):
+        """Traite les requêtes successives d'une connexion (keep-alive)"""
+        try:
+            while True:
+                ligne = await asyncio.wait_for(lecteur.readline(), DELAI_INACTIVITE)
+                if not ligne:
+                    break
+                try:
+                    methode, cible, version = ligne.decode('latin-1').split()
+                except ValueError:
+                    ecrivain.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+                    break
+
+                entetes = {}
+                while True:
+                    ligne = await asyncio.wait_for(lecteur.readline(), DELAI_INACTIVITE)
+                    if ligne in (b'\r\n', b'\n', b''):
+                        break
+                    nom, _, valeur = ligne.decode('latin-1').partition(':')
+                    entetes[nom.strip().lower()] = valeur.strip()
+                garder = version == 'HTTP/1.1' and entetes.get('connection', '').lower() != 'close'
+
+                statut, corps, etag = await self.repondre(methode, cible, entetes)
+                lignes = [f'HTTP/1.1 {statut} {STATUTS[statut]}',
+                          'Content-Type: application/json; charset=utf-8',
+                          f'Content-Length: {len(corps)}',
+                          'Cache-Control: no-cache',
+                          'Access-Control-Allow-Origin: *',
+                          'Connection: ' + ('keep-alive' if garder else 'close')]
+                if etag is not None:
+                    lignes.append(f'ETag: {etag}')
+                ecrivain.write(('\r\n'.join(lignes) + '\r\n\r\n').encode('latin-1'))
+                if methode != 'HEAD':
+                    ecrivain.write(corps)
+                await ecrivain.drain()
+                if not garder:
+                    break
+        except (asyncio.TimeoutError, ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            ecrivain.close()
+
+    async def lancer(self, hote: str, port: int):
+        serveur = await asyncio.start_server(self.servir, hote, port, backlog=1024)
+        suivi = asyncio.create_task(self.suivre_journal())
+        print(f"🌐 Service en écoute sur http://{hote}:{port}/tournois")
+        try:
+            async with serveur:
+                await serveur.serve_forever()
+        finally:
+            suivi.cancel()
+            self._constructeur.shutdown(wait=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service HTTP en lecture seule des tournois en cours")
+    parser.add_argument('--hote', default='127.0.0.1', help="adresse d'écoute")
+    parser.add_argument('--port', type=int, default=8000, help="port d'écoute")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(Serveur().lancer(args.hote, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Service arrêté.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+# Pronostics d'un tournoi en cours : simulation de Monte-Carlo des tours restants
+#
+# Usage : python simulation.py TOURNOI_ID [--simulations 5000] [--prix 3] [--processus N] [--graine G]
+#
+# Chaque simulation joue les parties encore sans résultat du tour en cours, puis apparie et joue
+# les tours restants. Les résultats sont tirés selon les classements Elo : le score attendu est
+# respecté, une partie entre joueurs de même force étant nulle avec la probabilité ``taux_nul``.
+# Les simulations sont réparties par lots entre plusieurs processus ; chaque lot renvoie
+# seulement ses compteurs de places, additionnés à la fin. Chaque simulation apparie ses propres
+# tours : les parties sont tirées une à une en Python (environ 0,2 ms par simulation pour 40 joueurs
+# et 5 tours, par processus), d'où un nombre de simulations par défaut modéré.
+#
+# L'appariement simulé est simplifié (groupes de score, sans revanche si possible, couleurs
+# ignorées) ; un tournoi toutes rondes suit son calendrier. Le classement final départage aux
+# points puis au Buchholz, comme dans le tournoi.
+
+import argparse
+import os
+import random
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from appariements import table_berger
+from elo import score_attendu
+from metriques import mesure
+
+SIMULATIONS = 5_000  # Écart type de moins de 0,8 point sur chaque probabilité
+TAUX_NUL = 0.3  # Probabilité de nulle entre deux joueurs de même classement
+LOTS_PAR_PROCESSUS = 4
+SIMULATIONS_PAR_LOT_MIN = 2_000  # En dessous, un seul processus suffit
+
+Ronde = Tuple[List[Tuple[int, int]], Optional[int]]  # Paires et joueur exempt d'un tour (indices)
+
+
+class EtatTournoi:
+    """Situation d'un tournoi à un instant donné, les joueurs étant numérotés de 0 à n - 1"""
+
+    __slots__ = ('ids', 'classements', 'points', 'adversaires', 'exemptes', 'en_cours', 'tours_restants', 'rondes')
+
+    def __init__(self, ids: List[int], classements: List[float], points: List[float], adversaires: List[List[int]],
+                 exemptes: List[bool], en_cours: List[Tuple[int, int]], tours_restants: int,
+                 rondes: Optional[List[Ronde]] = None):
+        self.ids = ids
+        self.classements = classements
+        self.points = points
+        self.adversaires = adversaires  # Adversaires des parties jouées (indices, répétés en cas de revanche)
+        self.exemptes = exemptes  # Joueurs ayant déjà eu un bye
+        self.en_cours = en_cours  # Parties du tour en cours encore sans résultat
+        self.tours_restants = tours_restants  # Tours entiers encore à apparier
+        self.rondes = rondes  # Tournoi toutes rondes : tours restants déjà fixés par le calendrier
+
+    def __getstate__(self):
+        return tuple(getattr(self, attribut) for attribut in self.__slots__)
+
+    def __setstate__(self, etat):
+        for attribut, valeur in zip(self.__slots__, etat):
+            setattr(self, attribut, valeur)
+
+
+def etat_depuis_tournoi(tournoi: Any) -> EtatTournoi:
+    """Situation actuelle d'un Tournoi : points, rencontres, byes et parties restant à jouer"""
+    joueurs = tournoi.get_joueurs_objets()
+    index = {joueur.id: i for i, joueur in enumerate(joueurs)}
+    adversaires: List[List[int]] = [[] for _ in joueurs]
+    exemptes = [False] * len(joueurs)
+    en_cours: List[Tuple[int, int]] = []
+    tour_en_cours = tournoi.tour_en_cours
+
+    for tour in tournoi.tours:
+        for match in tour.matches:
+            blanc = index.get(match.joueur1.id)
+            if match.joueur2 is None:
+                if blanc is not None:
+                    exemptes[blanc] = True
+                continue
+            noir = index.get(match.joueur2.id)
+            if blanc is None or noir is None:
+                continue
+            if match.resultat is None:
+                if tour is tour_en_cours:
+                    en_cours.append((blanc, noir))
+                continue
+            adversaires[blanc].append(noir)
+            adversaires[noir].append(blanc)
+
+    rondes: Optional[List[Ronde]] = None
+    if getattr(tournoi, 'systeme', 'suisse') != 'suisse' and len(joueurs) >= 2:
+        rondes = []
+        calendrier = tournoi.calendrier
+        if calendrier is None:
+            # Pas encore établi : calculé sur une copie des inscrits, sans le fixer dans le tournoi
+            places = [None] + list(tournoi.joueurs) + [None]  # Place fictive n + 1 : bye
+            calendrier = [([places[blanc] for blanc, _ in ronde], [places[noir] for _, noir in ronde])
+                          for ronde in table_berger(len(places) - 2, tournoi.systeme == 'aller_retour')]
+        for blancs, noirs in calendrier[len(tournoi.tours):]:
+            paires, exempt = [], None
+            for blanc, noir in zip(blancs, noirs):
+                if blanc in index and noir in index:
+                    paires.append((index[blanc], index[noir]))
+                else:
+                    exempt = index.get(blanc, index.get(noir))
+            rondes.append((paires, exempt))
+
+    points = [float(tournoi.scores.points.get(joueur.id, 0)) for joueur in joueurs]
+    tours_restants = len(rondes) if rondes is not None else max(0, tournoi.nb_tours - len(tournoi.tours))
+    return EtatTournoi([joueur.id for joueur in joueurs], [float(joueur.classement) for joueur in joueurs], points,
+                       adversaires, exemptes, en_cours, tours_restants, rondes)
+
+
+class Simulateur:
+    """Joue des tournois simulés à partir d'un même état ; un par processus"""
+
+    def __init__(self, etat: EtatTournoi, taux_nul: float = TAUX_NUL):
+        self.etat = etat
+        self.n = len(etat.ids)
+        self.taux_nul = taux_nul
+        n = self.n
+        # Paires déjà rencontrées (a * n + b, dans les deux sens), complétées pendant chaque simulation
+        self.rencontres: Set[int] = {a * n + b for a, liste in enumerate(etat.adversaires) for b in liste}
+        self._seuils: Dict[int, Tuple[float, float]] = {}
+        # Rang au classement Elo : départage de l'ordre d'appariement à points égaux
+        self.rang_elo = [0] * n
+        for rang, i in enumerate(sorted(range(n), key=lambda i: -etat.classements[i])):
+            self.rang_elo[i] = rang
+
+    def seuils(self, a: int, b: int) -> Tuple[float, float]:
+        """Bornes de tirage : victoire de ``a`` en dessous de la première, nulle en dessous de la seconde"""
+        cle = a * self.n + b
+        seuils = self._seuils.get(cle)
+        if seuils is None:
+            attendu = score_attendu(self.etat.classements[a], self.etat.classements[b])
+            nul = self.taux_nul * 2 * min(attendu, 1 - attendu)
+            seuils = self._seuils[cle] = (attendu - nul / 2, attendu + nul / 2)
+        return seuils
+
+    def apparier(self, points: List[float], exemptes: List[bool]) -> Tuple[List[Tuple[int, int]], Optional[int]]:
+        """Appariement rapide : par points puis classement, chacun contre le suivant pas encore rencontré"""
+        n, rencontres, rang_elo = self.n, self.rencontres, self.rang_elo
+        # Points décroissants puis meilleur classement : les points sont des demi-points entiers
+        ordre = sorted(range(n), key=[rang_elo[i] - 2 * n * points[i] for i in range(n)].__getitem__)
+        exempt = None
+        if n % 2:
+            for position in range(n - 1, -1, -1):
+                if not exemptes[ordre[position]]:
+                    exempt = ordre.pop(position)
+                    break
+            else:
+                exempt = ordre.pop()
+        place = [False] * n
+        paires = []
+        taille = len(ordre)
+        for position, a in enumerate(ordre):
+            if place[a]:
+                continue
+            place[a] = True
+            adversaire = None
+            premier_libre = None
+            for suivant in range(position + 1, taille):
+                b = ordre[suivant]
+                if place[b]:
+                    continue
+                if premier_libre is None:
+                    premier_libre = b
+                if a * n + b not in rencontres:
+                    adversaire = b
+                    break
+            if adversaire is None:
+                adversaire = premier_libre  # Revanche acceptée faute de mieux
+            if adversaire is None:
+                break
+            place[adversaire] = True
+            paires.append((a, adversaire))
+        return paires, exempt
+
+    def simuler_lot(self, nb_simulations: int, graine: Optional[int]) -> Tuple[array, array]:
+        """Compteurs des places obtenues (joueur * n + place) et total des points de chaque joueur"""
+        etat, n = self.etat, self.n
+        tirer = random.Random(graine).random
+        cache_seuils, seuils, apparier, rencontres = self._seuils, self.seuils, self.apparier, self.rencontres
+        adversaires = [tuple(liste) for liste in etat.adversaires]
+        # Clé de classement en un seul nombre : points, puis Buchholz (des demi-points entiers
+        # bornés par ``echelle``), puis un tirage dans [0, 1) pour les égalités parfaites
+        nb_parties = max(map(len, adversaires), default=0) + 1 + etat.tours_restants
+        echelle = 2 * nb_parties * (max(etat.points, default=0) + 1 + etat.tours_restants) + 2
+        places = [0] * (n * n)
+        total_points = [0.0] * n
+        positions = [i * n for i in range(n)]
+        for _ in range(nb_simulations):
+            points = list(etat.points)
+            exemptes = list(etat.exemptes)
+            ajoutees: List[int] = []  # Rencontres de la simulation, retirées de ``rencontres`` à la fin
+            jouees: List[Tuple[int, int]] = []
+
+            paires: Sequence[Tuple[int, int]] = etat.en_cours
+            for numero_tour in range(etat.tours_restants + 1):
+                if numero_tour:
+                    if etat.rondes is not None:
+                        paires, exempt = etat.rondes[numero_tour - 1]
+                    else:
+                        paires, exempt = apparier(points, exemptes)
+                    if exempt is not None:
+                        points[exempt] += 1
+                        exemptes[exempt] = True
+                # Tirage de toutes les parties du tour d'un coup
+                for (a, b), tirage in zip(paires, [tirer() for _ in paires]):
+                    cle = a * n + b
+                    victoire, nulle = cache_seuils.get(cle) or seuils(a, b)
+                    if tirage < victoire:
+                        points[a] += 1
+                    elif tirage < nulle:
+                        points[a] += 0.5
+                        points[b] += 0.5
+                    else:
+                        points[b] += 1
+                    if cle not in rencontres:
+                        rencontres.add(cle)
+                        rencontres.add(b * n + a)
+                        ajoutees.append(cle)
+                        ajoutees.append(b * n + a)
+                jouees.extend(paires)
+            rencontres.difference_update(ajoutees)
+
+            buchholz = [sum([points[o] for o in liste]) for liste in adversaires]
+            for a, b in jouees:
+                buchholz[a] += points[b]
+                buchholz[b] += points[a]
+            cles = [-2 * (p * echelle + b) - tirer() for p, b in zip(points, buchholz)]
+            for place, i in enumerate(sorted(range(n), key=cles.__getitem__)):
+                places[positions[i] + place] += 1
+            for i, p in enumerate(points):
+                total_points[i] += p
+        return array('l', places), array('d', total_points)
+
+
+def _simuler_lot(etat: EtatTournoi, taux_nul: float, nb_simulations: int,
+                 graine: Optional[int]) -> Tuple[array, array]:
+    return Simulateur(etat, taux_nul).simuler_lot(nb_simulations, graine)
+
+
+class ResultatSimulation:
+    """Distribution des places finales de chaque joueur"""
+
+    def __init__(self, ids: List[int], nb_simulations: int, places: Sequence[int], total_points: Sequence[float]):
+        n = len(ids)
+        self.ids = ids
+        self.nb_simulations = nb_simulations
+        self.places: Dict[int, List[float]] = {}  # Probabilité de chaque place, de la première à la dernière
+        for i, joueur_id in enumerate(ids):
+            self.places[joueur_id] = [nombre / nb_simulations for nombre in places[i * n:(i + 1) * n]]
+        self.points_moyens: Dict[int, float] = {
+            joueur_id: total_points[i] / nb_simulations for i, joueur_id in enumerate(ids)}
+
+    def probabilite_victoire(self, joueur_id: int) -> float:
+        return self.places[joueur_id][0]
+
+    def probabilite_places(self, joueur_id: int, nb_places: int) -> float:
+        """Probabilité de finir dans les ``nb_places`` premiers (places de prix)"""
+        return sum(self.places[joueur_id][:nb_places])
+
+    def place_moyenne(self, joueur_id: int) -> float:
+        return sum(place * probabilite for place, probabilite in enumerate(self.places[joueur_id], 1))
+
+    def classement(self) -> List[int]:
+        """Joueurs du favori au moins bien placé (place moyenne)"""
+        return sorted(self.ids, key=self.place_moyenne)
+
+
+@mesure('simulation')
+def simuler(etat: EtatTournoi, nb_simulations: int = SIMULATIONS, nb_processus: Optional[int] = None,
+            graine: Optional[int] = None, taux_nul: float = TAUX_NUL) -> ResultatSimulation:
+    """Simule ``nb_simulations`` fins de tournoi, réparties entre ``nb_processus`` processus (tous les cœurs)"""
+    if nb_simulations <= 0:
+        raise ValueError("Le nombre de simulations doit être positif")
+    if not 0 <= taux_nul <= 1:
+        raise ValueError("Le taux de nulles doit être compris entre 0 et 1")
+    n = len(etat.ids)
+    nb_processus = nb_processus or os.cpu_count() or 1
+    nb_processus = max(1, min(nb_processus, nb_simulations // SIMULATIONS_PAR_LOT_MIN))
+    nb_lots = nb_processus * LOTS_PAR_PROCESSUS if nb_processus > 1 else 1
+    tailles = [nb_simulations // nb_lots + (numero < nb_simulations % nb_lots) for numero in range(nb_lots)]
+    graines = random.Random(graine).sample(range(1 << 62), nb_lots)
+
+    places = array('l', bytes(array('l').itemsize * n * n))
+    total_points = array('d', bytes(8 * n))
+    if nb_processus == 1:
+        lots = [_simuler_lot(etat, taux_nul, taille, graine_lot) for taille, graine_lot in zip(tailles, graines)]
+    else:
+        with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+            lots = list(executeur.map(_simuler_lot, [etat] * nb_lots, [taux_nul] * nb_lots, tailles, graines))
+    for places_lot, points_lot in lots:
+        for i, nombre in enumerate(places_lot):
+            places[i] += nombre
+        for i, points in enumerate(points_lot):
+            total_points[i] += points
+    return ResultatSimulation(etat.ids, nb_simulations, places, total_points)
+
+
+def afficher(resultat: ResultatSimulation, noms: Dict[int, str], nb_prix: int = 3, limite: Optional[int] = None):
+    print(f"{'joueur':<30} {'victoire':>9} {f'top {nb_prix}':>9} {'place moy.':>10} {'points moy.':>11}")
+    for joueur_id in resultat.classement()[:limite]:
+        print(f"{noms.get(joueur_id, joueur_id)!s:<30} {resultat.probabilite_victoire(joueur_id):>9.1%} "
+              f"{resultat.probabilite_places(joueur_id, nb_prix):>9.1%} {resultat.place_moyenne(joueur_id):>10.1f} "
+              f"{resultat.points_moyens[joueur_id]:>11.2f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Pronostics d'un tournoi par simulation des tours restants")
+    parser.add_argument('tournoi', type=int, help="identifiant du tournoi")
+    parser.add_argument('--simulations', type=int, default=SIMULATIONS, help="nombre de tournois simulés")
+    parser.add_argument('--prix', type=int, default=3, help="nombre de places de prix")
+    parser.add_argument('--processus', type=int, help="processus de calcul (tous les cœurs par défaut)")
+    parser.add_argument('--graine', type=int, help="graine du tirage, pour des résultats reproductibles")
+    parser.add_argument('--taux-nul', type=float, default=TAUX_NUL, help="probabilité de nulle à force égale")
+    parser.add_argument('--limite', type=int, help="nombre de joueurs affichés")
+    args = parser.parse_args(argv)
+
+    from Echec import Tournoi
+
+    tournoi = Tournoi.get(args.tournoi)
+    if tournoi is None:
+        print(f"⚠️ Tournoi {args.tournoi} introuvable.", file=sys.stderr)
+        return 1
+    etat = etat_depuis_tournoi(tournoi)
+    try:
+        resultat = simuler(etat, args.simulations, args.processus, args.graine, args.taux_nul)
+    except ValueError as e:
+        print(f"⚠️ Simulation impossible : {e}", file=sys.stderr)
+        return 1
+    print(f"Tournoi {tournoi.nom} : {etat.tours_restants} tour(s) à apparier, {len(etat.en_cours)} partie(s) "
+          f"du tour en cours sans résultat, {resultat.nb_simulations} simulations")
+    afficher(resultat, {j.id: f"{j.prenom} {j.nom_famille}" for j in tournoi.get_joueurs_objets()}, args.prix,
+             args.limite)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
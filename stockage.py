@@ -0,0 +1,788 @@
+# Moteurs de stockage pour la base TinyDB du gestionnaire de tournois
+
+import hashlib
+import json
+import marshal
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+from tinydb import TinyDB
+from tinydb.storages import Storage
+from tinydb.table import Table
+
+from metriques import compter, mesure
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+Tables = Dict[str, Dict[str, Dict[str, Any]]]
+
+# Document modifié : (table, id du document), ou (table, None) pour toute la table
+Modification = Tuple[str, Optional[str]]
+
+# Taille du journal (en octets) au-delà de laquelle il est compacté
+SEUIL_COMPACTAGE = 4 * 1024 * 1024
+
+FORMAT_INSTANTANE = 1  # Incrémenté si le contenu de l'instantané change
+TAILLE_BLOC = 1024 * 1024
+
+DELAI_VERROU = 30  # Attente maximale (en secondes) d'une base verrouillée par un autre processus
+
+
+class BaseVerrouillee(Exception):
+    """Un autre processus garde la base verrouillée au-delà du délai d'attente"""
+
+    def __init__(self, path: str, delai: float):
+        super().__init__(f"La base {path} est utilisée par un autre arbitre depuis plus de {delai:g} s : "
+                         f"réessayez dans un instant.")
+        self.path = path
+        self.delai = delai
+
+
+class ConflitVersion(Exception):
+    """Un document versionné a été modifié par un autre processus depuis sa lecture"""
+
+    def __init__(self, table: str, doc_id: str):
+        super().__init__(f"Le document {doc_id} de la table '{table}' a été modifié entre-temps.")
+        self.table = table
+        self.doc_id = doc_id
+
+
+def _egales(ancienne: Any, nouvelle: Any) -> bool:
+    return ancienne is nouvelle or ancienne == nouvelle
+
+
+def _correctif(ancien: Dict[str, Any], nouveau: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Champs qui font passer d'un document à l'autre, ou None si un champ a disparu.
+
+    ``m`` contient les champs remplacés ; pour une liste dont le début n'a pas changé (les
+    tours d'un tournoi), ``l`` ne contient que la position du premier élément modifié et la suite.
+    """
+    if not ancien.keys() <= nouveau.keys():
+        return None
+    remplaces: Dict[str, Any] = {}
+    listes: Dict[str, Any] = {}
+    for cle, valeur in nouveau.items():
+        precedente = ancien.get(cle)
+        if cle in ancien and _egales(precedente, valeur):
+            continue
+        if isinstance(valeur, list) and isinstance(precedente, list) and len(precedente) > 1:
+            debut = 0
+            for element, precedent in zip(valeur, precedente):
+                if not _egales(precedent, element):
+                    break
+                debut += 1
+            if debut:
+                listes[cle] = [debut, valeur[debut:]]
+                continue
+        remplaces[cle] = valeur
+    correctif: Dict[str, Any] = {'m': remplaces}
+    if listes:
+        correctif['l'] = listes
+    return correctif
+
+
+def _identiques(ancien: Dict[str, Any], nouveau: Dict[str, Any]) -> bool:
+    """Compare deux documents champ par champ, par identité puis par égalité"""
+    if ancien is nouveau:
+        return True
+    if len(ancien) != len(nouveau):
+        return False
+    for cle, valeur in ancien.items():
+        if cle not in nouveau:
+            return False
+        autre = nouveau[cle]
+        if autre is not valeur and autre != valeur:
+            return False
+    return True
+
+
+class _Lecture(dict):
+    """Tables rendues par ``read()`` : chaque table n'est copiée qu'au moment où TinyDB y accède.
+
+    TinyDB modifie sur place les documents qu'il lit avant de tout réécrire ; copier d'emblée
+    toutes les tables coûterait une copie complète de la base pour lire un seul tournoi.
+    """
+
+    def __init__(self, etat: Tables):
+        super().__init__(etat)
+        self._copiees: Set[str] = set()
+
+    def __getitem__(self, nom: str) -> Dict[str, Any]:
+        docs = super().__getitem__(nom)
+        if nom not in self._copiees:
+            docs = {doc_id: dict(doc) for doc_id, doc in docs.items()}
+            self[nom] = docs
+            self._copiees.add(nom)
+        return docs
+
+
+class VerrouFichier:
+    """Verrou exclusif entre processus, posé sur un fichier annexe.
+
+    Il est réentrant et partagé par les threads d'un même processus : un seul thread
+    le détient à la fois. Lève BaseVerrouillee si un autre processus le garde plus de
+    ``delai`` secondes.
+    """
+
+    def __init__(self, path: str, delai: float = DELAI_VERROU):
+        self.path = path
+        self.delai = delai
+        self._verrou = threading.RLock()
+        self._profondeur = 0
+        self._handle: Optional[BinaryIO] = None
+
+    def __enter__(self) -> 'VerrouFichier':
+        self._verrou.acquire()
+        if self._profondeur == 0:
+            try:
+                self._verrouiller()
+            except BaseException:
+                self._verrou.release()
+                raise
+        self._profondeur += 1
+        return self
+
+    def __exit__(self, *exception):
+        self._profondeur -= 1
+        if self._profondeur == 0:
+            self._deverrouiller()
+        self._verrou.release()
+
+    def _verrouiller(self):
+        if self._handle is None:
+            self._handle = open(self.path, 'a+b')
+        limite = time.monotonic() + self.delai
+        pause = 0.001
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self._handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    self._handle.seek(0)
+                    msvcrt.locking(self._handle.fileno(), msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                if time.monotonic() >= limite:
+                    raise BaseVerrouillee(self.path, self.delai) from None
+            time.sleep(pause)
+            pause = min(pause * 2, 0.05)
+
+    def _deverrouiller(self):
+        if fcntl is not None:
+            fcntl.flock(self._handle.fileno(), fcntl.LOCK_UN)
+        else:
+            self._handle.seek(0)
+            msvcrt.locking(self._handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def close(self):
+        with self._verrou:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+
+class TableJournal(Table):
+    """Table TinyDB dont les mises à jour par identifiant sont confiées directement au journal.
+
+    ``Table.update`` et ``Table.insert_multiple`` relisent, convertissent et comparent toute la
+    table pour modifier ou ajouter quelques documents, et ``Table.get`` la copie pour en lire un
+    seul ; ici seuls ces documents sont touchés.
+    """
+
+    def update(self, fields, cond=None, doc_ids=None):
+        modifier = getattr(self._storage, 'modifier', None)
+        if doc_ids is None or callable(fields) or modifier is None:
+            return super().update(fields, cond, doc_ids)
+        ids = list(doc_ids)
+        modifier(self.name, {str(doc_id): fields for doc_id in ids})
+        self.clear_cache()
+        return ids
+
+    def insert_multiple(self, documents):
+        inserer = getattr(self._storage, 'inserer', None)
+        if inserer is None:
+            return super().insert_multiple(documents)
+        nouveaux: Dict[str, Dict[str, Any]] = {}
+        for document in documents:
+            if not isinstance(document, Mapping):
+                raise ValueError('Document is not a Mapping')
+            if isinstance(document, self.document_class):
+                doc_id = document.doc_id
+            else:
+                doc_id = self._get_next_id()
+            nouveaux[str(doc_id)] = dict(document)
+        inserer(self.name, nouveaux)
+        self.clear_cache()
+        return [int(doc_id) for doc_id in nouveaux]
+
+    def get(self, cond=None, doc_id=None, doc_ids=None):
+        lire_document = getattr(self._storage, 'lire_document', None)
+        if doc_id is None or lire_document is None:
+            return super().get(cond, doc_id, doc_ids)
+        document = lire_document(self.name, str(doc_id))
+        return self.document_class(document, doc_id) if document is not None else None
+
+    def __len__(self):
+        nombre = getattr(self._storage, 'nombre', None)
+        return nombre(self.name) if nombre is not None else super().__len__()
+
+    def modifier_documents(self, modifications: Dict[int, Dict[str, Any]]):
+        """Met à jour des champs différents pour chaque document, en une seule écriture"""
+        modifier = getattr(self._storage, 'modifier', None)
+        if modifier is None:
+            for doc_id, champs in modifications.items():
+                super().update(champs, doc_ids=[doc_id])
+            return
+        modifier(self.name, {str(doc_id): champs for doc_id, champs in modifications.items()})
+        self.clear_cache()
+
+
+class BaseJournal(TinyDB):
+    """Base TinyDB dont les tables utilisent ``TableJournal``"""
+
+    table_class = TableJournal
+
+
+class JournalStorage(Storage):
+    """Stockage TinyDB en journal : chaque écriture ajoute au fichier les seuls documents modifiés.
+
+    Le fichier contient une ligne JSON par enregistrement :
+    - ``{"base": {...}}`` : état complet de la base (écrit par le compactage)
+    - ``{"t": table, "id": doc_id, "d": document}`` : insertion ou mise à jour
+    - ``{"t": table, "id": doc_id, "m": {champs}, "l": {liste: [debut, suite]}}`` : mise à jour des
+      seuls champs modifiés (``l`` : fin d'une liste à remplacer à partir de ``debut``)
+    - ``{"t": table, "id": doc_id}`` : suppression d'un document
+    - ``{"t": table}`` : suppression d'une table
+
+    Le journal est rejoué à l'ouverture ; une dernière ligne incomplète (arrêt brutal
+    pendant une écriture) est ignorée puis tronquée. Les documents renvoyés par ``read``
+    sont des copies superficielles : leurs valeurs ne doivent pas être modifiées sur place.
+    ``rafraichir`` relit les enregistrements ajoutés depuis par un autre processus.
+
+    Plusieurs processus peuvent écrire dans le même journal : chaque écriture se fait sous
+    un verrou de fichier, après avoir rattrapé les ajouts des autres. Un document qui porte
+    un champ ``version`` doit arriver avec la version suivant celle de la base, sinon
+    l'écriture est refusée par une ConflitVersion ; un verrou gardé par un autre processus
+    plus de DELAI_VERROU secondes lève BaseVerrouillee. Les fsync de plusieurs écritures
+    concurrentes sont regroupés en un seul.
+
+    Avec ``instantane=True``, l'état est enregistré à la fermeture dans un fichier binaire
+    (``<journal>.instantane``, au format marshal) avec la taille, la date de modification et
+    l'empreinte du journal qu'il résume. À l'ouverture suivante, seule la fin du journal
+    ajoutée depuis est rejouée ; un instantané qui ne correspond plus au journal est ignoré.
+    """
+
+    def __init__(self, path: str, seuil_compactage: int = SEUIL_COMPACTAGE,
+                 importer_depuis: Optional[str] = None, instantane: bool = False):
+        super().__init__()
+        self.path = path
+        self.seuil_compactage = seuil_compactage
+        self.instantane = path + '.instantane' if instantane else None
+        self._etat: Tables = {}
+        self._verrou = threading.RLock()
+        self._compactage: Optional[threading.Thread] = None
+        self._tampon: Optional[Dict[Tuple[str, Optional[str]], Dict[str, Any]]] = None
+        self._copiees: Set[str] = set()  # Tables déjà recopiées par ``modifier`` pendant le lot
+        self._position = 0  # Fin de la partie du journal déjà appliquée à l'état en mémoire
+        self._taille_base = 0  # Taille de l'état complet en tête du journal, écrit au dernier compactage
+        self._inode: Optional[int] = None
+
+        # Regroupement des fsync : numéros des écritures faites et de celles déjà sur disque
+        self._synchro = threading.Condition()
+        self._numero_ecrit = 0
+        self._numero_synchronise = 0
+        self._synchronisation_en_cours = False
+
+        dossier = os.path.dirname(path)
+        if dossier and not os.path.exists(dossier):
+            os.makedirs(dossier)
+        self._verrou_fichier = VerrouFichier(path + '.verrou')
+
+        with self._verrou_fichier:
+            if not os.path.exists(path) and importer_depuis and os.path.exists(importer_depuis):
+                # Reprise d'une base JSON TinyDB classique
+                with open(importer_depuis, encoding='utf-8') as f:
+                    contenu = f.read()
+                self._etat = json.loads(contenu) if contenu.strip() else {}
+                self._taille_base = self._ecrire_base(path, self._etat)
+            elif os.path.exists(path):
+                self._rejouer()
+
+            self._handle = open(path, 'a', encoding='utf-8')
+            self._position = self._taille()
+            self._inode = os.fstat(self._handle.fileno()).st_ino
+        self._compacter_si_necessaire()
+
+    @staticmethod
+    def _lire(f: BinaryIO, debut: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Lit les enregistrements complets d'un journal ouvert, à partir de ``debut``.
+
+        Retourne les enregistrements et la position qui suit le dernier d'entre eux.
+        """
+        enregistrements = []
+        fin_valide = debut
+        f.seek(debut)
+        for ligne in f:
+            if not ligne.endswith(b'\n'):
+                break
+            try:
+                enregistrements.append(json.loads(ligne))
+            except ValueError:
+                break
+            fin_valide += len(ligne)
+        return enregistrements, fin_valide
+
+    @mesure('stockage.ouverture')
+    def _rejouer(self):
+        """Reconstruit l'état en mémoire à partir du journal (et de l'instantané, s'il est à jour)"""
+        with open(self.path, 'rb') as f:
+            debut = self._charger_instantane(f)
+            if debut == 0:
+                premiere = f.readline()
+                if premiere.startswith(b'{"base"') and premiere.endswith(b'\n'):
+                    self._appliquer(json.loads(premiere))
+                    debut = self._taille_base = len(premiere)
+            enregistrements, fin_valide = self._lire(f, debut)
+        for enregistrement in enregistrements:
+            self._appliquer(enregistrement)
+
+        if fin_valide < os.path.getsize(self.path):
+            # Écriture interrompue : on retire la fin illisible du journal
+            with open(self.path, 'r+b') as f:
+                f.truncate(fin_valide)
+
+    @staticmethod
+    def _empreinte(f: BinaryIO, fin: int) -> bytes:
+        """Empreinte des ``fin`` premiers octets du journal"""
+        empreinte = hashlib.blake2b(digest_size=16)
+        f.seek(0)
+        reste = fin
+        while reste > 0:
+            bloc = f.read(min(TAILLE_BLOC, reste))
+            if not bloc:
+                break
+            empreinte.update(bloc)
+            reste -= len(bloc)
+        return empreinte.digest()
+
+    def _charger_instantane(self, f: BinaryIO) -> int:
+        """Reprend l'état de l'instantané s'il résume le début du journal ouvert ; retourne la position à relire"""
+        if self.instantane is None:
+            return 0
+        try:
+            with open(self.instantane, 'rb') as g:
+                format_, inode, position, mtime, empreinte, taille_base, etat = marshal.loads(g.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return 0
+        infos = os.fstat(f.fileno())
+        if format_ != FORMAT_INSTANTANE or inode != infos.st_ino or position > infos.st_size:
+            return 0
+        # Journal inchangé depuis l'instantané : inutile de relire le fichier pour le vérifier
+        if (position, mtime) != (infos.st_size, infos.st_mtime_ns) and empreinte != self._empreinte(f, position):
+            return 0
+        self._etat = etat
+        self._taille_base = taille_base
+        return position
+
+    def _ecrire_instantane(self):
+        """Enregistre l'état en mémoire et la description de la partie du journal qu'il résume"""
+        with self._verrou:
+            with open(self.path, 'rb') as f:
+                infos = os.fstat(f.fileno())
+                if infos.st_ino != self._inode or self._tampon is not None:
+                    return
+                donnees = (FORMAT_INSTANTANE, infos.st_ino, self._position, infos.st_mtime_ns,
+                           self._empreinte(f, self._position), self._taille_base, self._etat)
+            temporaire = f'{self.instantane}.{os.getpid()}.tmp'
+            with open(temporaire, 'wb') as g:
+                g.write(marshal.dumps(donnees))
+            os.replace(temporaire, self.instantane)
+
+    def rafraichir(self) -> Set[Modification]:
+        """Applique les enregistrements ajoutés au journal par un autre processus.
+
+        La lecture du fichier se fait hors du verrou ; une dernière ligne incomplète
+        (écriture en cours) sera relue au prochain appel. Retourne les documents modifiés.
+        """
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return set()
+        with f:
+            infos = os.fstat(f.fileno())
+            with self._verrou:
+                position = self._position
+                if infos.st_ino != self._inode or infos.st_size < position:
+                    position = 0  # Journal compacté entre-temps : on le relit en entier
+                elif infos.st_size == position:
+                    return set()
+            enregistrements, fin_valide = self._lire(f, position)
+
+        with self._verrou:
+            if position == 0:
+                modifies = {(nom, None) for nom in self._etat}
+                self._etat = {}
+            else:
+                modifies = set()
+            for enregistrement in enregistrements:
+                self._appliquer(enregistrement)
+                if 'base' in enregistrement:
+                    modifies.update((nom, None) for nom in self._etat)
+                else:
+                    modifies.add((enregistrement['t'], enregistrement.get('id')))
+            self._position = fin_valide
+            self._inode = infos.st_ino
+        return modifies
+
+    def _rattraper(self) -> Set[Modification]:
+        """Sous le verrou de fichier : rattrape les autres processus avant d'écrire"""
+        modifies = self.rafraichir()
+        with self._verrou:
+            if os.fstat(self._handle.fileno()).st_ino != self._inode:
+                # Le journal a été compacté par un autre processus : on écrit dans le nouveau fichier
+                self._handle.close()
+                self._handle = open(self.path, 'a', encoding='utf-8')
+        return modifies
+
+    def _appliquer(self, enregistrement: Dict[str, Any]):
+        """Applique un enregistrement du journal à l'état en mémoire"""
+        if 'base' in enregistrement:
+            self._etat = enregistrement['base']
+        elif 'id' not in enregistrement:
+            self._etat.pop(enregistrement['t'], None)
+        elif 'd' in enregistrement:
+            self._etat.setdefault(enregistrement['t'], {})[enregistrement['id']] = enregistrement['d']
+        elif 'm' in enregistrement:
+            docs = self._etat.setdefault(enregistrement['t'], {})
+            document = dict(docs.get(enregistrement['id'], {}))
+            document.update(enregistrement['m'])
+            for cle, (debut, suite) in enregistrement.get('l', {}).items():
+                document[cle] = document[cle][:debut] + suite
+            docs[enregistrement['id']] = document
+        else:
+            self._etat.get(enregistrement['t'], {}).pop(enregistrement['id'], None)
+
+    @mesure('stockage.lecture')
+    def read(self) -> Optional[Tables]:
+        with self._verrou:
+            if not self._etat:
+                return None
+            return _Lecture(self._etat)
+
+    def lire_document(self, nom: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Copie superficielle d'un document (id en texte), sans copier sa table ; None s'il est absent"""
+        with self._verrou:
+            document = self._etat.get(nom, {}).get(doc_id)
+        return dict(document) if document is not None else None
+
+    def nombre(self, nom: str) -> int:
+        """Nombre de documents d'une table, sans la copier"""
+        with self._verrou:
+            return len(self._etat.get(nom, {}))
+
+    @mesure('stockage.ecriture')
+    def write(self, data: Tables):
+        numero = None
+        with self._verrou_fichier, self._verrou:
+            enregistrements = self._differences(data)
+            if self._tampon is not None:
+                # Dans un lot, l'état a été rattrapé à l'ouverture du lot
+                self._verifier_versions(enregistrements)
+                self._etat = dict(data)
+                self._mettre_en_tampon(enregistrements)
+                return
+            if enregistrements:
+                # ``data`` a été calculé sur notre état : on n'en garde que nos modifications,
+                # appliquées après celles des autres processus
+                self._rattraper()
+                self._verifier_versions(enregistrements)
+                numero = self._ajouter(enregistrements)
+                for enregistrement in enregistrements:
+                    self._appliquer(enregistrement)
+        if numero is not None:
+            self._synchroniser(numero)
+        self._compacter_si_necessaire()
+
+    @mesure('stockage.ecriture')
+    def modifier(self, nom: str, modifications: Dict[str, Dict[str, Any]]):
+        """Met à jour des champs de documents existants (ids en texte), comme ``Table.update``.
+
+        Seuls les documents concernés sont comparés et copiés, quelle que soit la taille de
+        la table ; le journal ne reçoit que les champs qui ont changé. Lève KeyError pour un
+        document absent.
+        """
+        with self._verrou_fichier, self._verrou:
+            if self._tampon is None:
+                self._rattraper()
+            docs = self._etat.get(nom, {})
+            enregistrements = []
+            for doc_id, champs in modifications.items():
+                ancien = docs[doc_id]
+                correctif = _correctif(ancien, {**ancien, **champs})
+                if 'version' in champs:
+                    # Gardée même égale à la version en base : c'est alors un écrivain en retard, à refuser
+                    correctif['m']['version'] = champs['version']
+                if correctif['m'] or 'l' in correctif:
+                    enregistrements.append({'t': nom, 'id': doc_id, **correctif})
+            if not enregistrements:
+                return
+            self._verifier_versions(enregistrements)
+            numero = self._enregistrer(nom, enregistrements)
+        if numero is not None:
+            self._synchroniser(numero)
+            self._compacter_si_necessaire()
+
+    @mesure('stockage.ecriture')
+    def inserer(self, nom: str, documents: Dict[str, Dict[str, Any]]):
+        """Ajoute des documents (ids en texte) à une table, comme ``Table.insert_multiple``.
+
+        Les documents déjà présents ne sont ni relus ni comparés. Lève ValueError pour un id
+        déjà utilisé.
+        """
+        with self._verrou_fichier, self._verrou:
+            if self._tampon is None:
+                self._rattraper()
+            docs = self._etat.get(nom, {})
+            existants = [doc_id for doc_id in documents if doc_id in docs]
+            if existants:
+                raise ValueError(f"Document {existants[0]} déjà présent dans la table {nom}")
+            if not documents:
+                return
+            numero = self._enregistrer(nom, [{'t': nom, 'id': doc_id, 'd': document}
+                                             for doc_id, document in documents.items()])
+        if numero is not None:
+            self._synchroniser(numero)
+            self._compacter_si_necessaire()
+
+    def _enregistrer(self, nom: str, enregistrements: List[Dict[str, Any]]) -> Optional[int]:
+        """Sous les verrous : applique les enregistrements d'une table et les ajoute au journal.
+
+        Dans un lot, ils sont gardés dans le tampon et None est renvoyé ; sinon, le numéro
+        d'écriture à synchroniser.
+        """
+        if self._tampon is not None:
+            if nom not in self._copiees:
+                # L'état du début du lot doit rester intact en cas d'annulation
+                self._etat = dict(self._etat)
+                self._etat[nom] = dict(self._etat.get(nom, {}))
+                self._copiees.add(nom)
+            for enregistrement in enregistrements:
+                self._appliquer(enregistrement)
+            self._mettre_en_tampon(enregistrements)
+            return None
+        numero = self._ajouter(enregistrements)
+        for enregistrement in enregistrements:
+            self._appliquer(enregistrement)
+        return numero
+
+    def _mettre_en_tampon(self, enregistrements: List[Dict[str, Any]]):
+        """Garde les enregistrements d'un lot ; l'état en mémoire contient déjà leurs effets"""
+        for enregistrement in enregistrements:
+            cle = (enregistrement['t'], enregistrement.get('id'))
+            if cle in self._tampon and 'm' in enregistrement:
+                # Deux mises à jour partielles du même document : on écrit le document obtenu
+                enregistrement = {'t': cle[0], 'id': cle[1], 'd': self._etat[cle[0]][cle[1]]}
+            # Seule la dernière version d'un document est conservée dans le lot
+            self._tampon.pop(cle, None)
+            self._tampon[cle] = enregistrement
+
+    @contextmanager
+    def lot(self) -> Iterator[Set[Modification]]:
+        """Regroupe les écritures faites dans le bloc en un seul ajout au journal.
+
+        Le verrou de fichier est tenu pendant tout le bloc : l'état est d'abord rattrapé sur
+        les ajouts des autres processus, dont la liste est fournie au bloc. Si le bloc lève
+        une exception, l'état en mémoire revient à celui du début du lot et rien n'est écrit.
+        Les lots imbriqués sont fusionnés dans le lot englobant.
+        """
+        with self._verrou_fichier:
+            if self._tampon is not None:
+                yield set()
+                return
+
+            modifies = self._rattraper()
+            with self._verrou:
+                etat_initial = self._etat
+                self._tampon = {}
+                self._copiees = set()
+            try:
+                yield modifies
+            except BaseException:
+                with self._verrou:
+                    self._etat = etat_initial
+                    self._tampon = None
+                raise
+            with self._verrou:
+                enregistrements = list(self._tampon.values())
+                self._tampon = None
+                numero = self._ajouter(enregistrements) if enregistrements else None
+        if numero is not None:
+            self._synchroniser(numero)
+        self._compacter_si_necessaire()
+
+    def _differences(self, data: Tables) -> List[Dict[str, Any]]:
+        """Calcule les enregistrements qui font passer de l'état courant à ``data``"""
+        enregistrements: List[Dict[str, Any]] = []
+        for nom, docs in data.items():
+            anciens = self._etat.get(nom, {})
+            if docs is anciens:
+                continue  # Table jamais lue : rien n'a pu changer
+            for doc_id, doc in docs.items():
+                ancien = anciens.get(doc_id)
+                if ancien is not None and _identiques(ancien, doc):
+                    continue
+                correctif = _correctif(ancien, doc) if ancien is not None else None
+                if correctif is not None and 'version' in doc:
+                    correctif['m']['version'] = doc['version']  # Toujours vérifiée, comme dans ``modifier``
+                if correctif is not None:
+                    enregistrements.append({'t': nom, 'id': doc_id, **correctif})
+                else:
+                    enregistrements.append({'t': nom, 'id': doc_id, 'd': doc})
+            for doc_id in anciens.keys() - docs.keys():
+                enregistrements.append({'t': nom, 'id': doc_id})
+        for nom in self._etat.keys() - data.keys():
+            enregistrements.append({'t': nom})
+        return enregistrements
+
+    def _verifier_versions(self, enregistrements: List[Dict[str, Any]]):
+        """Refuse l'écriture d'un document versionné qui ne succède pas à la version en base"""
+        for enregistrement in enregistrements:
+            document = enregistrement['d'] if 'd' in enregistrement else enregistrement.get('m')
+            if document is None or 'version' not in document:
+                continue
+            actuel = self._etat.get(enregistrement['t'], {}).get(enregistrement['id'])
+            version_actuelle = actuel.get('version', 0) if actuel is not None else 0
+            if document['version'] != version_actuelle + 1:
+                raise ConflitVersion(enregistrement['t'], enregistrement['id'])
+
+    def _ajouter(self, enregistrements: List[Dict[str, Any]]) -> int:
+        """Ajoute des enregistrements à la fin du journal en une seule écriture, sans fsync.
+
+        Retourne le numéro de l'écriture, à passer à ``_synchroniser``.
+        """
+        lignes = ''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in enregistrements)
+        compter('stockage.enregistrements_ecrits', len(enregistrements))
+        compter('stockage.octets_ecrits', len(lignes))
+        self._handle.write(lignes)
+        self._handle.flush()
+        self._position = self._taille()
+        with self._synchro:
+            self._numero_ecrit += 1
+            return self._numero_ecrit
+
+    @mesure('stockage.fsync')
+    def _synchroniser(self, numero: int):
+        """Attend que l'écriture ``numero`` soit sur disque.
+
+        Un seul thread à la fois lance le fsync, qui couvre toutes les écritures faites
+        jusque-là ; les autres attendent son résultat au lieu d'en lancer un chacun.
+        """
+        while True:
+            with self._synchro:
+                while self._synchronisation_en_cours:
+                    self._synchro.wait()
+                if self._numero_synchronise >= numero:
+                    return
+                self._synchronisation_en_cours = True
+                cible = self._numero_ecrit
+
+            synchronise = False
+            try:
+                with self._verrou:
+                    descripteur = os.dup(self._handle.fileno())
+                try:
+                    os.fsync(descripteur)
+                    synchronise = True
+                finally:
+                    os.close(descripteur)
+            finally:
+                with self._synchro:
+                    self._synchronisation_en_cours = False
+                    if synchronise:
+                        self._numero_synchronise = max(self._numero_synchronise, cible)
+                    self._synchro.notify_all()
+
+    def _taille(self) -> int:
+        """Taille actuelle du journal sur disque"""
+        return os.fstat(self._handle.fileno()).st_size
+
+    @staticmethod
+    def _ecrire_base(path: str, etat: Tables) -> int:
+        """Écrit un journal réduit à l'état complet, de façon atomique ; retourne sa taille"""
+        temporaire = path + '.tmp'
+        base = (json.dumps({'base': etat}, ensure_ascii=False) + '\n').encode('utf-8')
+        with open(temporaire, 'wb') as f:
+            f.write(base)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporaire, path)
+        return len(base)
+
+    def _compacter_si_necessaire(self):
+        """Lance le compactage en arrière-plan quand le journal dépasse le seuil"""
+        with self._verrou:
+            if self._tampon is not None:
+                return  # Pas de compactage pendant un lot : l'état contient des écritures non validées
+            if self._compactage is not None and self._compactage.is_alive():
+                return
+            # Une grosse base n'est recompactée que lorsque les ajouts qui la suivent dépassent sa propre taille
+            if self._taille() < max(self.seuil_compactage, 2 * self._taille_base):
+                return
+            self._compactage = threading.Thread(target=self._compacter, daemon=True)
+            self._compactage.start()
+
+    @mesure('stockage.compactage')
+    def _compacter(self):
+        """Réécrit le journal sous la forme d'un unique état complet"""
+        with self._verrou_fichier, self._verrou:
+            # Le journal reste ouvert pendant le compactage : son inode ne peut pas être réutilisé
+            source = open(self.path, 'rb')
+            if os.fstat(source.fileno()).st_ino != self._inode:
+                source.close()  # Compacté par un autre processus, pas encore relu : rien à faire
+                return
+            # Hors lot, l'état en mémoire correspond exactement au journal jusqu'à ``_position``
+            etat = {nom: dict(docs) for nom, docs in self._etat.items()}
+            decalage = self._position
+
+        with source:
+            base = json.dumps({'base': etat}, ensure_ascii=False) + '\n'
+            temporaire = f'{self.path}.{os.getpid()}.tmp'
+            with open(temporaire, 'w', encoding='utf-8') as f:
+                f.write(base)
+
+            with self._verrou_fichier, self._verrou:
+                if os.stat(self.path).st_ino != os.fstat(source.fileno()).st_ino:
+                    os.remove(temporaire)  # Un autre processus a compacté le journal entre-temps
+                    return
+                # Les écritures faites pendant le compactage, par nous ou par d'autres, sont recopiées à la suite
+                with open(temporaire, 'ab') as f:
+                    source.seek(decalage)
+                    f.write(source.read())
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._handle.close()
+                os.replace(temporaire, self.path)
+                self._handle = open(self.path, 'a', encoding='utf-8')
+                # La fin recopiée sera relue au prochain rattrapage (elle peut contenir des ajouts d'autres processus)
+                self._position = self._taille_base = len(base.encode('utf-8'))
+                self._inode = os.fstat(self._handle.fileno()).st_ino
+
+    def close(self):
+        compactage = self._compactage
+        if compactage is not None:
+            compactage.join()
+        if self.instantane is not None:
+            try:
+                self._ecrire_instantane()
+            except (OSError, ValueError):
+                pass  # L'instantané n'est qu'un accélérateur : le journal fait foi
+        with self._verrou:
+            self._handle.close()
+        self._verrou_fichier.close()
@@ -0,0 +1,558 @@
+# Stockage SQLite : joueurs, tournois, inscriptions, tours et matches dans des tables indexées
+#
+# Choisi avec la variable d'environnement ECHEC_STOCKAGE=sqlite (voir Echec.py).
+# Migration unique d'une base existante :
+#   python stockage_sqlite.py [data/chess_tournament.journal] [data/chess_tournament.sqlite]
+# (sans journal, la source par défaut est l'ancien fichier data/chess_tournament.json)
+#
+# Les tables exposent les mêmes méthodes que les tables TinyDB utilisées par les modèles
+# (insert, insert_multiple, update, get, all), avec des documents au même format : Joueur et
+# Tournoi fonctionnent sans changement sur l'un ou l'autre des moteurs.
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from tinydb.table import Document
+
+from metriques import mesure
+from stockage import DELAI_VERROU, BaseVerrouillee, ConflitVersion, JournalStorage, Modification
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS joueurs (
+    id INTEGER PRIMARY KEY,
+    nom_famille TEXT NOT NULL,
+    prenom TEXT NOT NULL,
+    date_naissance TEXT NOT NULL,
+    sexe TEXT NOT NULL,
+    classement INTEGER NOT NULL,
+    id_externe TEXT  -- Identifiant dans une liste officielle, ex. "FIDE:1503014"
+);
+CREATE INDEX IF NOT EXISTS joueurs_nom ON joueurs (nom_famille COLLATE NOCASE, prenom COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS joueurs_classement ON joueurs (classement);
+
+CREATE TABLE IF NOT EXISTS tournois (
+    id INTEGER PRIMARY KEY,
+    nom TEXT NOT NULL,
+    lieu TEXT NOT NULL,
+    date_debut TEXT NOT NULL,
+    date_fin TEXT NOT NULL,
+    nb_tours INTEGER NOT NULL,
+    controle_temps TEXT NOT NULL,
+    description TEXT NOT NULL,
+    scores TEXT,
+    version INTEGER NOT NULL DEFAULT 0,
+    systeme TEXT NOT NULL DEFAULT 'suisse',
+    calendrier TEXT  -- JSON : rondes d'un tournoi toutes rondes
+);
+CREATE INDEX IF NOT EXISTS tournois_dates ON tournois (date_debut, date_fin);
+
+CREATE TABLE IF NOT EXISTS inscriptions (
+    tournoi_id INTEGER NOT NULL REFERENCES tournois (id) ON DELETE CASCADE,
+    rang INTEGER NOT NULL,
+    joueur_id INTEGER NOT NULL,
+    PRIMARY KEY (tournoi_id, rang)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS inscriptions_joueur ON inscriptions (joueur_id);
+
+CREATE TABLE IF NOT EXISTS tours (
+    tournoi_id INTEGER NOT NULL REFERENCES tournois (id) ON DELETE CASCADE,
+    numero INTEGER NOT NULL,
+    nom TEXT NOT NULL,
+    debut TEXT,
+    fin TEXT,
+    PRIMARY KEY (tournoi_id, numero)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS matches (
+    tournoi_id INTEGER NOT NULL,
+    tour INTEGER NOT NULL,
+    echiquier INTEGER NOT NULL,
+    blancs INTEGER NOT NULL,
+    noirs INTEGER NOT NULL,  -- 0 pour un bye
+    resultat TEXT NOT NULL,  -- code de résultat sur un caractère, comme dans le journal
+    PRIMARY KEY (tournoi_id, tour, echiquier),
+    FOREIGN KEY (tournoi_id, tour) REFERENCES tours (tournoi_id, numero) ON DELETE CASCADE
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS matches_blancs ON matches (blancs);
+CREATE INDEX IF NOT EXISTS matches_noirs ON matches (noirs);
+
+-- Dernière écriture de chaque document, numérotée dans l'ordre des écritures (tenue par déclencheurs)
+CREATE TABLE IF NOT EXISTS modifications (
+    nom_table TEXT NOT NULL,  -- 'joueurs' ou 'tournois'
+    doc_id INTEGER NOT NULL,
+    numero INTEGER NOT NULL,
+    PRIMARY KEY (nom_table, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS modifications_numero ON modifications (numero);
+"""
+
+# Tables dont une écriture modifie un document : (document touché, colonne de son id). Les matches
+# ne sont écrits qu'avec leur tour ; les déclencheurs des tours suffisent.
+DOCUMENTS_MODIFIES = {'joueurs': ('joueurs', 'id'), 'tournois': ('tournois', 'id'),
+                      'inscriptions': ('tournois', 'tournoi_id'), 'tours': ('tournois', 'tournoi_id')}
+DECLENCHEURS = ''.join(
+    f"CREATE TRIGGER IF NOT EXISTS {table}_{evenement.lower()} AFTER {evenement} ON {table} BEGIN "
+    f"INSERT OR REPLACE INTO modifications (nom_table, doc_id, numero) "
+    f"VALUES ('{document}', {'OLD' if evenement == 'DELETE' else 'NEW'}.{colonne}, "
+    f"(SELECT IFNULL(MAX(numero), 0) + 1 FROM modifications)); END;\n"
+    for table, (document, colonne) in DOCUMENTS_MODIFIES.items() for evenement in ('INSERT', 'UPDATE', 'DELETE'))
+
+COLONNES_JOUEURS = ('nom_famille', 'prenom', 'date_naissance', 'sexe', 'classement', 'id_externe')
+COLONNES_TOURNOIS = ('nom', 'lieu', 'date_debut', 'date_fin', 'nb_tours', 'controle_temps', 'description')
+
+# Colonnes ajoutées depuis la création du schéma, ajoutées aux bases existantes à l'ouverture
+COLONNES_AJOUTEES = {'joueurs': [('id_externe', 'TEXT')],
+                     'tournois': [('systeme', "TEXT NOT NULL DEFAULT 'suisse'"), ('calendrier', 'TEXT')]}
+# Index sur ces colonnes, créés une fois les colonnes présentes
+INDEX_AJOUTES = ["CREATE UNIQUE INDEX IF NOT EXISTS joueurs_id_externe ON joueurs (id_externe) "
+                 "WHERE id_externe IS NOT NULL"]
+
+JOURNAL_DEFAUT = os.path.join('data', 'chess_tournament.journal')
+JSON_DEFAUT = os.path.join('data', 'chess_tournament.json')
+SQLITE_DEFAUT = os.path.join('data', 'chess_tournament.sqlite')
+
+# Codes de résultat des anciens tours stockés en liste de matches (voir RESULTATS_CODES dans Echec.py)
+CODES_ANCIENS = {None: '0', (1, 0): '1', (0, 1): '2', (0.5, 0.5): '3'}
+
+
+class StockageSQLite:
+    """Connexion SQLite partagée par les tables, avec des transactions imbriquables.
+
+    Une base verrouillée par un autre processus est attendue ``delai`` secondes, puis
+    BaseVerrouillee est levée.
+    """
+
+    def __init__(self, path: str, delai: float = DELAI_VERROU):
+        dossier = os.path.dirname(path)
+        if dossier and not os.path.exists(dossier):
+            os.makedirs(dossier)
+        self.path = path
+        self.delai = delai
+        self.verrou = threading.RLock()
+        self.connexion = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connexion.execute(f'PRAGMA busy_timeout = {int(delai * 1000)}')
+        with self._attente_verrou():
+            self.connexion.execute('PRAGMA journal_mode = WAL')
+            self.connexion.execute('PRAGMA synchronous = NORMAL')
+            self.connexion.execute('PRAGMA foreign_keys = ON')
+            self.connexion.executescript(SCHEMA)
+            self._completer_schema()
+            self.connexion.executescript(DECLENCHEURS)
+        self._profondeur = 0
+        self._version_donnees = self._lire_version_donnees()
+        self._numero_lu = self._dernier_numero()  # Dernière écriture déjà prise en compte
+
+    @contextmanager
+    def _attente_verrou(self) -> Iterator[None]:
+        """Traduit l'échec de l'attente d'un verrou SQLite (busy_timeout écoulé) en BaseVerrouillee"""
+        try:
+            yield
+        except sqlite3.OperationalError as e:
+            if 'locked' in str(e) or 'busy' in str(e):
+                raise BaseVerrouillee(self.path, self.delai) from e
+            raise
+
+    def _completer_schema(self):
+        for table, colonnes in COLONNES_AJOUTEES.items():
+            existantes = {ligne[1] for ligne in self.connexion.execute(f"PRAGMA table_info({table})")}
+            for colonne, definition in colonnes:
+                if colonne not in existantes:
+                    self.connexion.execute(f"ALTER TABLE {table} ADD COLUMN {colonne} {definition}")
+        for index in INDEX_AJOUTES:
+            self.connexion.execute(index)
+
+    def _lire_version_donnees(self) -> int:
+        return self.connexion.execute('PRAGMA data_version').fetchone()[0]
+
+    def _dernier_numero(self) -> int:
+        return self.connexion.execute("SELECT IFNULL(MAX(numero), 0) FROM modifications").fetchone()[0]
+
+    @contextmanager
+    def lot(self) -> Iterator[Set[Modification]]:
+        """Transaction : toutes les écritures du bloc sont validées ensemble, ou annulées.
+
+        Fournit au bloc les documents modifiés par d'autres processus depuis la dernière lecture.
+        Les lots imbriqués sont fusionnés dans le lot englobant.
+        """
+        with self.verrou:
+            if self._profondeur:
+                self._profondeur += 1
+                try:
+                    yield set()
+                finally:
+                    self._profondeur -= 1
+                return
+
+            with self._attente_verrou():
+                self.connexion.execute('BEGIN IMMEDIATE')
+            self._profondeur = 1
+            try:
+                yield self.rafraichir()
+            except BaseException:
+                self.connexion.execute('ROLLBACK')
+                raise
+            else:
+                # Personne d'autre n'a écrit depuis BEGIN IMMEDIATE : seules nos écritures suivent
+                self._numero_lu = self._dernier_numero()
+                self.connexion.execute('COMMIT')
+            finally:
+                self._profondeur = 0
+
+    def rafraichir(self) -> Set[Modification]:
+        """Documents modifiés depuis le dernier appel, lus dans la table ``modifications``.
+
+        ``PRAGMA data_version`` ne change qu'après l'écriture d'une autre connexion : sans elle,
+        la table n'est pas relue.
+        """
+        with self.verrou:
+            version = self._lire_version_donnees()
+            if version == self._version_donnees:
+                return set()
+            self._version_donnees = version
+            lignes = self.connexion.execute(
+                "SELECT nom_table, doc_id, numero FROM modifications WHERE numero > ?", (self._numero_lu,)).fetchall()
+            if lignes:
+                self._numero_lu = max(numero for _, _, numero in lignes)
+        return {(nom_table, str(doc_id)) for nom_table, doc_id, _ in lignes}
+
+    def close(self):
+        with self.verrou:
+            self.connexion.close()
+
+
+class TableJoueurs:
+    """Table des joueurs, indexée par id, par nom, par classement et par identifiant externe"""
+
+    indexee = True  # Une lecture par id ne parcourt pas toute la table
+
+    def __init__(self, stockage: StockageSQLite):
+        self.stockage = stockage
+        self._next_id = None  # Pour compatibilité avec les tables TinyDB
+
+    @staticmethod
+    def _document(ligne: Tuple) -> Document:
+        document = dict(zip(COLONNES_JOUEURS, ligne[1:]))
+        if document['id_externe'] is None:
+            del document['id_externe']  # Comme dans le journal : pas de champ pour un joueur sans identifiant
+        return Document(document, doc_id=ligne[0])
+
+    @mesure('sqlite.ecriture')
+    def insert(self, document: Dict[str, Any]) -> int:
+        with self.stockage.verrou:
+            curseur = self.stockage.connexion.execute(
+                f"INSERT INTO joueurs ({', '.join(COLONNES_JOUEURS)}) "
+                f"VALUES ({', '.join('?' * len(COLONNES_JOUEURS))})",
+                [document.get(colonne) for colonne in COLONNES_JOUEURS])
+            return curseur.lastrowid
+
+    def insert_multiple(self, documents: Iterable[Dict[str, Any]]) -> List[int]:
+        with self.stockage.lot():
+            return [self.insert(document) for document in documents]
+
+    @mesure('sqlite.ecriture')
+    def update(self, champs: Dict[str, Any], doc_ids: Iterable[int]):
+        colonnes = [colonne for colonne in COLONNES_JOUEURS if colonne in champs]
+        if not colonnes:
+            return
+        affectations = ', '.join(f'{colonne} = ?' for colonne in colonnes)
+        with self.stockage.lot():
+            self.stockage.connexion.executemany(
+                f"UPDATE joueurs SET {affectations} WHERE id = ?",
+                [[champs[colonne] for colonne in colonnes] + [doc_id] for doc_id in doc_ids])
+
+    @mesure('sqlite.ecriture')
+    def modifier_documents(self, modifications: Dict[int, Dict[str, Any]]):
+        """Met à jour des champs différents pour chaque joueur, en une seule transaction"""
+        par_colonnes: Dict[Tuple[str, ...], List[List[Any]]] = {}
+        for doc_id, champs in modifications.items():
+            colonnes = tuple(colonne for colonne in COLONNES_JOUEURS if colonne in champs)
+            if colonnes:
+                par_colonnes.setdefault(colonnes, []).append([champs[colonne] for colonne in colonnes] + [doc_id])
+        with self.stockage.lot():
+            for colonnes, lignes in par_colonnes.items():
+                affectations = ', '.join(f'{colonne} = ?' for colonne in colonnes)
+                self.stockage.connexion.executemany(f"UPDATE joueurs SET {affectations} WHERE id = ?", lignes)
+
+    @mesure('sqlite.lecture')
+    def get(self, doc_id: int) -> Optional[Document]:
+        with self.stockage.verrou:
+            ligne = self.stockage.connexion.execute(
+                f"SELECT id, {', '.join(COLONNES_JOUEURS)} FROM joueurs WHERE id = ?", (doc_id,)).fetchone()
+        return self._document(ligne) if ligne is not None else None
+
+    @mesure('sqlite.lecture')
+    def all(self) -> List[Document]:
+        with self.stockage.verrou:
+            lignes = self.stockage.connexion.execute(
+                f"SELECT id, {', '.join(COLONNES_JOUEURS)} FROM joueurs ORDER BY id").fetchall()
+        return [self._document(ligne) for ligne in lignes]
+
+    def clear_cache(self):
+        pass
+
+    def __len__(self):
+        with self.stockage.verrou:
+            return self.stockage.connexion.execute("SELECT COUNT(*) FROM joueurs").fetchone()[0]
+
+
+class TableTournois:
+    """Table des tournois ; inscriptions, tours et matches sont rangés dans leurs propres tables"""
+
+    indexee = True
+
+    def __init__(self, stockage: StockageSQLite):
+        self.stockage = stockage
+        self._next_id = None
+        # Tours de chaque tournoi tels qu'ils sont en base, avec la version du tournoi correspondante
+        self._tours_connus: Dict[int, Tuple[int, List[Dict[str, Any]]]] = {}
+
+    def _ecrire(self, tournoi_id: int, champs: Dict[str, Any], tours_en_base: Optional[List[Dict[str, Any]]] = None):
+        """Réécrit les inscriptions, tours et matches présents dans ``champs``.
+
+        Avec ``tours_en_base``, les tours identiques en tête de liste ne sont pas réécrits :
+        ajouter un tour ne coûte que ce tour, quel que soit le nombre de tours déjà joués.
+        """
+        connexion = self.stockage.connexion
+        if 'joueurs' in champs:
+            connexion.execute("DELETE FROM inscriptions WHERE tournoi_id = ?", (tournoi_id,))
+            connexion.executemany("INSERT INTO inscriptions (tournoi_id, rang, joueur_id) VALUES (?, ?, ?)",
+                                  [(tournoi_id, rang, joueur) for rang, joueur in enumerate(champs['joueurs'])])
+        if 'tours' in champs:
+            debut = 0
+            for ancien, tour in zip(tours_en_base or (), champs['tours']):
+                if ancien is not tour and ancien != tour:
+                    break
+                debut += 1
+            # Les matches des tours supprimés suivent (ON DELETE CASCADE)
+            connexion.execute("DELETE FROM tours WHERE tournoi_id = ? AND numero > ?", (tournoi_id, debut))
+            connexion.executemany(
+                "INSERT INTO tours (tournoi_id, numero, nom, debut, fin) VALUES (?, ?, ?, ?, ?)",
+                [(tournoi_id, numero, tour['nom'], tour['debut'], tour['fin'])
+                 for numero, tour in enumerate(champs['tours'][debut:], debut + 1)])
+            connexion.executemany(
+                "INSERT INTO matches (tournoi_id, tour, echiquier, blancs, noirs, resultat) VALUES (?, ?, ?, ?, ?, ?)",
+                [(tournoi_id, numero, echiquier, blanc, noir, resultat)
+                 for numero, tour in enumerate(champs['tours'][debut:], debut + 1)
+                 for echiquier, (blanc, noir, resultat) in enumerate(zip(tour['blancs'], tour['noirs'],
+                                                                         tour['resultats']))])
+
+    @staticmethod
+    def _calendrier(calendrier: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+        return json.dumps(calendrier, separators=(',', ':')) if calendrier is not None else None
+
+    @mesure('sqlite.ecriture')
+    def insert(self, document: Dict[str, Any], doc_id: Optional[int] = None) -> int:
+        with self.stockage.lot():
+            curseur = self.stockage.connexion.execute(
+                f"INSERT INTO tournois (id, {', '.join(COLONNES_TOURNOIS)}, scores, version, systeme, calendrier) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [doc_id] + [document[colonne] for colonne in COLONNES_TOURNOIS] +
+                [json.dumps(document['scores']) if 'scores' in document else None, document.get('version', 0),
+                 document.get('systeme', 'suisse'), self._calendrier(document.get('calendrier'))])
+            tournoi_id = curseur.lastrowid
+            self._ecrire(tournoi_id, document)
+        if 'tours' in document:
+            self._tours_connus[tournoi_id] = (document.get('version', 0), document['tours'])
+        return tournoi_id
+
+    @mesure('sqlite.ecriture')
+    def update(self, champs: Dict[str, Any], doc_ids: Iterable[int]):
+        """Met à jour des tournois ; un champ ``version`` doit succéder à la version en base"""
+        colonnes = [colonne for colonne in COLONNES_TOURNOIS if colonne in champs]
+        valeurs = [champs[colonne] for colonne in colonnes]
+        if 'scores' in champs:
+            colonnes.append('scores')
+            valeurs.append(json.dumps(champs['scores']))
+        if 'systeme' in champs:
+            colonnes.append('systeme')
+            valeurs.append(champs['systeme'])
+        if 'calendrier' in champs:
+            colonnes.append('calendrier')
+            valeurs.append(self._calendrier(champs['calendrier']))
+        with self.stockage.lot():
+            connexion = self.stockage.connexion
+            for doc_id in doc_ids:
+                connus = self._tours_connus.pop(doc_id, None)
+                if 'version' in champs:
+                    curseur = connexion.execute("UPDATE tournois SET version = ? WHERE id = ? AND version = ?",
+                                                (champs['version'], doc_id, champs['version'] - 1))
+                    if curseur.rowcount == 0:
+                        raise ConflitVersion('tournois', str(doc_id))
+                # Sans version, rien ne garantit que les tours connus sont encore ceux de la base
+                tours_en_base = connus[1] if connus is not None and connus[0] == champs.get('version', 0) - 1 \
+                    else None
+                if colonnes:
+                    affectations = ', '.join(f'{colonne} = ?' for colonne in colonnes)
+                    connexion.execute(f"UPDATE tournois SET {affectations} WHERE id = ?", valeurs + [doc_id])
+                self._ecrire(doc_id, champs, tours_en_base)
+                tours = champs['tours'] if 'tours' in champs else tours_en_base
+                if 'version' in champs and tours is not None:
+                    self._tours_connus[doc_id] = (champs['version'], tours)
+
+    def _documents(self, tournoi_id: Optional[int] = None, avec_tours: bool = True) -> List[Document]:
+        """Reconstitue les documents des tournois (tous, ou un seul) à partir des tables"""
+        filtre, parametres = ("WHERE id = ?", (tournoi_id,)) if tournoi_id is not None else ("", ())
+        filtre_details = filtre.replace('id', 'tournoi_id')
+        connexion = self.stockage.connexion
+        with self.stockage.verrou:
+            documents: Dict[int, Document] = {}
+            for ligne in connexion.execute(
+                    f"SELECT id, {', '.join(COLONNES_TOURNOIS)}, scores, version, "
+                    f"(SELECT COUNT(*) FROM tours WHERE tours.tournoi_id = tournois.id), systeme, calendrier "
+                    f"FROM tournois {filtre} ORDER BY id", parametres):
+                document = Document(dict(zip(COLONNES_TOURNOIS, ligne[1:8])), doc_id=ligne[0])
+                if ligne[8] is not None:
+                    document['scores'] = json.loads(ligne[8])
+                document['version'] = ligne[9]
+                document['systeme'] = ligne[11]
+                document['calendrier'] = json.loads(ligne[12]) if ligne[12] is not None else None
+                document['joueurs'] = []
+                if avec_tours:
+                    document['tours'] = []
+                else:
+                    document['nb_tours_joues'] = ligne[10]
+                documents[ligne[0]] = document
+
+            for tournoi, joueur in connexion.execute(
+                    f"SELECT tournoi_id, joueur_id FROM inscriptions {filtre_details} ORDER BY tournoi_id, rang",
+                    parametres):
+                documents[tournoi]['joueurs'].append(joueur)
+
+            if avec_tours:
+                tours: Dict[Tuple[int, int], Dict[str, Any]] = {}
+                for tournoi, numero, nom, debut, fin in connexion.execute(
+                        f"SELECT tournoi_id, numero, nom, debut, fin FROM tours {filtre_details} "
+                        f"ORDER BY tournoi_id, numero", parametres):
+                    tour = {'nom': nom, 'debut': debut, 'fin': fin, 'blancs': [], 'noirs': [], 'resultats': []}
+                    documents[tournoi]['tours'].append(tour)
+                    tours[tournoi, numero] = tour
+                for tournoi, numero, blanc, noir, resultat in connexion.execute(
+                        f"SELECT tournoi_id, tour, blancs, noirs, resultat FROM matches {filtre_details} "
+                        f"ORDER BY tournoi_id, tour, echiquier", parametres):
+                    tour = tours[tournoi, numero]
+                    tour['blancs'].append(blanc)
+                    tour['noirs'].append(noir)
+                    tour['resultats'].append(resultat)
+                for tour in tours.values():
+                    tour['resultats'] = ''.join(tour['resultats'])
+                if tournoi_id is not None:
+                    for document in documents.values():
+                        self._tours_connus[document.doc_id] = (document['version'], document['tours'])
+        return list(documents.values())
+
+    @mesure('sqlite.lecture')
+    def get(self, doc_id: int) -> Optional[Document]:
+        documents = self._documents(doc_id)
+        return documents[0] if documents else None
+
+    @mesure('sqlite.lecture')
+    def all(self) -> List[Document]:
+        return self._documents()
+
+    @mesure('sqlite.lecture')
+    def entetes(self) -> List[Document]:
+        """Documents des tournois sans leurs tours, avec le nombre de tours joués"""
+        return self._documents(avec_tours=False)
+
+    def clear_cache(self):
+        self._tours_connus.clear()
+
+    def __len__(self):
+        with self.stockage.verrou:
+            return self.stockage.connexion.execute("SELECT COUNT(*) FROM tournois").fetchone()[0]
+
+
+TABLES = {'joueurs': TableJoueurs, 'tournois': TableTournois}
+
+
+class BaseSQLite:
+    """Base de données SQLite présentée comme une base TinyDB (``table``, ``storage``, ``close``)"""
+
+    def __init__(self, path: str):
+        self.storage = StockageSQLite(path)
+        self._tables: Dict[str, Any] = {}
+
+    def table(self, nom: str):
+        if nom not in self._tables:
+            self._tables[nom] = TABLES[nom](self.storage)
+        return self._tables[nom]
+
+    def close(self):
+        self.storage.close()
+
+
+def _en_colonnes(tour: Dict[str, Any]) -> Dict[str, Any]:
+    """Convertit un tour stocké en liste de matches (ancien format) en colonnes"""
+    if 'resultats' in tour:
+        return tour
+    matches = tour['matches']
+    return {
+        'nom': tour['nom'],
+        'debut': tour['debut'],
+        'fin': tour['fin'],
+        'blancs': [match['joueur1_id'] for match in matches],
+        'noirs': [match['joueur2_id'] or 0 for match in matches],
+        'resultats': ''.join(CODES_ANCIENS[tuple(match['resultat']) if match['resultat'] else None]
+                             for match in matches),
+    }
+
+
+def migrer(source: str, destination: str) -> Tuple[int, int]:
+    """Copie une base TinyDB (journal ou fichier JSON) dans une base SQLite vide, ids compris"""
+    if not os.path.exists(source):
+        raise ValueError(f"Base source introuvable : {source}")
+    if source.endswith('.journal'):
+        stockage = JournalStorage(source)
+        donnees = stockage.read() or {}
+        stockage.close()
+    else:
+        with open(source, encoding='utf-8') as f:
+            contenu = f.read()
+        donnees = json.loads(contenu) if contenu.strip() else {}
+
+    base = BaseSQLite(destination)
+    joueurs, tournois = base.table('joueurs'), base.table('tournois')
+    if len(joueurs) or len(tournois):
+        base.close()
+        raise ValueError(f"La base {destination} n'est pas vide.")
+
+    with base.storage.lot():
+        base.storage.connexion.executemany(
+            f"INSERT INTO joueurs (id, {', '.join(COLONNES_JOUEURS)}) "
+            f"VALUES (?, {', '.join('?' * len(COLONNES_JOUEURS))})",
+            [[int(doc_id)] + [document.get(colonne) for colonne in COLONNES_JOUEURS]
+             for doc_id, document in donnees.get('joueurs', {}).items()])
+        for doc_id, document in donnees.get('tournois', {}).items():
+            document = dict(document)
+            document['tours'] = [_en_colonnes(tour) for tour in document.get('tours', [])]
+            tournois.insert(document, doc_id=int(doc_id))
+    nombres = len(joueurs), len(tournois)
+    base.close()
+    return nombres
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) > 0:
+        source = argv[0]
+    else:
+        # Une installation antérieure au journal n'a que le fichier JSON
+        source = JOURNAL_DEFAUT if os.path.exists(JOURNAL_DEFAUT) else JSON_DEFAUT
+    destination = argv[1] if len(argv) > 1 else SQLITE_DEFAUT
+    try:
+        nb_joueurs, nb_tournois = migrer(source, destination)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Migration impossible : {e}", file=sys.stderr)
+        return 1
+    print(f"✅ {nb_joueurs} joueurs et {nb_tournois} tournois copiés dans {destination}.")
+    print("   Lancez l'application avec ECHEC_STOCKAGE=sqlite pour l'utiliser.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
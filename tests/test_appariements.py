@@ -0,0 +1,143 @@
+# Appariements suisses (revanches, couleurs et bye) et tables de Berger
+
+import random
+from typing import Dict, List, Optional, Set, Tuple
+
+import pytest
+
+from appariements import BLANC, NOIR, EtatJoueur, apparier, attribuer_couleurs, table_berger
+
+
+def _appariement_sans_revanche_existe(joueurs: List[EtatJoueur]) -> bool:
+    """Recherche exhaustive d'un appariement complet sans revanche (petits effectifs)"""
+    if not joueurs:
+        return True
+    premier, autres = joueurs[0], joueurs[1:]
+    return any(adversaire.id not in premier.adversaires
+               and _appariement_sans_revanche_existe(autres[:i] + autres[i + 1:])
+               for i, adversaire in enumerate(autres))
+
+
+def _jouer_tournoi(nb_joueurs: int, nb_tours: int, graine: int):
+    """Tournoi suisse à résultats aléatoires ; rend pour chaque tour (joueurs avant le tour, paires, exempt)"""
+    hasard = random.Random(graine)
+    joueurs = {i: EtatJoueur(i, classement=2000 - 10 * i) for i in range(1, nb_joueurs + 1)}
+    tours = []
+    for _ in range(nb_tours):
+        avant = {i: EtatJoueur(j.id, j.score, j.classement, set(j.adversaires), j.couleurs, j.exempte)
+                 for i, j in joueurs.items()}
+        paires, exempt = apparier(list(joueurs.values()))
+        tours.append((avant, paires, exempt))
+        for blanc, noir in paires:
+            points = hasard.choice((1, 0.5, 0))
+            joueurs[blanc].score += points
+            joueurs[noir].score += 1 - points
+            joueurs[blanc].adversaires.add(noir)
+            joueurs[noir].adversaires.add(blanc)
+            joueurs[blanc].couleurs += BLANC
+            joueurs[noir].couleurs += NOIR
+        if exempt is not None:
+            joueurs[exempt].score += 1
+            joueurs[exempt].exempte = True
+    return tours
+
+
+@pytest.mark.parametrize('nb_tours', [4, 5])
+@pytest.mark.parametrize('graine', range(300))
+def test_pas_de_revanche_evitable(graine, nb_tours):
+    for avant, paires, exempt in _jouer_tournoi(8, nb_tours, graine):
+        revanches = [(blanc, noir) for blanc, noir in paires if noir in avant[blanc].adversaires]
+        if revanches:
+            apparies = [avant[i] for i in avant if i != exempt]
+            assert not _appariement_sans_revanche_existe(apparies), f"revanche évitable : {revanches}"
+
+
+def test_chaque_joueur_apparie_une_fois():
+    for avant, paires, exempt in _jouer_tournoi(9, 5, 3):
+        apparies = [i for paire in paires for i in paire] + [exempt]
+        assert sorted(apparies) == sorted(avant)
+
+
+def test_bye_au_moins_bien_place_sans_bye():
+    joueurs = [EtatJoueur(1, score=2), EtatJoueur(2, score=1, classement=1900), EtatJoueur(3, score=0, exempte=True),
+               EtatJoueur(4, score=1, classement=1800), EtatJoueur(5, score=1, classement=1500)]
+    _, exempt = apparier(joueurs)
+    assert exempt == 5  # Le dernier (joueur 3) a déjà reçu un bye
+
+
+def test_pas_de_bye_en_nombre_pair():
+    _, exempt = apparier([EtatJoueur(i) for i in range(1, 7)])
+    assert exempt is None
+
+
+def test_bye_jamais_deux_fois_dans_un_tournoi():
+    exemptes: Set[Optional[int]] = set()
+    for _, _, exempt in _jouer_tournoi(7, 7, 11):
+        assert exempt not in exemptes
+        exemptes.add(exempt)
+
+
+def test_couleurs_alternees():
+    a = EtatJoueur(1, classement=2000, couleurs=BLANC)
+    b = EtatJoueur(2, classement=1900, couleurs=NOIR)
+    assert attribuer_couleurs(a, b) == (b, a)
+    assert attribuer_couleurs(EtatJoueur(1, couleurs=NOIR), EtatJoueur(2, couleurs=BLANC))[0].id == 1
+
+
+def test_couleur_imposee_apres_deux_fois_la_meme():
+    a = EtatJoueur(1, classement=2000, couleurs=BLANC + NOIR + NOIR)
+    b = EtatJoueur(2, classement=1900, couleurs=NOIR + BLANC + BLANC)
+    assert a.couleur_imposee() == BLANC and b.couleur_imposee() == NOIR
+    assert attribuer_couleurs(a, b) == (a, b)
+
+
+def test_couleurs_equilibrees_sur_un_tournoi():
+    for graine in range(20):
+        tours = _jouer_tournoi(10, 5, graine)
+        couleurs: Dict[int, str] = {i: '' for i in tours[0][0]}
+        for _, paires, _ in tours:
+            for blanc, noir in paires:
+                couleurs[blanc] += BLANC
+                couleurs[noir] += NOIR
+        for suite in couleurs.values():
+            assert abs(suite.count(BLANC) - suite.count(NOIR)) <= 2
+            assert BLANC * 3 not in suite and NOIR * 3 not in suite
+
+
+@pytest.mark.parametrize('nb_joueurs', [2, 3, 4, 7, 10, 16])
+def test_table_berger_chacun_rencontre_chacun_une_fois(nb_joueurs):
+    rondes = table_berger(nb_joueurs)
+    places = nb_joueurs + nb_joueurs % 2
+    assert len(rondes) == places - 1
+    rencontres: List[Tuple[int, int]] = []
+    for ronde in rondes:
+        joueurs = [place for paire in ronde for place in paire]
+        assert sorted(joueurs) == list(range(1, places + 1))  # Chacun joue une fois par ronde
+        rencontres.extend(tuple(sorted(paire)) for paire in ronde)
+    assert len(rencontres) == len(set(rencontres)) == places * (places - 1) // 2
+
+
+def test_table_berger_couleurs_equilibrees():
+    blancs: Dict[int, int] = {}
+    for ronde in table_berger(8):
+        for blanc, _ in ronde:
+            blancs[blanc] = blancs.get(blanc, 0) + 1
+    assert all(3 <= nombre <= 4 for nombre in blancs.values())
+
+
+def test_table_berger_aller_retour_inverse_les_couleurs():
+    rondes = table_berger(6, aller_retour=True)
+    assert len(rondes) == 10
+    for aller, retour in zip(rondes[:5], rondes[5:]):
+        assert retour == tuple((noir, blanc) for blanc, noir in aller)
+
+
+def test_table_berger_premiere_ronde_fide():
+    # Table de Berger FIDE à 4 joueurs : 1-4, 2-3 / 4-3, 1-2 / 2-4, 3-1
+    assert [sorted(map(sorted, ronde)) for ronde in table_berger(4)] == [
+        [[1, 4], [2, 3]], [[1, 2], [3, 4]], [[1, 3], [2, 4]]]
+
+
+def test_table_berger_refuse_moins_de_deux_joueurs():
+    with pytest.raises(ValueError):
+        table_berger(1)
@@ -0,0 +1,62 @@
+# Archive en colonnes : classements recalculés comme elo.py et tranches par période
+
+from array import array
+
+import pytest
+
+import Echec
+from archive import Archive, exporter
+from elo import CLASSEMENT_INITIAL, recalculer
+
+
+@pytest.fixture
+def base(tmp_path):
+    yield Echec.ouvrir_base('journal', str(tmp_path), instantane=False)
+    Echec.fermer_base()
+
+
+def _tournoi(date_debut: str, blancs, noirs, resultats: str) -> int:
+    """Insère un tournoi terminé d'un seul tour"""
+    return Echec.tournois_table.insert({
+        'nom': f'Open {date_debut}', 'lieu': 'Lyon', 'date_debut': date_debut, 'date_fin': date_debut,
+        'nb_tours': 1, 'controle_temps': 'blitz', 'description': '', 'joueurs': sorted(blancs + noirs),
+        'tours': [{'nom': 'Tour 1', 'debut': None, 'fin': '2024-01-01T12:00:00',
+                   'blancs': blancs, 'noirs': noirs, 'resultats': resultats}]})
+
+
+def _joueur(nom: str, classement: int, id_externe=None) -> int:
+    return Echec.Joueur(nom, 'Test', '1990-01-01', 'M', classement, id_externe=id_externe).save()
+
+
+def test_classements_avant_partie_comme_elo(base, tmp_path):
+    officiel = _joueur('Officiel', 2000, id_externe='FIDE:1')
+    a, b = _joueur('Alpha', 1800), _joueur('Beta', 1700)
+    _tournoi('2023-01-01', [a], [officiel], '1')
+    _tournoi('2023-06-01', [officiel, a], [b, Echec.EXEMPT], '30')
+
+    chemin = str(tmp_path / 'archive.colonnes')
+    assert exporter(chemin) == 2
+    avant = (array('d'), array('d'))
+    recalculer([a, officiel], [officiel, b], [1, 0.5], [1, 2], initiaux={officiel: 2000}, avant=avant)
+    with Archive(chemin) as archive:
+        assert list(archive.colonnes['classement_blancs']) == [round(c) for c in avant[0]]
+        assert list(archive.colonnes['classement_noirs']) == [round(c) for c in avant[1]]
+        # Le classement officiel sert de départ ; les autres partent de CLASSEMENT_INITIAL
+        assert archive.colonnes['classement_noirs'][0] == 2000
+        assert archive.colonnes['classement_blancs'][0] == CLASSEMENT_INITIAL
+
+
+def test_tranche_avec_une_date_illisible(base, tmp_path):
+    a, b = _joueur('Alpha', 1800), _joueur('Beta', 1700)
+    _tournoi('2024-03-01', [a], [b], '1')
+    illisible = _tournoi('mars 2023', [a], [b], '2')
+    premier = _tournoi('2023-01-01', [b], [a], '3')
+
+    chemin = str(tmp_path / 'archive.colonnes')
+    exporter(chemin)
+    with Archive(chemin) as archive:
+        jours = list(archive.colonnes['jour'])
+        assert jours == sorted(jours)
+        assert list(archive.colonnes['tournoi'][:2]) == [illisible, premier]
+        assert list(archive.tranche('2023-01-01', '2023-12-31')['tournoi']) == [premier]
+        assert archive.activite_joueur(a) == {0: 1, 2023: 1, 2024: 1}
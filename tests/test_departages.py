@@ -0,0 +1,99 @@
+# Départages : mises à jour résultat par résultat contre un calcul complet
+
+import random
+from typing import List
+
+import pytest
+
+from departages import CRITERES, Partie, ScoresTournoi
+
+JOUEURS = list(range(1, 10))
+
+
+def _tours_aleatoires(nb_tours: int, graine: int) -> List[List[Partie]]:
+    """Parties de ``nb_tours`` tours à appariements et résultats aléatoires, un bye par tour"""
+    hasard = random.Random(graine)
+    tours = []
+    for numero in range(1, nb_tours + 1):
+        joueurs = JOUEURS[:]
+        hasard.shuffle(joueurs)
+        parties: List[Partie] = [(numero, joueurs.pop(), None, 1, 0)]
+        for blanc, noir in zip(joueurs[::2], joueurs[1::2]):
+            points = hasard.choice((1, 0.5, 0))
+            parties.append((numero, blanc, noir, points, 1 - points))
+        tours.append(parties)
+    return tours
+
+
+def _identiques(scores: ScoresTournoi, attendus: ScoresTournoi):
+    for critere in CRITERES:
+        obtenu, attendu = getattr(scores, critere), getattr(attendus, critere)
+        assert {j: obtenu.get(j, 0) for j in JOUEURS} == pytest.approx(attendu), critere
+
+
+@pytest.mark.parametrize('graine', range(10))
+def test_mises_a_jour_egales_au_calcul_complet(graine):
+    scores = ScoresTournoi()
+    parties: List[Partie] = []
+    for tour in _tours_aleatoires(5, graine):
+        for partie in tour:
+            scores.enregistrer(*partie[1:])
+            parties.append(partie)
+        scores.terminer_tour(JOUEURS)
+    _identiques(scores, ScoresTournoi.calculer(parties, JOUEURS))
+
+
+def test_tour_en_cours_hors_du_progressif():
+    tours = _tours_aleatoires(3, 1)
+    scores = ScoresTournoi()
+    for tour in tours[:2]:
+        for partie in tour:
+            scores.enregistrer(*partie[1:])
+        scores.terminer_tour(JOUEURS)
+    for partie in tours[2][:3]:
+        scores.enregistrer(*partie[1:])
+    parties = tours[0] + tours[1] + tours[2][:3]
+    _identiques(scores, ScoresTournoi.calculer(parties, JOUEURS, tours_termines=2))
+
+
+def test_correction_d_un_tour_termine():
+    tours = _tours_aleatoires(4, 2)
+    scores = ScoresTournoi()
+    for tour in tours:
+        for partie in tour:
+            scores.enregistrer(*partie[1:])
+        scores.terminer_tour(JOUEURS)
+
+    # Correction d'une partie du deuxième tour : trois tours sont terminés depuis
+    ancienne = tours[1][1]
+    corrigee = ancienne[:3] + ((0, 1) if ancienne[3] == 1 else (1, 0))
+    scores.retirer(*ancienne[1:], tours_termines=3)
+    scores.enregistrer(*corrigee[1:], tours_termines=3)
+
+    tours[1][1] = corrigee
+    _identiques(scores, ScoresTournoi.calculer([p for tour in tours for p in tour], JOUEURS))
+
+
+def test_reprise_apres_relecture():
+    tours = _tours_aleatoires(3, 3)
+    scores = ScoresTournoi()
+    for partie in tours[0]:
+        scores.enregistrer(*partie[1:])
+    scores.terminer_tour(JOUEURS)
+
+    relu = ScoresTournoi.from_dict(scores.to_dict())
+    assert not relu.adversaires_connus
+    relu.reconstruire_adversaires(tours[0])
+    for tour in tours[1:]:
+        for partie in tour:
+            relu.enregistrer(*partie[1:])
+        relu.terminer_tour(JOUEURS)
+    _identiques(relu, ScoresTournoi.calculer([p for tour in tours for p in tour], JOUEURS))
+
+
+def test_classement_par_departages():
+    # 1 et 2 finissent à 1,5 point ; les adversaires de 1 en ont marqué davantage (Buchholz)
+    parties: List[Partie] = [(1, 1, 3, 1, 0), (1, 2, 4, 1, 0), (2, 3, 4, 1, 0), (2, 1, 2, 0.5, 0.5)]
+    scores = ScoresTournoi.calculer(parties, [1, 2, 3, 4])
+    assert scores.points == {1: 1.5, 2: 1.5, 3: 1, 4: 0}
+    assert scores.classer([4, 3, 2, 1]) == [1, 2, 3, 4]
@@ -0,0 +1,79 @@
+# Classements Elo : variations d'un tour, recalcul de l'historique et classements officiels
+
+import random
+
+import pytest
+
+import Echec
+import elo
+from elo import CLASSEMENT_INITIAL, K_FACTEUR, recalculer, score_attendu, variations
+
+
+def test_score_attendu():
+    assert score_attendu(1500, 1500) == 0.5
+    assert score_attendu(1900, 1500) == pytest.approx(10 / 11)
+    assert score_attendu(1700, 1600) + score_attendu(1600, 1700) == pytest.approx(1)
+
+
+def test_variations_d_un_tour():
+    classements = {1: 1500, 2: 1500, 3: 1700, 4: 1500}
+    resultat = variations([(1, 2, 1), (3, 4, 0.5)], classements)
+    assert resultat[1] == pytest.approx(K_FACTEUR / 2) and resultat[2] == pytest.approx(-K_FACTEUR / 2)
+    assert resultat[3] < 0 < resultat[4]  # La nulle coûte des points au favori
+    assert sum(resultat.values()) == pytest.approx(0)
+
+
+def test_parties_d_une_periode_evaluees_avec_les_classements_de_depart():
+    # 1 bat 2 puis 3 : dans la même période, les deux victoires valent autant
+    classements = recalculer([1, 1], [2, 3], [1, 1], [1, 1])
+    assert classements[1] == pytest.approx(CLASSEMENT_INITIAL + K_FACTEUR)
+    # Sur deux périodes, la seconde victoire vaut moins : 1 est déjà mieux classé
+    classements = recalculer([1, 1], [2, 3], [1, 1], [1, 2])
+    assert CLASSEMENT_INITIAL + K_FACTEUR / 2 < classements[1] < CLASSEMENT_INITIAL + K_FACTEUR
+
+
+def test_recalcul_egal_aux_variations_tour_par_tour():
+    hasard = random.Random(5)
+    blancs, noirs, points, periodes = [], [], [], []
+    attendus = {i: float(CLASSEMENT_INITIAL) for i in range(1, 9)}
+    for periode in range(1, 7):
+        joueurs = list(attendus)
+        hasard.shuffle(joueurs)
+        parties = [(blanc, noir, hasard.choice((1, 0.5, 0))) for blanc, noir in zip(joueurs[::2], joueurs[1::2])]
+        for blanc, noir, points_blanc in parties:
+            blancs.append(blanc)
+            noirs.append(noir)
+            points.append(points_blanc)
+            periodes.append(periode)
+        for joueur, ecart in variations(parties, attendus).items():
+            attendus[joueur] += ecart
+    assert recalculer(blancs, noirs, points, periodes) == pytest.approx(attendus)
+
+
+def test_recalcul_depuis_les_classements_initiaux():
+    classements = recalculer([1], [2], [0.5], [1], initiaux={1: 2000})
+    assert classements[1] == pytest.approx(2000 - K_FACTEUR * (score_attendu(2000, 1500) - 0.5))
+    assert classements[2] == pytest.approx(CLASSEMENT_INITIAL + K_FACTEUR * (score_attendu(2000, 1500) - 0.5))
+
+
+@pytest.fixture
+def base(tmp_path):
+    yield Echec.ouvrir_base('journal', str(tmp_path), instantane=False)
+    Echec.fermer_base()
+
+
+def test_recalcul_complet_garde_les_classements_officiels(base):
+    officiel = Echec.Joueur('Carlsen', 'Magnus', '1990-11-30', 'M', 2000, id_externe='FIDE:1503014').save()
+    local = Echec.Joueur('Dupont', 'Anne', '1990-01-01', 'F', 1800).save()
+    Echec.tournois_table.insert({
+        'nom': 'Open', 'lieu': 'Lyon', 'date_debut': '2024-01-01', 'date_fin': '2024-01-02', 'nb_tours': 1,
+        'controle_temps': 'blitz', 'description': '', 'joueurs': [officiel, local],
+        'tours': [{'nom': 'Tour 1', 'debut': '2024-01-01T10:00:00', 'fin': '2024-01-01T12:00:00',
+                   'blancs': [local], 'noirs': [officiel], 'resultats': '1'}]})
+
+    elo.main(['--enregistrer', '--oui'])
+
+    classements = {joueur.id: joueur.classement for joueur in Echec.depot_joueurs.get_all()}
+    assert classements[officiel] == 2000
+    # Le joueur local part de CLASSEMENT_INITIAL face au classement officiel de son adversaire
+    assert classements[local] == round(CLASSEMENT_INITIAL + K_FACTEUR * (1 - score_attendu(1500, 2000)))
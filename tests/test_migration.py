@@ -0,0 +1,66 @@
+# Migration d'une base TinyDB (ancien fichier JSON ou journal) vers SQLite
+
+import json
+import os
+
+import pytest
+
+import stockage_sqlite
+from stockage_sqlite import BaseSQLite, migrer
+
+BASE_JSON = {
+    'joueurs': {
+        '1': {'nom_famille': 'Dupont', 'prenom': 'Anne', 'date_naissance': '1990-01-01', 'sexe': 'F',
+              'classement': 1650},
+        '3': {'nom_famille': 'Martin', 'prenom': 'Paul', 'date_naissance': '1985-05-05', 'sexe': 'M',
+              'classement': 1720},
+    },
+    'tournois': {
+        '2': {'nom': 'Open', 'lieu': 'Lyon', 'date_debut': '2024-01-01', 'date_fin': '2024-01-02', 'nb_tours': 4,
+              'controle_temps': 'blitz', 'description': '', 'joueurs': [1, 3],
+              # Ancien format : une liste de matches par tour
+              'tours': [{'nom': 'Tour 1', 'debut': '2024-01-01T10:00:00', 'fin': None,
+                         'matches': [{'joueur1_id': 3, 'joueur2_id': 1, 'resultat': [0.5, 0.5]}]}]},
+    },
+}
+
+
+@pytest.fixture
+def base_json(tmp_path):
+    chemin = tmp_path / 'chess_tournament.json'
+    chemin.write_text(json.dumps(BASE_JSON), encoding='utf-8')
+    return str(chemin)
+
+
+def test_migrer_un_fichier_json(base_json, tmp_path):
+    destination = str(tmp_path / 'base.sqlite')
+    assert migrer(base_json, destination) == (2, 1)
+
+    base = BaseSQLite(destination)
+    assert base.table('joueurs').get(3)['classement'] == 1720
+    tournoi = base.table('tournois').get(2)
+    assert tournoi['joueurs'] == [1, 3]
+    assert tournoi['tours'][0]['blancs'] == [3]
+    assert tournoi['tours'][0]['noirs'] == [1]
+    assert tournoi['tours'][0]['resultats'] == '3'
+    base.close()
+
+
+def test_source_absente_refusee_sans_creer_de_journal(tmp_path):
+    source = str(tmp_path / 'chess_tournament.journal')
+    with pytest.raises(ValueError):
+        migrer(source, str(tmp_path / 'base.sqlite'))
+    assert not os.path.exists(source)
+
+
+def test_source_par_defaut_sans_journal(base_json, tmp_path, monkeypatch):
+    journal = str(tmp_path / 'chess_tournament.journal')
+    destination = str(tmp_path / 'base.sqlite')
+    monkeypatch.setattr(stockage_sqlite, 'JOURNAL_DEFAUT', journal)
+    monkeypatch.setattr(stockage_sqlite, 'JSON_DEFAUT', base_json)
+    monkeypatch.setattr(stockage_sqlite, 'SQLITE_DEFAUT', destination)
+    assert stockage_sqlite.main([]) == 0
+    assert not os.path.exists(journal)
+    base = BaseSQLite(destination)
+    assert len(base.table('joueurs')) == 2
+    base.close()
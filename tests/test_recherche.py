@@ -0,0 +1,87 @@
+# Recherche de joueurs : préfixes, fautes de frappe (trigrammes) et plage de classement
+
+import pytest
+
+from Echec import Joueur
+from recherche import IndexJoueurs, distance, normaliser, par_classement
+from vues_triees import VueTriee, cle_classement
+
+JOUEURS = [
+    Joueur('Dupont', 'Jean', '1980-01-01', 'M', 1650, id=1),
+    Joueur('Dupond', 'Marie', '1985-02-02', 'F', 1720, id=2),
+    Joueur('Lefèvre', 'Élodie', '1992-03-03', 'F', 1890, id=3),
+    Joueur('Martin', 'Dupuis', '1975-04-04', 'M', 1500, id=4),
+    Joueur('De La Tour', 'Anne', '2001-05-05', 'F', 2105, id=5),
+    Joueur('Bernard', 'Jeanne', '1999-06-06', 'F', 1720, id=6),
+]
+
+
+@pytest.fixture
+def index():
+    return IndexJoueurs(JOUEURS)
+
+
+def _ids(joueurs):
+    return sorted(joueur.id for joueur in joueurs)
+
+
+def test_normaliser_ignore_accents_et_majuscules():
+    assert normaliser('Lefèvre') == 'lefevre'
+    assert normaliser(' ÉLODIE ') == 'elodie'
+
+
+def test_distance_bornee_et_transpositions():
+    assert distance('dupont', 'dupnot', 2) == 1
+    assert distance('dupont', 'dupond', 2) == 1
+    assert distance('dupont', 'martin', 1) == 2  # Au-delà du maximum : maximum + 1
+
+
+def test_prefixe_du_nom_ou_du_prenom(index):
+    assert _ids(index.rechercher('dup')) == [1, 2, 4]  # Noms Dupont, Dupond et prénom Dupuis
+    assert _ids(index.rechercher('jean')) == [1, 6]
+    assert _ids(index.rechercher('LEFEV')) == [3]
+
+
+def test_nom_et_prenom_dans_les_deux_ordres(index):
+    assert _ids(index.rechercher('dupont jean')) == [1]
+    assert _ids(index.rechercher('jean dupont')) == [1]
+    assert _ids(index.rechercher('elodie lefevre')) == [3]
+
+
+def test_nom_compose(index):
+    assert _ids(index.rechercher('de la t')) == [5]
+
+
+def test_fautes_de_frappe(index):
+    assert _ids(index.rechercher('dupnot')) == [1]  # Une transposition de Dupont ; Dupond est à deux fautes
+    assert _ids(index.rechercher('dupomd')) == [2]
+    assert _ids(index.rechercher('lefebvre')) == [3]
+    assert _ids(index.rechercher('duponx')) == [1, 2]  # Dupont et Dupond, à une lettre près
+    assert _ids(index.rechercher('duponx marie')) == [2]  # Le prénom départage
+
+
+def test_mots_courts_sans_tolerance(index):
+    assert index.rechercher('xy') == []
+
+
+def test_limite(index):
+    assert len(index.rechercher('d', limite=2)) == 2
+
+
+def test_index_tenu_a_jour(index):
+    index.ajouter(Joueur('Dupontel', 'Albert', '1964-01-09', 'M', 1600, id=7))
+    assert _ids(index.rechercher('dupont')) == [1, 7]
+    index.retirer(1)
+    assert _ids(index.rechercher('dupont')) == [7]
+    renomme = Joueur('Durand', 'Marie', '1985-02-02', 'F', 1720, id=2)
+    index.ajouter(renomme)
+    assert index.rechercher('dupond') == []  # L'ancien nom n'est plus indexé
+    assert _ids(index.rechercher('durand')) == [2]
+
+
+def test_plage_de_classement():
+    vue = VueTriee(cle_classement, JOUEURS)
+    assert [joueur.id for joueur in par_classement(vue, 1700, 1900)] in ([3, 2, 6], [3, 6, 2])
+    assert _ids(par_classement(vue, minimum=1720)) == [2, 3, 5, 6]  # Bornes incluses
+    assert _ids(par_classement(vue, maximum=1650)) == [1, 4]
+    assert [joueur.id for joueur in par_classement(vue, limite=2)] == [5, 3]
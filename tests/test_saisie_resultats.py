@@ -0,0 +1,42 @@
+# Saisie des résultats d'un tour depuis un fichier CSV ou JSON
+
+import io
+
+import pytest
+
+from Echec import EXEMPT, Tour
+from saisie_resultats import lire_lignes, preparer_resultats
+
+
+@pytest.fixture
+def tour():
+    tour = Tour('Tour 1')
+    tour.blancs.extend([12, 3, 5])
+    tour.noirs.extend([7, 9, EXEMPT])
+    tour.codes.extend(b'000')
+    return tour
+
+
+def test_csv_et_json(tour):
+    csv = lire_lignes(io.StringIO("echiquier,blancs,noirs,resultat\n1,12,7,1-0\n2,,,1/2-1/2\n"))
+    assert preparer_resultats(tour, csv) == {0: (1, 0), 1: (0.5, 0.5)}
+    json = lire_lignes(io.StringIO('[{"echiquier": 2, "resultat": "0-1"}]'))
+    assert preparer_resultats(tour, json) == {1: (0, 1)}
+
+
+def test_toutes_les_erreurs_listees(tour):
+    lignes = [{'echiquier': 1, 'blancs': 7, 'resultat': '1-0'}, {'echiquier': 2, 'resultat': '2-0'},
+              {'resultat': '1-0'}, {'echiquier': 2, 'resultat': '0-1'}, {'echiquier': 2, 'resultat': '1-0'}]
+    with pytest.raises(ValueError) as erreur:
+        preparer_resultats(tour, lignes)
+    message = str(erreur.value)
+    assert "Ligne 1 : blancs 7 ne correspond pas" in message
+    assert "Ligne 2 : résultat illisible '2-0'" in message
+    assert "Ligne 3 : colonne 'echiquier' manquante" in message
+    assert "Ligne 5 : échiquier 2 saisi deux fois" in message
+
+
+@pytest.mark.parametrize('contenu', ['[1, 2]', '[["1", "1-0"]]', '[null]', '[{"echiquier": [1], "resultat": "1-0"}]'])
+def test_entree_json_mal_formee_refusee(tour, contenu):
+    with pytest.raises(ValueError, match="Ligne 1 : "):
+        preparer_resultats(tour, lire_lignes(io.StringIO(contenu)))
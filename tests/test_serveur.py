@@ -0,0 +1,67 @@
+# Service de lecture : invalidation des réponses par document modifié dans une base SQLite partagée
+
+import asyncio
+import json
+
+import pytest
+
+import Echec
+from serveur import Serveur
+from stockage_sqlite import BaseSQLite
+
+JOUEUR = {'prenom': 'Test', 'date_naissance': '1990-01-01', 'sexe': 'M', 'classement': 1500}
+
+
+def _tournoi(nom: str, joueurs):
+    return {'nom': nom, 'lieu': 'Lyon', 'date_debut': '2024-01-01', 'date_fin': '2024-01-02', 'nb_tours': 4,
+            'controle_temps': 'blitz', 'description': '', 'joueurs': joueurs, 'tours': []}
+
+
+@pytest.fixture
+def arbitre(tmp_path):
+    """Base de la console d'arbitrage ; le service ouvre la même base dans Echec"""
+    base = BaseSQLite(str(tmp_path / 'chess_tournament.sqlite'))
+    joueurs = base.table('joueurs').insert_multiple([dict(JOUEUR, nom_famille=nom) for nom in ('Alpha', 'Beta')])
+    base.table('tournois').insert(_tournoi('Open', joueurs))
+    base.table('tournois').insert(_tournoi('Rapide', joueurs))
+    Echec.ouvrir_base('sqlite', str(tmp_path))
+    yield base
+    Echec.fermer_base()
+    base.close()
+
+
+def test_seul_le_tournoi_modifie_est_invalide(arbitre):
+    async def scenario():
+        serveur = Serveur()
+        _, premier, _ = await serveur.repondre('GET', '/tournois/1', {})
+        _, second, _ = await serveur.repondre('GET', '/tournois/2', {})
+        assert json.loads(premier)['nom'] == 'Open'
+        assert len(serveur.cache) == 2
+
+        arbitre.table('tournois').update({'nom': 'Open de printemps'}, doc_ids=[1])
+        modifies = Echec.db.storage.rafraichir()
+        assert modifies == {('tournois', '1')}
+        await serveur.appliquer_modifications(modifies)
+        assert serveur.cache.get('/tournois/1') is None
+        assert serveur.cache.get('/tournois/2') is not None
+
+        statut, corps, _ = await serveur.repondre('GET', '/tournois/1', {})
+        assert statut == 200 and json.loads(corps)['nom'] == 'Open de printemps'
+        assert (await serveur.repondre('GET', '/tournois/2', {}))[1] is second
+        assert (await serveur.repondre('GET', '/tournois/3', {}))[0] == 404
+
+    asyncio.run(scenario())
+
+
+def test_requetes_simultanees_construites_une_fois(arbitre, monkeypatch):
+    constructions = []
+    serveur = Serveur()
+    construire = serveur.cache.construire
+    monkeypatch.setattr(serveur.cache, 'construire', lambda chemin: constructions.append(chemin) or construire(chemin))
+
+    async def scenario():
+        return await asyncio.gather(*(serveur.repondre('GET', '/tournois/1/classement', {}) for _ in range(5)))
+
+    reponses = asyncio.run(scenario())
+    assert constructions == ['/tournois/1/classement']
+    assert {corps for _, corps, _ in reponses} == {reponses[0][1]}
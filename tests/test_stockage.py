@@ -0,0 +1,113 @@
+# Deux écrivains sur la même base : versions des documents et verrous entre processus
+
+import pytest
+
+from stockage import BaseVerrouillee, ConflitVersion, JournalStorage, VerrouFichier
+from stockage_sqlite import BaseSQLite, StockageSQLite
+
+
+@pytest.fixture
+def ecrivains(tmp_path):
+    """Deux stockages ouverts sur le même journal, comme deux arbitres dans deux processus"""
+    chemin = str(tmp_path / 'base.journal')
+    premier = JournalStorage(chemin)
+    premier.inserer('tournois', {'1': {'resultats': '0000', 'version': 1}})
+    second = JournalStorage(chemin)
+    yield premier, second
+    premier.close()
+    second.close()
+
+
+def test_modifier_refuse_un_ecrivain_en_retard(ecrivains):
+    premier, second = ecrivains
+    premier.modifier('tournois', {'1': {'resultats': '1000', 'version': 2}})
+    # Le second a lu la version 1 : sa version 2 est celle déjà en base
+    with pytest.raises(ConflitVersion):
+        second.modifier('tournois', {'1': {'resultats': '0100', 'version': 2}})
+    second.rafraichir()
+    assert second.read()['tournois']['1'] == {'resultats': '1000', 'version': 2}
+
+
+def test_lot_refuse_un_ecrivain_en_retard(ecrivains):
+    premier, second = ecrivains
+    premier.modifier('tournois', {'1': {'resultats': '1000', 'version': 2}})
+    with pytest.raises(ConflitVersion):
+        with second.lot():
+            second.write({'tournois': {'1': {'resultats': '0100', 'version': 2}}})
+    premier.rafraichir()
+    assert premier.read()['tournois']['1'] == {'resultats': '1000', 'version': 2}
+
+
+def test_ecritures_successives_acceptees(ecrivains):
+    premier, second = ecrivains
+    premier.modifier('tournois', {'1': {'resultats': '1000', 'version': 2}})
+    second.modifier('tournois', {'1': {'resultats': '1100', 'version': 3}})
+    premier.rafraichir()
+    assert premier.read()['tournois']['1'] == {'resultats': '1100', 'version': 3}
+
+
+def test_verrou_fichier_garde_trop_longtemps(tmp_path):
+    chemin = str(tmp_path / 'base.verrou')
+    premier, second = VerrouFichier(chemin), VerrouFichier(chemin, delai=0.05)
+    with premier:
+        with pytest.raises(BaseVerrouillee):
+            with second:
+                pass
+    with second:
+        pass  # Libéré par le premier : pris sans attendre
+    premier.close()
+    second.close()
+
+
+def test_transaction_sqlite_gardee_trop_longtemps(tmp_path):
+    chemin = str(tmp_path / 'base.sqlite')
+    premier, second = StockageSQLite(chemin), StockageSQLite(chemin, delai=0.05)
+    with premier.lot():
+        with pytest.raises(BaseVerrouillee):
+            with second.lot():
+                pass
+    with second.lot():
+        pass
+    premier.close()
+    second.close()
+
+
+@pytest.fixture
+def bases_sqlite(tmp_path):
+    """Deux bases SQLite sur le même fichier : la console d'arbitrage et le service de lecture"""
+    chemin = str(tmp_path / 'base.sqlite')
+    ecrivain, lecteur = BaseSQLite(chemin), BaseSQLite(chemin)
+    yield ecrivain, lecteur
+    ecrivain.close()
+    lecteur.close()
+
+
+def test_sqlite_rafraichir_signale_les_documents_modifies(bases_sqlite):
+    ecrivain, lecteur = bases_sqlite
+    joueurs = ecrivain.table('joueurs').insert_multiple(
+        [{'nom_famille': nom, 'prenom': 'Test', 'date_naissance': '1990-01-01', 'sexe': 'M', 'classement': 1500}
+         for nom in ('Alpha', 'Beta', 'Gamma')])
+    tournoi = ecrivain.table('tournois').insert(
+        {'nom': 'Open', 'lieu': 'Lyon', 'date_debut': '2024-01-01', 'date_fin': '2024-01-02', 'nb_tours': 4,
+         'controle_temps': 'blitz', 'description': '', 'joueurs': joueurs, 'tours': []})
+    lecteur.storage.rafraichir()
+
+    ecrivain.table('joueurs').update({'classement': 1600}, doc_ids=[joueurs[1]])
+    assert lecteur.storage.rafraichir() == {('joueurs', str(joueurs[1]))}
+    assert lecteur.storage.rafraichir() == set()
+
+    tour = {'nom': 'Tour 1', 'debut': None, 'fin': None, 'blancs': joueurs[:1], 'noirs': joueurs[1:2],
+            'resultats': '0'}
+    ecrivain.table('tournois').update({'tours': [tour]}, doc_ids=[tournoi])
+    assert lecteur.storage.rafraichir() == {('tournois', str(tournoi))}
+
+
+def test_sqlite_ecritures_propres_non_signalees(bases_sqlite):
+    ecrivain, lecteur = bases_sqlite
+    document = {'nom_famille': 'Alpha', 'prenom': 'Test', 'date_naissance': '1990-01-01', 'sexe': 'M',
+                'classement': 1500}
+    alpha = ecrivain.table('joueurs').insert_multiple([document])[0]
+    lecteur.table('joueurs').insert_multiple([dict(document, nom_famille='Beta')])
+    ecrivain.table('joueurs').update({'classement': 1600}, doc_ids=[alpha])
+    # Le joueur inséré par le lecteur lui-même n'est pas signalé
+    assert lecteur.storage.rafraichir() == {('joueurs', str(alpha))}
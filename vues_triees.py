@@ -0,0 +1,109 @@
+# Vues triées des joueurs, tenues à jour par insertion dichotomique plutôt que retriées à chaque rapport
+
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+Cle = Tuple[Any, ...]
+
+
+def cle_alphabetique(joueur) -> Cle:
+    return joueur.nom_famille.lower(), joueur.prenom.lower()
+
+
+def cle_classement(joueur) -> Cle:
+    return (-joueur.classement,)  # Meilleur classement en tête
+
+
+ORDRES: Dict[str, Callable[[Any], Cle]] = {
+    'alphabetique': cle_alphabetique,
+    'classement': cle_classement,
+}
+
+
+class VueTriee:
+    """Joueurs rangés selon une clé, avec leur id pour départager les égalités.
+
+    Le tri complet n'a lieu qu'à la construction ; ensuite chaque ajout, retrait ou
+    changement de clé (nouveau classement, nom corrigé) ne déplace qu'un seul joueur.
+    """
+
+    def __init__(self, cle: Callable[[Any], Cle], joueurs: Iterable[Any] = ()):
+        self.cle = cle
+        uniques = {joueur.id: joueur for joueur in joueurs}.values()
+        paires = sorted(((cle(joueur) + (joueur.id,), joueur) for joueur in uniques), key=lambda p: p[0])
+        self._cles: List[Cle] = [cle_joueur for cle_joueur, _ in paires]
+        self._joueurs: List[Any] = [joueur for _, joueur in paires]
+        self._cle_par_id: Dict[int, Cle] = {joueur.id: cle_joueur for cle_joueur, joueur in paires}
+
+    def __contains__(self, joueur_id: int) -> bool:
+        return joueur_id in self._cle_par_id
+
+    def __len__(self) -> int:
+        return len(self._joueurs)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._joueurs)
+
+    def liste(self) -> List[Any]:
+        return list(self._joueurs)
+
+    def entre(self, debut: Cle, fin: Cle) -> Iterator[Any]:
+        """Joueurs dont la clé est comprise entre ``debut`` (inclus) et ``fin`` (exclu), sans parcourir les autres"""
+        position, arret = bisect_left(self._cles, debut), bisect_left(self._cles, fin)
+        return (self._joueurs[i] for i in range(position, arret))
+
+    def nombre_entre(self, debut: Cle, fin: Cle) -> int:
+        """Nombre de joueurs que renverrait ``entre(debut, fin)``, par dichotomie"""
+        return max(0, bisect_left(self._cles, fin) - bisect_left(self._cles, debut))
+
+    def ajouter(self, joueur):
+        """Insère un joueur à sa place, ou le replace s'il est déjà dans la vue"""
+        if joueur.id in self._cle_par_id:
+            self.mettre_a_jour(joueur)
+            return
+        cle_joueur = self.cle(joueur) + (joueur.id,)
+        position = bisect_left(self._cles, cle_joueur)
+        self._cles.insert(position, cle_joueur)
+        self._joueurs.insert(position, joueur)
+        self._cle_par_id[joueur.id] = cle_joueur
+
+    def retirer(self, joueur_id: int):
+        cle_joueur = self._cle_par_id.pop(joueur_id, None)
+        if cle_joueur is None:
+            return
+        position = bisect_left(self._cles, cle_joueur)
+        del self._cles[position]
+        del self._joueurs[position]
+
+    def mettre_a_jour(self, joueur):
+        """Déplace un joueur dont la clé a changé ; remplace aussi l'instance gardée"""
+        ancienne = self._cle_par_id.get(joueur.id)
+        if ancienne is None:
+            return
+        if ancienne == self.cle(joueur) + (joueur.id,):
+            self._joueurs[bisect_left(self._cles, ancienne)] = joueur
+            return
+        self.retirer(joueur.id)
+        self.ajouter(joueur)
+
+    def __repr__(self):
+        return f"VueTriee({len(self)} joueurs)"
+
+
+class VueInscrits(VueTriee):
+    """Vue triée des joueurs d'une liste d'ids qui ne fait que s'allonger (inscrits d'un tournoi)"""
+
+    def __init__(self, cle: Callable[[Any], Cle], ids: List[int], charger: Callable[[int], Optional[Any]],
+                 generation: int = 0):
+        self.ids = ids
+        self.nb_lus = len(ids)
+        self.generation = generation  # Génération du dépôt dont viennent les instances de joueurs
+        super().__init__(cle, [joueur for joueur in map(charger, ids) if joueur is not None])
+
+    def rattraper(self, charger: Callable[[int], Optional[Any]]):
+        """Insère les joueurs ajoutés à la liste d'ids depuis la dernière lecture"""
+        for joueur_id in self.ids[self.nb_lus:]:
+            joueur = charger(joueur_id)
+            if joueur is not None:
+                self.ajouter(joueur)
+        self.nb_lus = len(self.ids)